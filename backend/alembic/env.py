@@ -2,7 +2,17 @@ from logging.config import fileConfig
 
 from alembic import context
 from app.core.config import settings
-from app.models import Incident, LogEntry, MetricPoint  # noqa: F401
+from app.db.migrations import include_object
+from app.models import (  # noqa: F401
+    Incident,
+    LogEntry,
+    MetricChunk,
+    MetricName,
+    MetricPoint,
+    MetricRollup,
+    Series,
+    Service,
+)
 from sqlalchemy import engine_from_config, pool
 from sqlmodel import SQLModel
 
@@ -17,13 +27,38 @@ target_metadata = SQLModel.metadata
 
 def run_migrations_offline() -> None:
     url = config.get_main_option("sqlalchemy.url")
-    context.configure(url=url, target_metadata=target_metadata, literal_binds=True)
+    context.configure(
+        url=url,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        include_object=include_object,
+        render_as_batch=url.startswith("sqlite"),
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def _run_with_connection(connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        # SQLite cannot ALTER most things in place; batch mode rebuilds the table instead
+        render_as_batch=connection.dialect.name == "sqlite",
+    )
 
     with context.begin_transaction():
         context.run_migrations()
 
 
 def run_migrations_online() -> None:
+    # app.db.migrations hands us a live connection so tests and init_db reuse their engine
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _run_with_connection(connection)
+        return
+
     connectable = engine_from_config(
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
@@ -31,10 +66,7 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
-
-        with context.begin_transaction():
-            context.run_migrations()
+        _run_with_connection(connection)
 
 
 def run_migrations() -> None:
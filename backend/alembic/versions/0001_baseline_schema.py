@@ -0,0 +1,77 @@
+"""baseline schema
+
+Tables exactly as ``SQLModel.metadata.create_all`` produced them before migrations existed.
+Databases created that way are stamped at this revision by ``init_db``.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "metrics",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("service", sa.String(), nullable=False),
+        sa.Column("metric", sa.String(), nullable=False),
+        sa.Column("timestamp", sa.DateTime(), nullable=False),
+        sa.Column("value", sa.Float(), nullable=False),
+    )
+    op.create_index("ix_metrics_service", "metrics", ["service"])
+    op.create_index("ix_metrics_metric", "metrics", ["metric"])
+    op.create_index("ix_metrics_timestamp", "metrics", ["timestamp"])
+
+    op.create_table(
+        "logs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("service", sa.String(), nullable=False),
+        sa.Column("level", sa.String(), nullable=False),
+        sa.Column("timestamp", sa.DateTime(), nullable=False),
+        sa.Column("request_id", sa.String(), nullable=True),
+        sa.Column("message", sa.String(), nullable=False),
+        sa.Column("latency_ms", sa.Float(), nullable=True),
+        sa.Column("context", sa.Text(), nullable=True),
+    )
+    op.create_index("ix_logs_service", "logs", ["service"])
+    op.create_index("ix_logs_level", "logs", ["level"])
+    op.create_index("ix_logs_timestamp", "logs", ["timestamp"])
+    op.create_index("ix_logs_request_id", "logs", ["request_id"])
+
+    op.create_table(
+        "incidents",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("incident_key", sa.String(), nullable=False),
+        sa.Column("service", sa.String(), nullable=False),
+        sa.Column("metric", sa.String(), nullable=False),
+        sa.Column("severity", sa.Integer(), nullable=False),
+        sa.Column("detected_at", sa.DateTime(), nullable=False),
+        sa.Column("window_start", sa.DateTime(), nullable=False),
+        sa.Column("window_end", sa.DateTime(), nullable=False),
+        sa.Column("baseline", sa.Float(), nullable=True),
+        sa.Column("observed", sa.Float(), nullable=True),
+        sa.Column("detector", sa.String(), nullable=False),
+        sa.Column("summary", sa.String(), nullable=True),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_incidents_incident_key", "incidents", ["incident_key"])
+    op.create_index("ix_incidents_service", "incidents", ["service"])
+    op.create_index("ix_incidents_metric", "incidents", ["metric"])
+    op.create_index("ix_incidents_detected_at", "incidents", ["detected_at"])
+
+
+def downgrade() -> None:
+    op.drop_table("incidents")
+    op.drop_table("logs")
+    op.drop_table("metrics")
@@ -0,0 +1,55 @@
+"""composite time-series indexes
+
+Hot queries filter on service+metric (or service, or incident_key+status) and order by time.
+Single-column indexes made the planner pick one column and sort the rest; composite indexes
+serve the filter and the ordering together.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_metrics_series_time", "metrics", ["service", "metric", "timestamp", "value"]
+    )
+    op.drop_index("ix_metrics_service", table_name="metrics")
+    op.drop_index("ix_metrics_metric", table_name="metrics")
+
+    op.create_index("ix_logs_service_time", "logs", ["service", "timestamp"])
+    op.drop_index("ix_logs_service", table_name="logs")
+
+    op.create_index("ix_incidents_key_status", "incidents", ["incident_key", "status"])
+    op.create_index(
+        "ix_incidents_status_severity", "incidents", ["status", "severity", "detected_at"]
+    )
+    op.create_index("ix_incidents_service_metric", "incidents", ["service", "metric"])
+    op.drop_index("ix_incidents_incident_key", table_name="incidents")
+    op.drop_index("ix_incidents_service", table_name="incidents")
+    op.drop_index("ix_incidents_metric", table_name="incidents")
+
+
+def downgrade() -> None:
+    op.create_index("ix_incidents_metric", "incidents", ["metric"])
+    op.create_index("ix_incidents_service", "incidents", ["service"])
+    op.create_index("ix_incidents_incident_key", "incidents", ["incident_key"])
+    op.drop_index("ix_incidents_service_metric", table_name="incidents")
+    op.drop_index("ix_incidents_status_severity", table_name="incidents")
+    op.drop_index("ix_incidents_key_status", table_name="incidents")
+
+    op.create_index("ix_logs_service", "logs", ["service"])
+    op.drop_index("ix_logs_service_time", table_name="logs")
+
+    op.create_index("ix_metrics_metric", "metrics", ["metric"])
+    op.create_index("ix_metrics_service", "metrics", ["service"])
+    op.drop_index("ix_metrics_series_time", table_name="metrics")
@@ -0,0 +1,23 @@
+"""rollup bucket index for retention
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_metric_rollups_bucket", "metric_rollups", ["bucket"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_metric_rollups_bucket", table_name="metric_rollups")
@@ -0,0 +1,40 @@
+"""compressed metric chunks
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "metric_chunks",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("service", sa.String(), nullable=False),
+        sa.Column("metric", sa.String(), nullable=False),
+        sa.Column("chunk_start", sa.DateTime(), nullable=False),
+        sa.Column("end_time", sa.DateTime(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("payload", sa.LargeBinary(), nullable=False),
+    )
+    op.create_index(
+        "ux_metric_chunks_series_start",
+        "metric_chunks",
+        ["service", "metric", "chunk_start"],
+        unique=True,
+    )
+    op.create_index("ix_metric_chunks_end_time", "metric_chunks", ["end_time"])
+
+
+def downgrade() -> None:
+    op.drop_table("metric_chunks")
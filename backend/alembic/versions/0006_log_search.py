@@ -0,0 +1,62 @@
+"""full-text log search
+
+FTS5 external-content table plus sync triggers on SQLite, a generated tsvector column with a
+GIN index on Postgres. Existing rows are indexed as part of the upgrade.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        op.execute(
+            "CREATE VIRTUAL TABLE logs_fts USING fts5("
+            "message, context, content='logs', content_rowid='id', tokenize='unicode61')"
+        )
+        op.execute(
+            "CREATE TRIGGER logs_fts_insert AFTER INSERT ON logs BEGIN "
+            "INSERT INTO logs_fts(rowid, message, context) "
+            "VALUES (new.id, new.message, new.context); END"
+        )
+        op.execute(
+            "CREATE TRIGGER logs_fts_delete AFTER DELETE ON logs BEGIN "
+            "INSERT INTO logs_fts(logs_fts, rowid, message, context) "
+            "VALUES ('delete', old.id, old.message, old.context); END"
+        )
+        op.execute(
+            "CREATE TRIGGER logs_fts_update AFTER UPDATE OF message, context ON logs BEGIN "
+            "INSERT INTO logs_fts(logs_fts, rowid, message, context) "
+            "VALUES ('delete', old.id, old.message, old.context); "
+            "INSERT INTO logs_fts(rowid, message, context) "
+            "VALUES (new.id, new.message, new.context); END"
+        )
+        op.execute("INSERT INTO logs_fts(logs_fts) VALUES ('rebuild')")
+    elif dialect == "postgresql":
+        op.execute(
+            "ALTER TABLE logs ADD COLUMN search tsvector GENERATED ALWAYS AS ("
+            "to_tsvector('simple', message || ' ' || coalesce(context, ''))) STORED"
+        )
+        op.execute("CREATE INDEX ix_logs_search ON logs USING gin (search)")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        for trigger in ("logs_fts_insert", "logs_fts_delete", "logs_fts_update"):
+            op.execute(f"DROP TRIGGER {trigger}")
+        op.execute("DROP TABLE logs_fts")
+    elif dialect == "postgresql":
+        op.execute("DROP INDEX ix_logs_search")
+        op.execute("ALTER TABLE logs DROP COLUMN search")
@@ -0,0 +1,114 @@
+"""native JSON log context
+
+``logs.context`` becomes JSON (JSONB on Postgres) instead of JSON text, and the keys the UI and
+root-cause analysis filter on (``path``, ``upstream``, ``keyword``, ``status_code``) are promoted
+to indexed generated columns. Rows whose text is not valid JSON are kept as ``{"raw": text}``,
+which is what the API used to return for them.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PROMOTED = ("path", "upstream", "keyword", "status_code")
+
+SQLITE_TRIGGERS = (
+    "CREATE TRIGGER logs_fts_insert AFTER INSERT ON logs BEGIN "
+    "INSERT INTO logs_fts(rowid, message, context) "
+    "VALUES (new.id, new.message, new.context); END",
+    "CREATE TRIGGER logs_fts_delete AFTER DELETE ON logs BEGIN "
+    "INSERT INTO logs_fts(logs_fts, rowid, message, context) "
+    "VALUES ('delete', old.id, old.message, old.context); END",
+    "CREATE TRIGGER logs_fts_update AFTER UPDATE OF message, context ON logs BEGIN "
+    "INSERT INTO logs_fts(logs_fts, rowid, message, context) "
+    "VALUES ('delete', old.id, old.message, old.context); "
+    "INSERT INTO logs_fts(rowid, message, context) "
+    "VALUES (new.id, new.message, new.context); END",
+)
+
+
+def _add_search_column(context: str) -> None:
+    op.execute(
+        "ALTER TABLE logs ADD COLUMN search tsvector GENERATED ALWAYS AS ("
+        f"to_tsvector('simple', message || ' ' || coalesce({context}, ''))) STORED"
+    )
+    op.execute("CREATE INDEX ix_logs_search ON logs USING gin (search)")
+
+
+def _drop_search_column() -> None:
+    op.execute("DROP INDEX ix_logs_search")
+    op.execute("ALTER TABLE logs DROP COLUMN search")
+
+
+def _promoted_columns() -> list:
+    return [
+        sa.Column(key, sa.String(), sa.Computed(f"context ->> '{key}'"), nullable=True)
+        for key in PROMOTED
+    ]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        # the search column is generated from context, so it has to go while the type changes
+        _drop_search_column()
+        op.execute("ALTER TABLE logs ALTER COLUMN context TYPE jsonb USING context::jsonb")
+        for column in _promoted_columns():
+            op.add_column("logs", column)
+        _add_search_column("context::text")
+    else:
+        op.execute(
+            "UPDATE logs SET context = json_object('raw', context) "
+            "WHERE context IS NOT NULL AND NOT json_valid(context)"
+        )
+        # the table rebuild drops the full-text triggers along with the old table
+        with op.batch_alter_table("logs", recreate="always") as batch:
+            batch.alter_column(
+                "context", existing_type=sa.Text(), type_=sa.JSON(), existing_nullable=True
+            )
+            for column in _promoted_columns():
+                batch.add_column(column)
+        for trigger in SQLITE_TRIGGERS:
+            op.execute(trigger)
+
+    for key in PROMOTED:
+        op.create_index(f"ix_logs_{key}", "logs", [key])
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    for key in PROMOTED:
+        op.drop_index(f"ix_logs_{key}", table_name="logs")
+
+    if bind.dialect.name == "postgresql":
+        _drop_search_column()
+        for key in PROMOTED:
+            op.drop_column("logs", key)
+        op.alter_column(
+            "logs",
+            "context",
+            existing_type=postgresql.JSONB(),
+            type_=sa.Text(),
+            postgresql_using="context::text",
+        )
+        _add_search_column("context")
+    else:
+        with op.batch_alter_table("logs", recreate="always") as batch:
+            for key in PROMOTED:
+                batch.drop_column(key)
+            batch.alter_column(
+                "context", existing_type=sa.JSON(), type_=sa.Text(), existing_nullable=True
+            )
+        for trigger in SQLITE_TRIGGERS:
+            op.execute(trigger)
@@ -0,0 +1,176 @@
+"""dictionary-encoded service and metric dimensions
+
+``metrics`` rows reference a ``series`` row (service id, metric id) and ``logs`` rows a
+``services`` row instead of repeating the names in every row and index entry. Rollups and sealed
+chunks keep their name columns. Existing rows are rewritten in place.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SQLITE_TRIGGERS = (
+    "CREATE TRIGGER logs_fts_insert AFTER INSERT ON logs BEGIN "
+    "INSERT INTO logs_fts(rowid, message, context) "
+    "VALUES (new.id, new.message, new.context); END",
+    "CREATE TRIGGER logs_fts_delete AFTER DELETE ON logs BEGIN "
+    "INSERT INTO logs_fts(logs_fts, rowid, message, context) "
+    "VALUES ('delete', old.id, old.message, old.context); END",
+    "CREATE TRIGGER logs_fts_update AFTER UPDATE OF message, context ON logs BEGIN "
+    "INSERT INTO logs_fts(logs_fts, rowid, message, context) "
+    "VALUES ('delete', old.id, old.message, old.context); "
+    "INSERT INTO logs_fts(rowid, message, context) "
+    "VALUES (new.id, new.message, new.context); END",
+)
+
+PROMOTED = ("path", "upstream", "keyword", "status_code")
+
+SERIES_KEY = (
+    "SELECT series.id FROM series "
+    "JOIN services ON services.id = series.service_id "
+    "JOIN metric_names ON metric_names.id = series.metric_id "
+    "WHERE services.name = metrics.service AND metric_names.name = metrics.metric"
+)
+
+
+def _create_dimensions() -> None:
+    op.create_table(
+        "services",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+    )
+    op.create_index("ux_services_name", "services", ["name"], unique=True)
+    op.create_table(
+        "metric_names",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+    )
+    op.create_index("ux_metric_names_name", "metric_names", ["name"], unique=True)
+    op.create_table(
+        "series",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("service_id", sa.Integer(), sa.ForeignKey("services.id"), nullable=False),
+        sa.Column("metric_id", sa.Integer(), sa.ForeignKey("metric_names.id"), nullable=False),
+    )
+    op.create_index("ux_series_service_metric", "series", ["service_id", "metric_id"], unique=True)
+
+    # sealed-only series live in metric_chunks, services without metrics only in logs
+    op.execute(
+        "INSERT INTO services (name) SELECT service FROM metrics UNION "
+        "SELECT service FROM metric_chunks UNION SELECT service FROM logs"
+    )
+    op.execute(
+        "INSERT INTO metric_names (name) SELECT metric FROM metrics UNION "
+        "SELECT metric FROM metric_chunks"
+    )
+    op.execute(
+        "INSERT INTO series (service_id, metric_id) "
+        "SELECT services.id, metric_names.id FROM ("
+        "SELECT service, metric FROM metrics UNION SELECT service, metric FROM metric_chunks"
+        ") AS pairs "
+        "JOIN services ON services.name = pairs.service "
+        "JOIN metric_names ON metric_names.name = pairs.metric"
+    )
+
+
+def _rebuild_logs(change) -> None:
+    """Apply ``change`` to a batch of the logs table.
+
+    On SQLite the batch copies the table, which cannot write the generated context columns, so
+    they are dropped for the copy and added back afterwards; the copy also drops the full-text
+    triggers with the old table.
+    """
+    if op.get_bind().dialect.name != "sqlite":
+        with op.batch_alter_table("logs") as batch:
+            change(batch)
+        return
+
+    for key in PROMOTED:
+        op.drop_index(f"ix_logs_{key}", table_name="logs")
+    with op.batch_alter_table("logs") as batch:
+        for key in PROMOTED:
+            batch.drop_column(key)
+        change(batch)
+    for key in PROMOTED:
+        op.add_column(
+            "logs", sa.Column(key, sa.String(), sa.Computed(f"context ->> '{key}'"), nullable=True)
+        )
+        op.create_index(f"ix_logs_{key}", "logs", [key])
+    for trigger in SQLITE_TRIGGERS:
+        op.execute(trigger)
+
+
+def _to_service_id(batch) -> None:
+    batch.drop_column("service")
+    batch.alter_column("service_id", existing_type=sa.Integer(), nullable=False)
+    batch.create_foreign_key("fk_logs_service_id", "services", ["service_id"], ["id"])
+
+
+def _to_service_name(batch) -> None:
+    batch.drop_constraint("fk_logs_service_id", type_="foreignkey")
+    batch.drop_column("service_id")
+    batch.alter_column("service", existing_type=sa.String(), nullable=False)
+
+
+def upgrade() -> None:
+    _create_dimensions()
+    op.add_column("metrics", sa.Column("series_id", sa.Integer(), nullable=True))
+    op.execute(f"UPDATE metrics SET series_id = ({SERIES_KEY})")
+    op.add_column("logs", sa.Column("service_id", sa.Integer(), nullable=True))
+    op.execute(
+        "UPDATE logs SET service_id = (SELECT id FROM services WHERE services.name = logs.service)"
+    )
+
+    op.drop_index("ix_metrics_series_time", table_name="metrics")
+    op.drop_index("ix_logs_service_time", table_name="logs")
+    with op.batch_alter_table("metrics") as batch:
+        batch.drop_column("service")
+        batch.drop_column("metric")
+        batch.alter_column("series_id", existing_type=sa.Integer(), nullable=False)
+        batch.create_foreign_key("fk_metrics_series_id", "series", ["series_id"], ["id"])
+    _rebuild_logs(_to_service_id)
+    op.create_index("ix_metrics_series_time", "metrics", ["series_id", "timestamp", "value"])
+    op.create_index("ix_logs_service_time", "logs", ["service_id", "timestamp"])
+
+
+def downgrade() -> None:
+    op.add_column("metrics", sa.Column("service", sa.String(), nullable=True))
+    op.add_column("metrics", sa.Column("metric", sa.String(), nullable=True))
+    op.execute(
+        "UPDATE metrics SET "
+        "service = (SELECT services.name FROM series JOIN services "
+        "ON services.id = series.service_id WHERE series.id = metrics.series_id), "
+        "metric = (SELECT metric_names.name FROM series JOIN metric_names "
+        "ON metric_names.id = series.metric_id WHERE series.id = metrics.series_id)"
+    )
+    op.add_column("logs", sa.Column("service", sa.String(), nullable=True))
+    op.execute(
+        "UPDATE logs SET service = (SELECT name FROM services WHERE services.id = logs.service_id)"
+    )
+
+    op.drop_index("ix_metrics_series_time", table_name="metrics")
+    op.drop_index("ix_logs_service_time", table_name="logs")
+    with op.batch_alter_table("metrics") as batch:
+        batch.drop_constraint("fk_metrics_series_id", type_="foreignkey")
+        batch.drop_column("series_id")
+        batch.alter_column("service", existing_type=sa.String(), nullable=False)
+        batch.alter_column("metric", existing_type=sa.String(), nullable=False)
+    _rebuild_logs(_to_service_name)
+    op.create_index(
+        "ix_metrics_series_time", "metrics", ["service", "metric", "timestamp", "value"]
+    )
+    op.create_index("ix_logs_service_time", "logs", ["service", "timestamp"])
+
+    op.drop_table("series")
+    op.drop_table("metric_names")
+    op.drop_table("services")
@@ -0,0 +1,46 @@
+"""series registry columns
+
+``series`` rows carry the first and last point timestamps, the number of points written and the
+latest value, so listing series never scans ``metrics``. The backfill covers raw rows only;
+``python -m scripts.reconcile_series`` adds the points already sealed into ``metric_chunks``.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-17
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0010"
+down_revision: Union[str, None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+RAW = "FROM metrics WHERE metrics.series_id = series.id"
+
+
+def upgrade() -> None:
+    op.add_column("series", sa.Column("first_seen", sa.DateTime(), nullable=True))
+    op.add_column("series", sa.Column("last_seen", sa.DateTime(), nullable=True))
+    op.add_column(
+        "series", sa.Column("point_count", sa.Integer(), nullable=False, server_default="0")
+    )
+    op.add_column("series", sa.Column("last_value", sa.Float(), nullable=True))
+    op.execute(
+        "UPDATE series SET "
+        f"first_seen = (SELECT MIN(timestamp) {RAW}), "
+        f"last_seen = (SELECT MAX(timestamp) {RAW}), "
+        f"point_count = (SELECT COUNT(*) {RAW}), "
+        f"last_value = (SELECT value {RAW} ORDER BY timestamp DESC, id DESC LIMIT 1)"
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("series") as batch:
+        batch.drop_column("last_value")
+        batch.drop_column("point_count")
+        batch.drop_column("last_seen")
+        batch.drop_column("first_seen")
@@ -0,0 +1,43 @@
+"""one open incident per key
+
+Concurrent detection refreshes could both miss the open incident for a key and insert a second
+one. Existing duplicates are resolved, keeping the oldest open incident per key, before a partial
+unique index on ``incident_key`` for open incidents rules them out; writers upsert against it
+with ``ON CONFLICT``.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-17
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0011"
+down_revision: Union[str, None] = "0010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OPEN = "status = 'open'"
+
+
+def upgrade() -> None:
+    op.execute(
+        "UPDATE incidents SET status = 'resolved', updated_at = CURRENT_TIMESTAMP "
+        f"WHERE {OPEN} AND id > (SELECT MIN(keep.id) FROM incidents AS keep "
+        "WHERE keep.incident_key = incidents.incident_key AND keep.status = 'open')"
+    )
+    op.create_index(
+        "ux_incidents_open_key",
+        "incidents",
+        ["incident_key"],
+        unique=True,
+        sqlite_where=sa.text(OPEN),
+        postgresql_where=sa.text(OPEN),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ux_incidents_open_key", table_name="incidents")
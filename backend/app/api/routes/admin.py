@@ -1,10 +1,22 @@
 import logging
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from sqlmodel import Session
 
-from app.db.session import get_session
+from app.core.concurrency import run_blocking
+from app.core.config import settings
+from app.crud import chunks as chunk_crud
+from app.crud.series import reconcile_series, series_registry
+from app.db.session import get_read_session, get_session
 from app.seed import seed_sample_data
+from app.services.cold_tier import cold_tier
+from app.services.compaction import compaction_job
+from app.services.detection_pool import detection_pool
+from app.services.detection_scheduler import detection_scheduler
+from app.services.hot_store import hot_store
+from app.services.online_detector import online_detector
+from app.services.retention import retention_engine
+from app.services.segment_store import segment_store
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 logger = logging.getLogger(__name__)
@@ -20,3 +32,92 @@ def seed_endpoint(
     except Exception as exc:  # pragma: no cover - defensive
         logger.exception("seed endpoint failed")
         return {"status": "error", "reason": str(exc)}
+
+
+@router.get("/retention")
+def retention_status() -> dict[str, object]:
+    return retention_engine.stats()
+
+
+@router.post("/retention/run")
+async def run_retention(session: Session = Depends(get_session)) -> dict[str, object]:
+    report = await run_blocking(retention_engine.run, session)
+    return {"status": "ok", **report}
+
+
+@router.get("/hot-store")
+def hot_store_status() -> dict[str, object]:
+    return hot_store.stats()
+
+
+@router.post("/hot-store/verify")
+async def verify_hot_store(session: Session = Depends(get_read_session)) -> dict[str, object]:
+    return await run_blocking(hot_store.verify, session)
+
+
+@router.get("/online-detector")
+def online_detector_status() -> dict[str, object]:
+    return online_detector.stats()
+
+
+@router.post("/online-detector/rebuild")
+async def rebuild_online_detector(session: Session = Depends(get_session)) -> dict[str, object]:
+    report = await run_blocking(online_detector.rebuild, session)
+    return {"status": "ok", **report}
+
+
+@router.get("/detection-pool")
+def detection_pool_status() -> dict[str, object]:
+    return detection_pool.stats()
+
+
+@router.get("/detection-scheduler")
+def detection_scheduler_status() -> dict[str, object]:
+    return detection_scheduler.stats()
+
+
+@router.get("/series-registry")
+def series_registry_status() -> dict[str, object]:
+    return series_registry.stats()
+
+
+@router.post("/series-registry/reconcile")
+async def reconcile_series_registry(session: Session = Depends(get_session)) -> dict[str, object]:
+    report = await run_blocking(reconcile_series, session)
+    return {"status": "ok", **report}
+
+
+@router.get("/compaction")
+def compaction_status(session: Session = Depends(get_read_session)) -> dict[str, object]:
+    return {**compaction_job.stats(), "storage": chunk_crud.storage_stats(session)}
+
+
+@router.post("/compaction/run")
+async def run_compaction(session: Session = Depends(get_session)) -> dict[str, object]:
+    report = await run_blocking(compaction_job.run, session)
+    return {"status": "ok", **report}
+
+
+@router.get("/segments")
+def segment_store_status() -> dict[str, object]:
+    return segment_store.stats()
+
+
+@router.post("/segments/sync")
+async def sync_segment_store(session: Session = Depends(get_read_session)) -> dict[str, object]:
+    if not segment_store.ready and not settings.segment_store_enabled:
+        raise HTTPException(status_code=409, detail="segment store is disabled")
+    return await run_blocking(segment_store.sync, session)
+
+
+@router.get("/cold-tier")
+def cold_tier_status() -> dict[str, object]:
+    return cold_tier.stats()
+
+
+@router.post("/cold-tier/run")
+async def run_cold_tier(session: Session = Depends(get_session)) -> dict[str, object]:
+    if not cold_tier.available:
+        raise HTTPException(status_code=409, detail="the cold tier needs pyarrow")
+    report = await run_blocking(cold_tier.run, session)
+    return {"status": "ok", **report}
@@ -1,8 +1,16 @@
 from fastapi import APIRouter
 
+from app.core.concurrency import blocking_pool_stats
+from app.services.loop_monitor import loop_monitor
+
 router = APIRouter()
 
 
 @router.get("/health", tags=["health"])
 def health_check() -> dict[str, str]:
     return {"status": "ok"}
+
+
+@router.get("/health/loop", tags=["health"])
+def loop_health() -> dict[str, object]:
+    return {"loop_lag": loop_monitor.stats(), "blocking_pool": blocking_pool_stats()}
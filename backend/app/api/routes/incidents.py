@@ -4,12 +4,15 @@ from datetime import datetime, timedelta
 from fastapi import APIRouter, Depends, HTTPException
 from sqlmodel import Session
 
+from app.core.concurrency import run_blocking
 from app.core.config import settings
 from app.crud import incidents as incident_crud
 from app.crud import logs as log_crud
 from app.crud import metrics as metric_crud
-from app.db.session import get_session
-from app.models import Incident, LogEntry, MetricPoint
+from app.crud.logs import LogRow
+from app.crud.metrics import MetricRow
+from app.db.session import get_read_session, get_session
+from app.models import Incident
 from app.schemas import LogCreate, MetricPointCreate
 from app.schemas.incidents import (
     IncidentListResponse,
@@ -21,6 +24,7 @@ from app.schemas.postmortem import PostmortemResponse
 from app.schemas.root_cause import RootCauseResponse
 from app.seed import seed_sample_data
 from app.services.event_bus import event_bus
+from app.services.hot_store import hot_store
 from app.services.incident_detector import IncidentDetector
 from app.services.postmortem import PostmortemGenerator
 from app.services.root_cause import RootCauseAnalyzer
@@ -32,7 +36,7 @@ router = APIRouter(prefix="/incidents", tags=["incidents"])
 
 @router.get("/active", response_model=IncidentListResponse)
 def list_active_incidents(
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_read_session),
 ) -> IncidentListResponse:
     incidents = incident_crud.list_active_incidents(session)
     return IncidentListResponse(
@@ -42,7 +46,7 @@ def list_active_incidents(
 
 @router.get("/recent", response_model=IncidentListResponse)
 def list_recent_incidents(
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_read_session),
 ) -> IncidentListResponse:
     incidents = incident_crud.list_recent_incidents(session)
     return IncidentListResponse(
@@ -54,15 +58,12 @@ def list_recent_incidents(
 async def refresh_incidents(
     session: Session = Depends(get_session),
 ) -> IncidentRefreshResponse:
-    detector = IncidentDetector(session)
     try:
-        pairs = detector.candidate_pairs()
+        pairs, incidents = await run_blocking(_refresh_sync, session)
         if not pairs:
             return IncidentRefreshResponse(
                 status="ok", incidents_created=0, reason="no metrics available"
             )
-
-        incidents = detector.evaluate_metrics(pairs)
         if not incidents:
             return IncidentRefreshResponse(
                 status="ok", incidents_created=0, reason="no anomalies detected"
@@ -85,7 +86,9 @@ def resolve_incident(incident_id: int, session: Session = Depends(get_session))
 
 
 @router.get("/{incident_id}", response_model=IncidentRead)
-def retrieve_incident(incident_id: int, session: Session = Depends(get_session)) -> IncidentRead:
+def retrieve_incident(
+    incident_id: int, session: Session = Depends(get_read_session)
+) -> IncidentRead:
     incident = session.get(Incident, incident_id)
     if not incident:
         raise HTTPException(status_code=404, detail="Incident not found")
@@ -94,7 +97,7 @@ def retrieve_incident(incident_id: int, session: Session = Depends(get_session))
 
 @router.get("/{incident_id}/analysis", response_model=RootCauseResponse)
 def analyze_incident(
-    incident_id: int, session: Session = Depends(get_session)
+    incident_id: int, session: Session = Depends(get_read_session)
 ) -> RootCauseResponse:
     incident = session.get(Incident, incident_id)
     if not incident:
@@ -105,19 +108,22 @@ def analyze_incident(
 
 @router.get("/{incident_id}/timeline", response_model=IncidentTimelineResponse)
 def incident_timeline(
-    incident_id: int, session: Session = Depends(get_session)
+    incident_id: int, session: Session = Depends(get_read_session)
 ) -> IncidentTimelineResponse:
     incident = session.get(Incident, incident_id)
     if not incident:
         raise HTTPException(status_code=404, detail="Incident not found")
-    series = metric_crud.get_metrics_window(
-        session=session,
-        service=incident.service,
-        metric=incident.metric,
-        window_start=incident.window_start,
-        window_end=incident.window_end,
-        limit=240,
-    )
+    lower, upper = metric_crud.padded_window(incident.window_start, incident.window_end)
+    series = hot_store.window(incident.service, incident.metric, lower, upper, limit=240)
+    if series is None:
+        series = metric_crud.get_metrics_window(
+            session=session,
+            service=incident.service,
+            metric=incident.metric,
+            window_start=incident.window_start,
+            window_end=incident.window_end,
+            limit=240,
+        )
     points = [{"timestamp": point.timestamp.isoformat(), "value": point.value} for point in series]
     return IncidentTimelineResponse(
         incident_id=incident.id,
@@ -133,23 +139,7 @@ async def simulate_incident(
     session: Session = Depends(get_session),
 ) -> dict[str, object]:
     try:
-        if not metric_crud.list_services(session):
-            seed_sample_data(session)
-
-        before_keys = {
-            incident.incident_key for incident in incident_crud.list_active_incidents(session)
-        }
-
-        metrics, logs = _inject_payments_spike(session)
-        detector = IncidentDetector(session)
-        incidents = detector.evaluate_all_services()
-        after_keys = {
-            incident.incident_key for incident in incident_crud.list_active_incidents(session)
-        }
-        created_keys = after_keys - before_keys
-        created_incidents = [
-            incident for incident in incidents if incident.incident_key in created_keys
-        ]
+        metrics, logs, created_incidents = await run_blocking(_simulate_sync, session)
 
         for entry in metrics[-10:]:
             await _publish_metric_entry(entry)
@@ -183,6 +173,35 @@ def create_postmortem(
     return artifacts.to_response()
 
 
+def _refresh_sync(session: Session) -> tuple[list[tuple[str, str]], list[Incident]]:
+    detector = IncidentDetector(session)
+    pairs = detector.candidate_pairs()
+    if not pairs:
+        return pairs, []
+    return pairs, detector.evaluate_metrics(pairs)
+
+
+def _simulate_sync(session: Session) -> tuple[list[MetricRow], list[LogRow], list[Incident]]:
+    if not metric_crud.list_services(session):
+        seed_sample_data(session)
+
+    before_keys = {
+        incident.incident_key for incident in incident_crud.list_active_incidents(session)
+    }
+
+    metrics, logs = _inject_payments_spike(session)
+    detector = IncidentDetector(session)
+    incidents = detector.evaluate_all_services()
+    after_keys = {
+        incident.incident_key for incident in incident_crud.list_active_incidents(session)
+    }
+    created_keys = after_keys - before_keys
+    created_incidents = [
+        incident for incident in incidents if incident.incident_key in created_keys
+    ]
+    return metrics, logs, created_incidents
+
+
 async def _broadcast_incident(incident: Incident) -> None:
     payload = {
         "incident_id": incident.id,
@@ -195,7 +214,7 @@ async def _broadcast_incident(incident: Incident) -> None:
     await event_bus.publish({"type": "incident_alert", **payload})
 
 
-async def _publish_metric_entry(entry: MetricPoint) -> None:
+async def _publish_metric_entry(entry: MetricRow) -> None:
     event = {
         "service": entry.service,
         "metric": entry.metric,
@@ -208,7 +227,7 @@ async def _publish_metric_entry(entry: MetricPoint) -> None:
 
 def _inject_payments_spike(
     session: Session, minutes: int = 5
-) -> tuple[list[MetricPoint], list[LogEntry]]:
+) -> tuple[list[MetricRow], list[LogRow]]:
     now = datetime.utcnow()
     metric_points = []
     for idx in range(minutes):
@@ -231,7 +250,7 @@ def _inject_payments_spike(
                 ),
             ]
         )
-    metrics = list(metric_crud.bulk_create_metrics(session, metric_points))
+    metrics = metric_crud.bulk_create_metrics(session, metric_points)
 
     log_payloads = []
     for idx in range(4):
@@ -246,6 +265,6 @@ def _inject_payments_spike(
                 context={"simulate": True, "step": idx},
             )
         )
-    logs = list(log_crud.bulk_create_logs(session, log_payloads))
+    logs = log_crud.bulk_create_logs(session, log_payloads)
 
     return metrics, logs
@@ -1,28 +1,67 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile
+import time
+from typing import AsyncIterator, List
+
+from fastapi import APIRouter, Depends, UploadFile
 from sqlmodel import Session
 
+from app.core.concurrency import run_blocking
 from app.crud import logs as log_crud
 from app.db.session import get_session
 from app.schemas import LogBatch, LogIngestResult
-from app.services.log_parser import parse_log_blob
+from app.services.ingest_stream import iter_lines
+from app.services.log_parser import parse_log_lines
 
 router = APIRouter(prefix="/ingest", tags=["logs"])
 
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+LOG_BATCH_LINES = 2000
+
+
+async def _read_upload(
+    file: UploadFile, chunk_bytes: int = UPLOAD_CHUNK_BYTES
+) -> AsyncIterator[bytes]:
+    while chunk := await file.read(chunk_bytes):
+        yield chunk
+
 
 @router.post("/logfile", response_model=LogIngestResult)
 async def ingest_log_file(
     file: UploadFile,
     session: Session = Depends(get_session),
 ) -> LogIngestResult:
-    content = await file.read()
-    try:
-        text = content.decode("utf-8")
-    except UnicodeDecodeError as exc:  # pragma: no cover - guardrail
-        raise HTTPException(status_code=400, detail="Invalid encoding in log file") from exc
-
-    parsed_logs = parse_log_blob(text)
-    created = log_crud.bulk_create_logs(session, parsed_logs)
-    return LogIngestResult(ingested=len(created), skipped=len(text.splitlines()) - len(created))
+    """Parse and store an uploaded log file in bounded batches of lines.
+
+    Lines that are not valid UTF-8 or cannot be parsed are counted as skipped.
+    """
+    started = time.perf_counter()
+    line_count = 0
+    ingested = 0
+    batch: List[str] = []
+
+    async for raw_line in iter_lines(_read_upload(file)):
+        line_count += 1
+        try:
+            batch.append(raw_line.decode("utf-8"))
+        except UnicodeDecodeError:
+            continue
+        if len(batch) >= LOG_BATCH_LINES:
+            ingested += await run_blocking(_store_lines, session, batch)
+            batch = []
+    if batch:
+        ingested += await run_blocking(_store_lines, session, batch)
+
+    elapsed = time.perf_counter() - started
+    return LogIngestResult(
+        ingested=ingested,
+        skipped=line_count - ingested,
+        lines=line_count,
+        duration_ms=round(elapsed * 1000, 2),
+        lines_per_sec=round(line_count / elapsed, 1) if elapsed > 0 else None,
+    )
+
+
+def _store_lines(session: Session, lines: List[str]) -> int:
+    return len(log_crud.bulk_create_logs(session, parse_log_lines(lines)))
 
 
 @router.post("/logs", response_model=LogIngestResult)
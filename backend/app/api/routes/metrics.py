@@ -1,50 +1,153 @@
-from fastapi import APIRouter, Depends
+from collections import deque
+from typing import Iterable, List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlmodel import Session
 
+from app.core.concurrency import run_blocking
 from app.crud import metrics as metric_crud
+from app.crud.metrics import MetricRow
 from app.db.session import get_session
-from app.schemas import MetricBatch, MetricIngestResult
+from app.models import Incident
+from app.schemas import (
+    IngestBufferStats,
+    MetricBatch,
+    MetricEnqueueResult,
+    MetricIngestResult,
+    MetricPointCreate,
+    MetricStreamChunk,
+    MetricStreamResult,
+)
+from app.services.detection_scheduler import detection_scheduler, incident_alert
 from app.services.event_bus import event_bus
-from app.services.incident_detector import IncidentDetector
+from app.services.ingest_buffer import IngestBuffer, IngestBufferFull, get_ingest_buffer
+from app.services.ingest_stream import iter_lines, parse_metric_line
 
 router = APIRouter(prefix="/ingest", tags=["metrics"])
 
+NDJSON_MEDIA_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl"}
+
 
 @router.post("/metrics", response_model=MetricIngestResult)
 async def ingest_metrics(
     payload: MetricBatch,
     session: Session = Depends(get_session),
 ) -> MetricIngestResult:
-    created = metric_crud.bulk_create_metrics(session, payload.metrics)
-    triggered = 0
+    created, incidents = await run_blocking(_ingest_batch, session, payload.metrics)
+    triggered = len(incidents)
     if created:
-        detector = IncidentDetector(session)
-        unique_pairs = {(entry.service, entry.metric) for entry in created}
-        incidents = detector.evaluate_metrics(unique_pairs)
-        triggered = len(incidents)
-        for entry in created[-10:]:
-            await event_bus.publish(
-                {
-                    "type": "metric_update",
-                    "service": entry.service,
-                    "metric": entry.metric,
-                    "timestamp": entry.timestamp.isoformat(),
-                    "value": entry.value,
-                }
-            )
-        for incident in incidents:
-            await event_bus.publish(
-                {
-                    "type": "incident_alert",
-                    "incident_id": incident.id,
-                    "service": incident.service,
-                    "metric": incident.metric,
-                    "severity": incident.severity,
-                    "summary": incident.summary,
-                }
-            )
+        await _publish_updates(created[-10:], incidents)
     return MetricIngestResult(
         ingested=len(created),
         skipped=len(payload.metrics) - len(created),
         incidents_triggered=triggered,
     )
+
+
+@router.post("/metrics/buffered", response_model=MetricEnqueueResult, status_code=202)
+async def enqueue_metrics(
+    payload: MetricBatch,
+    buffer: IngestBuffer = Depends(get_ingest_buffer),
+) -> MetricEnqueueResult:
+    """Hand the batch to the group-commit buffer; it is written by the next flush.
+
+    A 202 means the points are queued, not stored: a flush that keeps failing is retried
+    ``max_retries`` times and then dropped (see ``dropped_total`` on ``GET /ingest/buffer``), and
+    whatever is still buffered is lost if the process dies. Use ``POST /ingest/metrics`` when the
+    caller needs the write confirmed.
+    """
+    rows = metric_crud.metric_params(payload.metrics)
+    try:
+        depth = buffer.offer(rows)
+    except IngestBufferFull as exc:
+        raise HTTPException(status_code=429, detail=str(exc), headers={"Retry-After": "1"}) from exc
+    return MetricEnqueueResult(accepted=len(rows), pending=depth)
+
+
+@router.get("/buffer", response_model=IngestBufferStats)
+def ingest_buffer_stats(buffer: IngestBuffer = Depends(get_ingest_buffer)) -> IngestBufferStats:
+    return IngestBufferStats(**buffer.stats())
+
+
+@router.post("/metrics/stream", response_model=MetricStreamResult)
+async def ingest_metrics_stream(
+    request: Request,
+    chunk_size: int = Query(5000, ge=100, le=50000),
+    session: Session = Depends(get_session),
+) -> MetricStreamResult:
+    """Ingest an ``application/x-ndjson`` body, committing every ``chunk_size`` lines.
+
+    Lines are validated as they arrive, so memory stays proportional to one chunk rather than
+    the whole upload.
+    """
+    media_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if media_type not in NDJSON_MEDIA_TYPES:
+        raise HTTPException(status_code=415, detail="Expected application/x-ndjson body")
+
+    chunks: List[MetricStreamChunk] = []
+    pending: List[dict] = []
+    skipped = 0
+    pairs: set[tuple[str, str]] = set()
+    recent: deque[MetricRow] = deque(maxlen=10)
+
+    async def flush() -> None:
+        nonlocal pending, skipped
+        created = await run_blocking(metric_crud.insert_metric_rows, session, pending)
+        pairs.update((row.service, row.metric) for row in created)
+        recent.extend(created[-10:])
+        chunks.append(MetricStreamChunk(index=len(chunks), accepted=len(created), skipped=skipped))
+        pending, skipped = [], 0
+
+    async for line in iter_lines(request.stream()):
+        if not line.strip():
+            continue
+        params = parse_metric_line(line)
+        if params is None:
+            skipped += 1
+        else:
+            pending.append(params)
+        if len(pending) + skipped >= chunk_size:
+            await flush()
+    if pending or skipped:
+        await flush()
+
+    incidents: List[Incident] = []
+    if pairs:
+        incidents = await run_blocking(_evaluate, session, sorted(pairs))
+        await _publish_updates(recent, incidents)
+
+    return MetricStreamResult(
+        ingested=sum(chunk.accepted for chunk in chunks),
+        skipped=sum(chunk.skipped for chunk in chunks),
+        chunks=chunks,
+        incidents_triggered=len(incidents),
+    )
+
+
+def _ingest_batch(
+    session: Session, points: List[MetricPointCreate]
+) -> tuple[List[MetricRow], List[Incident]]:
+    created = metric_crud.bulk_create_metrics(session, points)
+    if not created:
+        return created, []
+    return created, _evaluate(session, {(entry.service, entry.metric) for entry in created})
+
+
+def _evaluate(session: Session, pairs: Iterable[tuple[str, str]]) -> List[Incident]:
+    # only queues the pairs while the detection scheduler runs; its alerts follow from the loop
+    return detection_scheduler.detect(session, pairs)
+
+
+async def _publish_updates(entries: Iterable[MetricRow], incidents: Iterable[Incident]) -> None:
+    for entry in entries:
+        await event_bus.publish(
+            {
+                "type": "metric_update",
+                "service": entry.service,
+                "metric": entry.metric,
+                "timestamp": entry.timestamp.isoformat(),
+                "value": entry.value,
+            }
+        )
+    for incident in incidents:
+        await event_bus.publish(incident_alert(incident))
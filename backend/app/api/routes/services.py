@@ -1,14 +1,17 @@
-import json
+from datetime import datetime, timedelta
+from typing import Literal
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.crud import logs as log_crud
-from app.crud import metrics as metric_crud
-from app.db.session import get_session
-from app.models import LogEntry
+from app.crud import aio as async_crud
+from app.crud.logs import LogRow
+from app.db.async_session import get_async_session
+from app.db.session import get_read_session
 from app.schemas import (
     LogRead,
+    MetricRangeResponse,
     ServiceLogsResponse,
     ServiceMetricsResponse,
     ServiceSummaryResponse,
@@ -19,47 +22,70 @@ router = APIRouter(prefix="/services", tags=["services"])
 
 
 @router.get("/summary", response_model=ServiceSummaryResponse)
-def services_summary(session: Session = Depends(get_session)) -> ServiceSummaryResponse:
+def services_summary(session: Session = Depends(get_read_session)) -> ServiceSummaryResponse:
     summaries = ServiceSummaryBuilder(session).build()
     return ServiceSummaryResponse(services=summaries)
 
 
 @router.get("/{service}/metrics", response_model=ServiceMetricsResponse)
-def service_metrics(
+async def service_metrics(
     service: str,
     metric: str = Query(..., description="Metric key, e.g. latency_p95_ms"),
     limit: int = Query(120, ge=10, le=500),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ) -> ServiceMetricsResponse:
-    series = metric_crud.get_metric_series(session, service=service, metric=metric, limit=limit)
+    series = await async_crud.get_metric_series(
+        session, service=service, metric=metric, limit=limit
+    )
     if not series:
         raise HTTPException(status_code=404, detail="Metric series not found")
     points = [{"timestamp": point.timestamp.isoformat(), "value": point.value} for point in series]
     return ServiceMetricsResponse(service=service, metric=metric, points=points)
 
 
+@router.get("/{service}/metrics/range", response_model=MetricRangeResponse)
+async def service_metric_range(
+    service: str,
+    metric: str = Query(..., description="Metric key, e.g. latency_p95_ms"),
+    start: datetime | None = Query(None, description="Window start; defaults to end - 24h"),
+    end: datetime | None = Query(None, description="Window end; defaults to now (UTC)"),
+    points: int = Query(300, ge=10, le=2000, description="Minimum points wanted in the window"),
+    session: AsyncSession = Depends(get_async_session),
+) -> MetricRangeResponse:
+    end = end or datetime.utcnow()
+    start = start or end - timedelta(hours=24)
+    if start >= end:
+        raise HTTPException(status_code=422, detail="start must be before end")
+    resolution, rows = await async_crud.get_metric_range(
+        session, service=service, metric=metric, window_start=start, window_end=end, points=points
+    )
+    return MetricRangeResponse(
+        service=service,
+        metric=metric,
+        resolution_seconds=resolution,
+        points=[{**row._asdict(), "timestamp": row.timestamp.isoformat()} for row in rows],
+    )
+
+
 @router.get("/{service}/logs", response_model=ServiceLogsResponse)
-def service_logs(
+async def service_logs(
     service: str,
     level: str | None = None,
-    query: str | None = None,
+    query: str | None = Query(
+        None, description='Full-text search: words are ANDed, "quoted phrase", prefix*'
+    ),
+    sort: Literal["time", "relevance"] = Query("time", description="Order of a query's matches"),
     limit: int = Query(100, ge=10, le=500),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ) -> ServiceLogsResponse:
-    logs = log_crud.list_recent_logs(
-        session, service=service, level=level, query=query, limit=limit
+    logs = await async_crud.list_recent_logs(
+        session, service=service, level=level, query=query, limit=limit, sort=sort
     )
     items = [_serialize_log(entry) for entry in logs]
     return ServiceLogsResponse(service=service, items=items)
 
 
-def _serialize_log(entry: LogEntry) -> LogRead:
-    context = None
-    if entry.context:
-        try:
-            context = json.loads(entry.context)
-        except json.JSONDecodeError:
-            context = {"raw": entry.context}
+def _serialize_log(entry: LogRow) -> LogRead:
     return LogRead(
         id=entry.id,
         timestamp=entry.timestamp,
@@ -68,5 +94,5 @@ def _serialize_log(entry: LogEntry) -> LogRead:
         request_id=entry.request_id,
         message=entry.message,
         latency_ms=entry.latency_ms,
-        context=context,
+        context=entry.context,
     )
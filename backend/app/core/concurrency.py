@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, TypeVar
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+# Sync SQLModel sessions and detection run here instead of on the event loop. The pool is kept
+# separate from Starlette's default threadpool so a burst of slow refreshes cannot starve the
+# threads that serve plain sync routes.
+_executor = ThreadPoolExecutor(
+    max_workers=settings.blocking_pool_workers, thread_name_prefix="signalsentry-blocking"
+)
+_state: Dict[str, int] = {"submitted": 0, "active": 0, "max_active": 0}
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run ``func`` on the bounded blocking pool and await its result."""
+    loop = asyncio.get_running_loop()
+    _state["submitted"] += 1
+    _state["active"] += 1
+    _state["max_active"] = max(_state["max_active"], _state["active"])
+    try:
+        return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+    finally:
+        _state["active"] -= 1
+
+
+def blocking_pool_stats() -> Dict[str, int]:
+    return {**_state, "workers": settings.blocking_pool_workers}
@@ -1,5 +1,5 @@
 from functools import lru_cache
-from typing import List
+from typing import List, Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -11,9 +11,62 @@ class Settings(BaseSettings):
     environment: str = "local"
     debug: bool = True
     database_url: str = "sqlite:////var/lib/signalsentry/signalsentry.db"
+    sqlite_production_mode: bool = True
+    sqlite_reader_pool_size: int = 8
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_cache_size_kib: int = 65536
+    sqlite_mmap_size_mb: int = 256
+    async_database_url: Optional[str] = None
+    async_sqlite_driver: str = "aiosqlite"
+    async_postgres_driver: str = "asyncpg"
     log_level: str = "INFO"
     allowed_origins: List[str] = ["*"]
     postmortem_export_dir: str = "./exports"
+    ingest_buffer_capacity: int = 100_000
+    ingest_buffer_flush_rows: int = 5000
+    ingest_buffer_flush_interval_ms: int = 200
+    ingest_buffer_max_retries: int = 3
+    blocking_pool_workers: int = 8
+    loop_lag_interval_ms: int = 100
+    loop_lag_warn_ms: int = 100
+    hot_store_enabled: bool = True
+    hot_store_capacity: int = 720
+    hot_store_max_series: int = 5000
+    detection_workers: int = 0
+    detection_parallel_min_series: int = 2000
+    detection_scheduler_enabled: bool = True
+    detection_tick_ms: int = 1000
+    detection_debounce_ms: int = 2000
+    detection_max_latency_ms: int = 10_000
+    detection_max_series_per_tick: int = 2000
+    series_registry_ttl_seconds: int = 30
+    online_detector_enabled: bool = True
+    online_detector_max_series: int = 5000
+    online_detector_persist_seconds: int = 60
+    segment_store_enabled: bool = False
+    segment_store_dir: str = "./segments"
+    segment_store_services: List[str] = []
+    segment_max_bytes: int = 64 * 1024 * 1024
+    segment_index_every: int = 1024
+    metric_chunk_seconds: int = 3600
+    compaction_enabled: bool = True
+    compaction_delay_minutes: int = 120
+    compaction_interval_minutes: int = 30
+    cold_tier_enabled: bool = False
+    cold_tier_dir: str = "./cold"
+    cold_tier_hot_days: int = 2
+    cold_tier_keep_days: int = 365
+    cold_tier_batch_rows: int = 50_000
+    cold_tier_interval_minutes: int = 60
+    retention_enabled: bool = True
+    retention_interval_minutes: int = 60
+    retention_chunk_rows: int = 5000
+    retention_metrics_days: int = 7
+    retention_rollups_days: int = 90
+    retention_info_logs_days: int = 3
+    retention_error_logs_days: int = 30
+    retention_resolved_incidents_days: int = 30
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
 
@@ -1,3 +1,3 @@
-from . import incidents, logs, metrics
+from . import aio, incidents, logs, metrics, rollups
 
-__all__ = ["incidents", "logs", "metrics"]
+__all__ = ["aio", "incidents", "logs", "metrics", "rollups"]
@@ -0,0 +1,172 @@
+"""Async variants of the hot CRUD paths.
+
+Each function builds the same statements as its sync counterpart in ``app.crud.metrics``,
+``app.crud.logs``, ``app.crud.rollups`` or ``app.crud.incidents`` and only differs in how they
+are executed, so both stacks stay behaviourally identical.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.crud.chunks import chunk_page_statement, chunk_window_statement
+from app.crud.dimensions import dimension_cache, series_ids, service_ids
+from app.crud.incidents import batch_params, incidents_statement, upsert_statement
+from app.crud.logs import (
+    LogRow,
+    entry_params,
+    log_params,
+    log_rows,
+    recent_logs_statement,
+    search_windows,
+)
+from app.crud.metrics import (
+    MetricRow,
+    SeriesTail,
+    merge_window,
+    metric_params,
+    metric_rows,
+    point_params,
+    segment_rows,
+    series_pairs,
+    series_statement,
+    window_statement,
+)
+from app.crud.rollups import (
+    RAW_RESOLUTION,
+    RangePoint,
+    apply_rollups_async,
+    choose_resolution,
+    naive_utc,
+    range_points,
+    range_statement,
+)
+from app.crud.series import register_params, register_statement, series_deltas, series_registry
+from app.db.bulk import bulk_insert_async
+from app.models import Incident, LogEntry, MetricPoint
+from app.schemas import LogCreate, MetricPointCreate
+from app.services.anomaly import AnomalyAssessment
+from app.services.hot_store import hot_store
+from app.services.online_detector import online_detector
+from app.services.segment_store import segment_store
+
+
+async def bulk_create_metrics(
+    session: AsyncSession, metric_points: Iterable[MetricPointCreate]
+) -> List[MetricRow]:
+    return await insert_metric_rows(session, metric_params(metric_points))
+
+
+async def insert_metric_rows(
+    session: AsyncSession, params: Sequence[Dict[str, Any]]
+) -> List[MetricRow]:
+    if not params:
+        return []
+
+    keys = await session.run_sync(series_ids, series_pairs(params))
+    table = MetricPoint.__table__
+    ids = await bulk_insert_async(
+        session, table, point_params(params, keys), returning=[table.c.id]
+    )
+    await apply_rollups_async(session, params)
+    deltas = series_deltas(params)
+    await session.execute(register_statement(), register_params(deltas, keys))
+    await session.commit()
+    dimension_cache.remember(series=keys)
+    series_registry.apply(deltas)
+
+    rows = metric_rows(ids, params)
+    hot_store.extend(rows)
+    online_detector.extend(rows)
+    segment_store.append(rows)
+    return rows
+
+
+async def get_metric_series(
+    session: AsyncSession, service: str, metric: str, limit: int = 200
+) -> List[MetricRow]:
+    arrays = segment_store.tail(service, metric, limit)
+    if arrays is not None:
+        return segment_rows(service, metric, arrays)
+    tail = SeriesTail((await session.exec(series_statement(service, metric, limit))).all(), limit)
+    while not tail.done:
+        page = (await session.exec(chunk_page_statement(service, metric, tail.before))).all()
+        tail.feed(page)
+    return tail.series()
+
+
+async def get_latest_metric(
+    session: AsyncSession, service: str, metric: str
+) -> Optional[MetricRow]:
+    series = await get_metric_series(session, service, metric, limit=1)
+    return series[-1] if series else None
+
+
+async def get_metric_range(
+    session: AsyncSession,
+    service: str,
+    metric: str,
+    window_start: datetime,
+    window_end: datetime,
+    points: int = 300,
+) -> Tuple[int, List[RangePoint]]:
+    resolution = choose_resolution(window_start, window_end, points)
+    if resolution == RAW_RESOLUTION:
+        lower, upper = naive_utc(window_start), naive_utc(window_end)
+        raw = (await session.exec(window_statement(service, metric, lower, upper, None))).all()
+        chunks = (await session.exec(chunk_window_statement(service, metric, lower, upper))).all()
+        rows = merge_window(raw, chunks, lower, upper, None)
+    else:
+        statement = range_statement(service, metric, window_start, window_end, resolution)
+        rows = (await session.exec(statement)).all()
+    return resolution, range_points(resolution, rows)
+
+
+async def bulk_create_logs(session: AsyncSession, logs: Iterable[LogCreate]) -> List[LogRow]:
+    params = log_params(logs)
+    if not params:
+        return []
+
+    keys = await session.run_sync(service_ids, {item["service"] for item in params})
+    table = LogEntry.__table__
+    ids = await bulk_insert_async(
+        session, table, entry_params(params, keys), returning=[table.c.id]
+    )
+    await session.commit()
+    dimension_cache.remember(services=keys)
+
+    return log_rows(ids, params)
+
+
+async def list_recent_logs(
+    session: AsyncSession,
+    service: str,
+    level: Optional[str] = None,
+    query: Optional[str] = None,
+    limit: int = 100,
+    sort: str = "time",
+) -> List[LogRow]:
+    dialect = session.bind.dialect
+    for window in search_windows(query, sort):
+        statement = recent_logs_statement(dialect, service, level, query, limit, sort, window)
+        rows = [LogRow(*row) for row in (await session.exec(statement)).all()]
+        if len(rows) == limit:
+            break
+    return rows if sort == "relevance" and query else list(reversed(rows))
+
+
+async def upsert_incident(
+    session: AsyncSession,
+    incident_key: str,
+    service: str,
+    metric: str,
+    assessment: AnomalyAssessment,
+) -> Incident:
+    (params,) = batch_params([(incident_key, service, metric, assessment)])
+    result = await session.execute(upsert_statement(session.bind.dialect, params))
+    ids = [row_id for row_id, _ in result]
+    await session.commit()
+    return (await session.exec(incidents_statement(ids))).one()
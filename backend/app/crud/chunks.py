@@ -0,0 +1,137 @@
+"""Sealed, compressed metric chunks.
+
+Compaction moves raw ``metrics`` rows older than the sealing horizon into one Gorilla-encoded
+``metric_chunks`` row per series and ``metric_chunk_seconds`` slice. The read functions in
+``app.crud.metrics`` merge decoded chunks with raw rows, so callers see one series no matter
+where its points live.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import datetime
+from operator import itemgetter
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func
+from sqlmodel import Session, select
+from sqlmodel.sql.expression import SelectOfScalar
+
+from app.core.config import settings
+from app.crud.dimensions import named_series, series_key
+from app.crud.rollups import bucket_start
+from app.db.chunk_codec import decode_chunk, encode_chunk, from_micros, to_micros
+from app.models import MetricChunk, MetricPoint, Series
+
+# chunks fetched per round trip while walking a series backwards
+CHUNK_PAGE = 8
+_DELETE_BATCH = 500
+
+Point = Tuple[int, float]
+
+
+def chunk_points(chunk: MetricChunk) -> List[Tuple[datetime, float]]:
+    timestamps, values = decode_chunk(chunk.payload)
+    return [(from_micros(ts), value) for ts, value in zip(timestamps, values, strict=True)]
+
+
+def chunk_page_statement(
+    service: str, metric: str, before: Optional[datetime] = None
+) -> SelectOfScalar[MetricChunk]:
+    """Newest-first page of chunks, optionally only those starting before ``before``."""
+    statement = select(MetricChunk).where(
+        MetricChunk.service == service, MetricChunk.metric == metric
+    )
+    if before is not None:
+        statement = statement.where(MetricChunk.chunk_start < before)
+    return statement.order_by(MetricChunk.chunk_start.desc()).limit(CHUNK_PAGE)
+
+
+def chunk_window_statement(
+    service: str, metric: str, lower: datetime, upper: datetime
+) -> SelectOfScalar[MetricChunk]:
+    return (
+        select(MetricChunk)
+        .where(
+            MetricChunk.service == service,
+            MetricChunk.metric == metric,
+            MetricChunk.chunk_start >= bucket_start(lower, settings.metric_chunk_seconds),
+            MetricChunk.chunk_start <= upper,
+        )
+        .order_by(MetricChunk.chunk_start)
+    )
+
+
+def sealable_series(session: Session, before: datetime) -> List[Tuple[str, str]]:
+    due = select(MetricPoint.series_id).where(MetricPoint.timestamp < before).distinct()
+    statement = named_series().where(Series.id.in_(due))
+    return [(service, metric) for _, service, metric in session.exec(statement).all()]
+
+
+def seal_series(session: Session, service: str, metric: str, before: datetime) -> Dict[str, int]:
+    """Fold raw points of one series older than ``before`` into chunks; the caller commits.
+
+    Points that arrive late for an already sealed slice are merged into its existing chunk.
+    """
+    statement = (
+        select(MetricPoint.id, MetricPoint.timestamp, MetricPoint.value)
+        .where(MetricPoint.series_id == series_key(service, metric), MetricPoint.timestamp < before)
+        .order_by(MetricPoint.timestamp)
+    )
+    rows = session.exec(statement).all()
+    if not rows:
+        return {"points": 0, "chunks": 0, "bytes": 0}
+
+    slices: Dict[datetime, List[Point]] = defaultdict(list)
+    for _, timestamp, value in rows:
+        slices[bucket_start(timestamp, settings.metric_chunk_seconds)].append(
+            (to_micros(timestamp), value)
+        )
+    existing = {
+        chunk.chunk_start: chunk
+        for chunk in session.exec(
+            select(MetricChunk).where(
+                MetricChunk.service == service,
+                MetricChunk.metric == metric,
+                MetricChunk.chunk_start.in_(list(slices)),
+            )
+        ).all()
+    }
+
+    written = 0
+    for start, points in slices.items():
+        chunk = existing.get(start)
+        if chunk is not None:
+            timestamps, values = decode_chunk(chunk.payload)
+            points = sorted([*zip(timestamps, values, strict=True), *points], key=itemgetter(0))
+        else:
+            chunk = MetricChunk(service=service, metric=metric, chunk_start=start)
+        chunk.payload = encode_chunk([ts for ts, _ in points], [value for _, value in points])
+        chunk.count = len(points)
+        chunk.end_time = from_micros(points[-1][0])
+        session.add(chunk)
+        written += len(chunk.payload)
+
+    ids = [row[0] for row in rows]
+    for offset in range(0, len(ids), _DELETE_BATCH):
+        batch = ids[offset : offset + _DELETE_BATCH]
+        session.exec(delete(MetricPoint).where(MetricPoint.id.in_(batch)))
+    return {"points": len(rows), "chunks": len(slices), "bytes": written}
+
+
+def storage_stats(session: Session) -> Dict[str, object]:
+    chunks, points, payload = session.exec(
+        select(
+            func.count(MetricChunk.id),
+            func.coalesce(func.sum(MetricChunk.count), 0),
+            func.coalesce(func.sum(func.length(MetricChunk.payload)), 0),
+        )
+    ).one()
+    raw_rows = session.exec(select(func.count(MetricPoint.id))).one()
+    return {
+        "chunks": chunks,
+        "chunk_points": points,
+        "chunk_bytes": payload,
+        "bytes_per_point": round(payload / points, 3) if points else None,
+        "raw_points": raw_rows,
+    }
@@ -0,0 +1,161 @@
+"""Interned service, metric and series keys.
+
+Raw ``metrics`` rows carry a ``series_id`` and ``logs`` rows a ``service_id`` instead of
+repeating the names. Writers resolve names through :data:`dimension_cache`, a process-local map
+that only goes to the database for names it has not seen yet; readers keep passing names and
+the statements look the key up inside the query (:func:`series_key`, :func:`service_key`), so
+the CRUD API is unchanged.
+
+Keys are only cached after the writing transaction commits, so a rolled-back insert never leaves
+an id behind that the database does not have.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Dict, Iterable, List, Mapping, Set, Tuple
+
+from sqlalchemy import Select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Dialect
+from sqlalchemy.sql.dml import Insert
+from sqlalchemy.sql.elements import ColumnElement
+from sqlmodel import Session, select
+
+from app.models import MetricName, Series, Service
+
+SeriesKey = Tuple[str, str]
+
+
+class DimensionCache:
+    def __init__(self) -> None:
+        self._services: Dict[str, int] = {}
+        self._series: Dict[SeriesKey, int] = {}
+        self._lock = threading.Lock()
+
+    def services(self, names: Iterable[str]) -> Tuple[Dict[str, int], Set[str]]:
+        """Known ids for ``names`` and the names that still need a database lookup."""
+        known: Dict[str, int] = {}
+        missing: Set[str] = set()
+        for name in names:
+            key = self._services.get(name)
+            if key is None:
+                missing.add(name)
+            else:
+                known[name] = key
+        return known, missing
+
+    def series(self, pairs: Iterable[SeriesKey]) -> Tuple[Dict[SeriesKey, int], Set[SeriesKey]]:
+        known: Dict[SeriesKey, int] = {}
+        missing: Set[SeriesKey] = set()
+        for pair in pairs:
+            key = self._series.get(pair)
+            if key is None:
+                missing.add(pair)
+            else:
+                known[pair] = key
+        return known, missing
+
+    def remember(
+        self,
+        services: Mapping[str, int] | None = None,
+        series: Mapping[SeriesKey, int] | None = None,
+    ) -> None:
+        """Cache committed keys."""
+        with self._lock:
+            self._services.update(services or {})
+            self._series.update(series or {})
+
+    def clear(self) -> None:
+        with self._lock:
+            self._services.clear()
+            self._series.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"services": len(self._services), "series": len(self._series)}
+
+
+dimension_cache = DimensionCache()
+
+
+def _insert_missing(dialect: Dialect, model: type, columns: List[str]) -> Insert:
+    table = model.__table__
+    if dialect.name == "postgresql":
+        statement = postgresql.insert(table)
+    elif dialect.name == "sqlite":
+        statement = sqlite.insert(table)
+    else:
+        raise NotImplementedError(f"dimension insert is not supported on {dialect.name!r}")
+    return statement.on_conflict_do_nothing(index_elements=[table.c[name] for name in columns])
+
+
+def _name_ids(session: Session, model: type, names: Set[str]) -> Dict[str, int]:
+    # sorted so concurrent writers take the unique index locks in the same order on Postgres
+    session.execute(
+        _insert_missing(session.get_bind().dialect, model, ["name"]),
+        [{"name": name} for name in sorted(names)],
+    )
+    rows = session.exec(select(model.name, model.id).where(model.name.in_(sorted(names)))).all()
+    return {name: key for name, key in rows}
+
+
+def service_ids(session: Session, names: Iterable[str]) -> Dict[str, int]:
+    """``services.id`` for every name, creating missing rows without committing.
+
+    Pass the result to :meth:`DimensionCache.remember` once the caller has committed.
+    """
+    known, missing = dimension_cache.services(names)
+    if missing:
+        known.update(_name_ids(session, Service, missing))
+    return known
+
+
+def series_ids(session: Session, pairs: Iterable[SeriesKey]) -> Dict[SeriesKey, int]:
+    """``series.id`` for every (service, metric) pair, creating missing rows without committing.
+
+    Pass the result to :meth:`DimensionCache.remember` once the caller has committed.
+    """
+    known, missing = dimension_cache.series(pairs)
+    if not missing:
+        return known
+
+    services = _name_ids(session, Service, {service for service, _ in missing})
+    metrics = _name_ids(session, MetricName, {metric for _, metric in missing})
+    wanted = {
+        (services[service], metrics[metric]): (service, metric) for service, metric in missing
+    }
+    session.execute(
+        _insert_missing(session.get_bind().dialect, Series, ["service_id", "metric_id"]),
+        [{"service_id": service, "metric_id": metric} for service, metric in sorted(wanted)],
+    )
+    rows = session.exec(
+        select(Series.service_id, Series.metric_id, Series.id).where(
+            tuple_(Series.service_id, Series.metric_id).in_(list(wanted))
+        )
+    ).all()
+    known.update({wanted[(service, metric)]: key for service, metric, key in rows})
+    return known
+
+
+def service_key(service: str) -> ColumnElement[int]:
+    """``services.id`` of ``service`` looked up inside the query (``NULL`` when unknown)."""
+    return select(Service.id).where(Service.name == service).scalar_subquery()
+
+
+def series_key(service: str, metric: str) -> ColumnElement[int]:
+    """``series.id`` of (``service``, ``metric``) looked up inside the query."""
+    metric_key = select(MetricName.id).where(MetricName.name == metric).scalar_subquery()
+    return (
+        select(Series.id)
+        .where(Series.service_id == service_key(service), Series.metric_id == metric_key)
+        .scalar_subquery()
+    )
+
+
+def named_series() -> Select:
+    """``(series.id, service, metric)`` for every series."""
+    return (
+        select(Series.id, Service.name, MetricName.name)
+        .join(Service, Service.id == Series.service_id)
+        .join(MetricName, MetricName.id == Series.metric_id)
+    )
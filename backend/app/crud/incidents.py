@@ -1,39 +1,36 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import List, Sequence, Tuple
+from typing import Any, Dict, List, Sequence, Tuple
 
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Dialect
+from sqlalchemy.sql.dml import Insert
 from sqlmodel import Session, select
+from sqlmodel.sql.expression import SelectOfScalar
 
-from app.models import Incident, MetricPoint
+from app.crud.series import series_registry
+from app.models import Incident
 from app.services.anomaly import AnomalyAssessment
 
 TrackedMetric = Tuple[str, str]
 
 
-def upsert_incident(
-    session: Session,
+def open_incident_statement(incident_key: str) -> SelectOfScalar[Incident]:
+    return select(Incident).where(Incident.incident_key == incident_key, Incident.status == "open")
+
+
+def apply_assessment(
+    incident: Incident | None,
     incident_key: str,
     service: str,
     metric: str,
     assessment: AnomalyAssessment,
 ) -> Incident:
-    statement = select(Incident).where(
-        Incident.incident_key == incident_key, Incident.status == "open"
-    )
-    incident = session.exec(statement).first()
-
-    if incident:
-        incident.severity = assessment.severity
-        incident.window_start = assessment.window_start
-        incident.window_end = assessment.window_end
-        incident.baseline = assessment.baseline
-        incident.observed = assessment.observed
-        incident.summary = assessment.summary
-        incident.detector = assessment.detector
-        incident.updated_at = datetime.utcnow()
-    else:
-        incident = Incident(
+    """Refresh an open incident from ``assessment``, or build a new one when there is none."""
+    if incident is None:
+        return Incident(
             incident_key=incident_key,
             service=service,
             metric=metric,
@@ -45,13 +42,167 @@ def upsert_incident(
             detector=assessment.detector,
             summary=assessment.summary,
         )
-        session.add(incident)
 
-    session.commit()
-    session.refresh(incident)
+    incident.severity = assessment.severity
+    incident.window_start = assessment.window_start
+    incident.window_end = assessment.window_end
+    incident.baseline = assessment.baseline
+    incident.observed = assessment.observed
+    incident.summary = assessment.summary
+    incident.detector = assessment.detector
+    incident.updated_at = datetime.utcnow()
     return incident
 
 
+# refreshed from the new assessment when an open incident already holds the key
+REFRESHED = (
+    "severity",
+    "window_start",
+    "window_end",
+    "baseline",
+    "observed",
+    "summary",
+    "detector",
+    "updated_at",
+)
+# incidents per upsert statement; thirteen bind parameters each
+INCIDENT_BATCH = 500
+
+
+def supports_upsert(dialect: Dialect) -> bool:
+    return dialect.name in ("postgresql", "sqlite")
+
+
+def incident_params(
+    incident_key: str, service: str, metric: str, assessment: AnomalyAssessment, now: datetime
+) -> Dict[str, Any]:
+    return {
+        "incident_key": incident_key,
+        "service": service,
+        "metric": metric,
+        "severity": assessment.severity,
+        "detected_at": now,
+        "window_start": assessment.window_start,
+        "window_end": assessment.window_end,
+        "baseline": assessment.baseline,
+        "observed": assessment.observed,
+        "detector": assessment.detector,
+        "summary": assessment.summary,
+        "status": "open",
+        "updated_at": now,
+    }
+
+
+def upsert_statement(dialect: Dialect, params: Sequence[Dict[str, Any]]) -> Insert:
+    """Insert ``params`` as open incidents, refreshing the open incident of any key that has
+    one (``params`` must not repeat a key); returns ``(id, incident_key)`` per row."""
+    table = Incident.__table__
+    if dialect.name == "postgresql":
+        statement = postgresql.insert(table)
+    elif dialect.name == "sqlite":
+        statement = sqlite.insert(table)
+    else:
+        raise NotImplementedError(f"incident upsert is not supported on {dialect.name!r}")
+    statement = statement.values(list(params))
+    return statement.on_conflict_do_update(
+        index_elements=[table.c.incident_key],
+        # literal, so the conflict target matches the partial index predicate
+        index_where=text("status = 'open'"),
+        set_={name: statement.excluded[name] for name in REFRESHED},
+    ).returning(table.c.id, table.c.incident_key)
+
+
+def batch_params(
+    assessments: Sequence[Tuple[str, str, str, AnomalyAssessment]],
+) -> List[List[Dict[str, Any]]]:
+    """Upsert parameters for ``(incident_key, service, metric, assessment)``, the last assessment
+    winning per key, in statement-sized batches."""
+    now = datetime.utcnow()
+    latest = {
+        key: incident_params(key, service, metric, assessment, now)
+        for key, service, metric, assessment in assessments
+    }
+    # sorted so concurrent writers take the unique index locks in the same order on Postgres
+    params = [latest[key] for key in sorted(latest)]
+    return [params[i : i + INCIDENT_BATCH] for i in range(0, len(params), INCIDENT_BATCH)]
+
+
+def incidents_statement(ids: Sequence[int]) -> SelectOfScalar[Incident]:
+    # populate_existing refreshes incidents the session already holds
+    return (
+        select(Incident).where(Incident.id.in_(list(ids))).execution_options(populate_existing=True)
+    )
+
+
+def upsert_incident(
+    session: Session,
+    incident_key: str,
+    service: str,
+    metric: str,
+    assessment: AnomalyAssessment,
+) -> Incident:
+    return _upsert(session, [(incident_key, service, metric, assessment)])[0]
+
+
+def upsert_incidents(
+    session: Session, assessments: Sequence[Tuple[str, str, AnomalyAssessment]]
+) -> List[Incident]:
+    """:func:`upsert_incident` for many ``(service, metric, assessment)`` in one transaction."""
+    return _upsert(
+        session,
+        [
+            (f"{service}:{metric}", service, metric, assessment)
+            for service, metric, assessment in assessments
+        ],
+    )
+
+
+def _upsert(
+    session: Session, assessments: Sequence[Tuple[str, str, str, AnomalyAssessment]]
+) -> List[Incident]:
+    if not assessments:
+        return []
+    dialect = session.get_bind().dialect
+    if not supports_upsert(dialect):
+        return _upsert_loaded(session, assessments)
+
+    ids: Dict[str, int] = {}
+    for params in batch_params(assessments):
+        ids.update(
+            {key: row_id for row_id, key in session.execute(upsert_statement(dialect, params))}
+        )
+    session.commit()
+    incidents = {
+        incident.incident_key: incident
+        for incident in session.exec(incidents_statement(list(ids.values())))
+    }
+    return [incidents[key] for key, _, _, _ in assessments]
+
+
+def _upsert_loaded(
+    session: Session, assessments: Sequence[Tuple[str, str, str, AnomalyAssessment]]
+) -> List[Incident]:
+    # dialects without ON CONFLICT: load the open incidents, apply, commit once
+    keys = [key for key, _, _, _ in assessments]
+    existing: Dict[str, Incident] = {}
+    statement = (
+        select(Incident)
+        .where(Incident.incident_key.in_(keys), Incident.status == "open")
+        .order_by(Incident.id)
+    )
+    for incident in session.exec(statement):
+        existing.setdefault(incident.incident_key, incident)
+    incidents = []
+    for key, service, metric, assessment in assessments:
+        incident = apply_assessment(existing.get(key), key, service, metric, assessment)
+        existing[key] = incident
+        incidents.append(incident)
+    session.add_all(incidents)
+    session.commit()
+    session.exec(incidents_statement([incident.id for incident in incidents])).all()
+    return incidents
+
+
 def list_tracked_metrics(session: Session) -> List[TrackedMetric]:
     statement = select(Incident.service, Incident.metric).distinct()
     rows = session.exec(statement).all()
@@ -86,13 +237,8 @@ def resolve_incident(session: Session, incident_id: int) -> Incident | None:
 
 
 def list_service_metrics(session: Session, metrics: Sequence[str]) -> List[TrackedMetric]:
-    statement = select(MetricPoint.service, MetricPoint.metric).distinct()
-    rows = session.exec(statement).all()
-    tracked: List[TrackedMetric] = []
-    seen: set[TrackedMetric] = set()
-    for service, metric in rows:
-        pair = (service, metric)
-        if metric in metrics and pair not in seen:
-            tracked.append(pair)
-            seen.add(pair)
-    return tracked
+    return sorted(
+        (info.service, info.metric)
+        for info in series_registry.entries(session)
+        if info.metric in metrics
+    )
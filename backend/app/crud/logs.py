@@ -1,54 +1,106 @@
-import json
 from datetime import datetime, timedelta
-from typing import Iterable, List, Optional, Sequence
+from operator import attrgetter
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
 
-from sqlalchemy import func
+from sqlalchemy import Select, String, func, literal
+from sqlalchemy.engine import Dialect
 from sqlmodel import Session, select
 
+from app.crud.dimensions import dimension_cache, service_ids, service_key
+from app.db import log_search
+from app.db.bulk import bulk_insert
 from app.models import LogEntry
 from app.schemas import LogCreate
+from app.services.cold_tier import cold_tier
+
+# newest rows per service searched before falling back to the whole full-text index
+SEARCH_WINDOWS = (2_000, 20_000)
+
+
+class LogRow(NamedTuple):
+    """Lightweight, detached view of a log entry."""
+
+    id: Optional[int]
+    service: str
+    level: str
+    timestamp: datetime
+    request_id: Optional[str]
+    message: str
+    latency_ms: Optional[float]
+    context: Optional[Dict[str, Any]]
+
+
+def _row_columns(service: str) -> tuple:
+    # rows only store the service key; the name comes back as a literal so results stay LogRows
+    return (
+        LogEntry.id,
+        literal(service, String).label("service"),
+        LogEntry.level,
+        LogEntry.timestamp,
+        LogEntry.request_id,
+        LogEntry.message,
+        LogEntry.latency_ms,
+        LogEntry.context,
+    )
 
 
 def create_log(session: Session, log_in: LogCreate) -> LogEntry:
+    keys = service_ids(session, [log_in.service])
     entry = LogEntry(
-        service=log_in.service,
+        service_id=keys[log_in.service],
         level=log_in.level.upper(),
         timestamp=log_in.timestamp,
         request_id=log_in.request_id,
         message=log_in.message,
         latency_ms=log_in.latency_ms,
-        context=json.dumps(log_in.context) if log_in.context else None,
+        context=log_in.context or None,
     )
     session.add(entry)
     session.commit()
+    dimension_cache.remember(services=keys)
     session.refresh(entry)
     return entry
 
 
-def bulk_create_logs(session: Session, logs: Iterable[LogCreate]) -> Sequence[LogEntry]:
-    entries = [
-        LogEntry(
-            service=log.service,
-            level=log.level.upper(),
-            timestamp=log.timestamp,
-            request_id=log.request_id,
-            message=log.message,
-            latency_ms=log.latency_ms,
-            context=json.dumps(log.context) if log.context else None,
-        )
+def log_params(logs: Iterable[LogCreate]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "service": log.service,
+            "level": log.level.upper(),
+            "timestamp": log.timestamp,
+            "request_id": log.request_id,
+            "message": log.message,
+            "latency_ms": log.latency_ms,
+            "context": log.context or None,
+        }
         for log in logs
     ]
 
-    if not entries:
+
+def entry_params(params: Sequence[Dict[str, Any]], keys: Dict[str, int]) -> List[Dict[str, Any]]:
+    """``logs`` table rows for name-keyed ``params``."""
+    return [
+        {"service_id": keys[item["service"]], **{k: v for k, v in item.items() if k != "service"}}
+        for item in params
+    ]
+
+
+def log_rows(ids: Sequence[tuple], params: Sequence[Dict[str, Any]]) -> List[LogRow]:
+    return [LogRow(id=row_id, **item) for (row_id,), item in zip(ids, params, strict=True)]
+
+
+def bulk_create_logs(session: Session, logs: Iterable[LogCreate]) -> List[LogRow]:
+    params = log_params(logs)
+    if not params:
         return []
 
-    session.add_all(entries)
+    keys = service_ids(session, {item["service"] for item in params})
+    table = LogEntry.__table__
+    ids = bulk_insert(session, table, entry_params(params, keys), returning=[table.c.id])
     session.commit()
+    dimension_cache.remember(services=keys)
 
-    for entry in entries:
-        session.refresh(entry)
-
-    return entries
+    return log_rows(ids, params)
 
 
 def get_logs_for_window(
@@ -58,20 +110,95 @@ def get_logs_for_window(
     window_end: datetime,
     limit: int = 200,
     padding_minutes: int = 5,
-) -> List[LogEntry]:
+) -> List[LogRow]:
     lower = window_start - timedelta(minutes=padding_minutes)
     upper = window_end + timedelta(minutes=padding_minutes)
     statement = (
-        select(LogEntry)
+        select(*_row_columns(service))
         .where(
-            LogEntry.service == service,
+            LogEntry.service_id == service_key(service),
             LogEntry.timestamp >= lower,
             LogEntry.timestamp <= upper,
         )
         .order_by(LogEntry.timestamp)
         .limit(limit)
     )
-    return session.exec(statement).all()
+    rows = [LogRow(*row) for row in session.exec(statement).all()]
+    if not cold_tier.covers(lower):
+        return rows
+    archived = [
+        LogRow(id=None, service=service, **entry)
+        for entry in cold_tier.log_entries(service, lower, upper, limit)
+    ]
+    return sorted(archived + rows, key=attrgetter("timestamp"))[:limit]
+
+
+def recent_logs_statement(
+    dialect: Dialect,
+    service: str,
+    level: Optional[str],
+    query: Optional[str],
+    limit: int,
+    sort: str = "time",
+    window: Optional[int] = None,
+) -> Select:
+    """Page of a service's logs, newest first or (with a query) best match first.
+
+    ``query`` goes through the full-text index (see ``app.db.log_search``); ``window`` restricts
+    the search to the service's newest ``window`` rows. Callers reverse a time-sorted page into
+    time order.
+    """
+    terms = log_search.parse_query(query) if query else []
+    if not terms:
+        statement = select(*_row_columns(service)).where(
+            LogEntry.service_id == service_key(service)
+        )
+        if level:
+            statement = statement.where(LogEntry.level == level.upper())
+        return statement.order_by(LogEntry.timestamp.desc()).limit(limit)
+
+    if window is not None:
+        # walk the service's newest rows by primary key and look their ids up in one slice of
+        # the index; the cost is bounded by the window however common the words are
+        recent = select(LogEntry.id).where(LogEntry.service_id == service_key(service))
+        if level:
+            recent = recent.where(LogEntry.level == level.upper())
+        recent = recent.order_by(LogEntry.timestamp.desc()).limit(window).cte("recent")
+        id_range = (
+            select(func.min(recent.c.id)).scalar_subquery(),
+            select(func.max(recent.c.id)).scalar_subquery(),
+        )
+        statement = (
+            select(*_row_columns(service))
+            .select_from(recent)
+            .join(LogEntry, LogEntry.id == recent.c.id)
+            .where(log_search.match_clause(dialect, LogEntry.id, terms, id_range))
+        )
+    else:
+        statement = select(*_row_columns(service)).where(
+            log_search.match_clause(dialect, LogEntry.id, terms),
+            log_search.unindexed(dialect, LogEntry.service_id) == service_key(service),
+        )
+        if level:
+            statement = statement.where(
+                log_search.unindexed(dialect, LogEntry.level) == level.upper()
+            )
+    if sort == "relevance":
+        statement = statement.order_by(log_search.relevance(dialect, LogEntry.id, terms))
+    return statement.order_by(LogEntry.timestamp.desc()).limit(limit)
+
+
+def search_windows(query: Optional[str], sort: str) -> Tuple[Optional[int], ...]:
+    """Windows to try in turn for a time-sorted search.
+
+    A common word fills the page from the service's newest rows long before the index has listed
+    all its matches, so windowed passes run first; a window that yields a full page holds the
+    true newest matches. Rare words fall through to the unbounded search, which is driven by
+    their few matching ids.
+    """
+    if query and sort == "time":
+        return (*SEARCH_WINDOWS, None)
+    return (None,)
 
 
 def list_recent_logs(
@@ -80,13 +207,12 @@ def list_recent_logs(
     level: Optional[str] = None,
     query: Optional[str] = None,
     limit: int = 100,
-) -> List[LogEntry]:
-    statement = select(LogEntry).where(LogEntry.service == service)
-    if level:
-        statement = statement.where(LogEntry.level == level.upper())
-    if query:
-        statement = statement.where(func.lower(LogEntry.message).contains(query.lower()))
-
-    statement = statement.order_by(LogEntry.timestamp.desc()).limit(limit)
-    rows = session.exec(statement).all()
-    return list(reversed(rows))
+    sort: str = "time",
+) -> List[LogRow]:
+    dialect = session.get_bind().dialect
+    for window in search_windows(query, sort):
+        statement = recent_logs_statement(dialect, service, level, query, limit, sort, window)
+        rows = [LogRow(*row) for row in session.exec(statement).all()]
+        if len(rows) == limit:
+            break
+    return rows if sort == "relevance" and query else list(reversed(rows))
@@ -1,73 +1,358 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta
-from typing import Iterable, List, Optional
+from operator import attrgetter, itemgetter
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
 
+from sqlalchemy import Select, String, func, literal, tuple_
+from sqlalchemy.orm import aliased
 from sqlmodel import Session, select
 
-from app.models import MetricPoint
+from app.crud.chunks import (
+    CHUNK_PAGE,
+    chunk_page_statement,
+    chunk_points,
+    chunk_window_statement,
+)
+from app.crud.dimensions import (
+    SeriesKey,
+    dimension_cache,
+    named_series,
+    series_ids,
+    series_key,
+)
+from app.crud.rollups import (
+    RAW_RESOLUTION,
+    RangePoint,
+    apply_rollups,
+    choose_resolution,
+    naive_utc,
+    range_points,
+    range_statement,
+)
+from app.crud.series import SeriesInfo, register_points, series_registry
+from app.db.bulk import bulk_insert
+from app.db.chunk_codec import from_micros
+from app.models import MetricChunk, MetricName, MetricPoint, Service
 from app.schemas import MetricPointCreate
+from app.services.cold_tier import cold_tier
+from app.services.hot_store import hot_store
+from app.services.online_detector import online_detector
+from app.services.segment_store import segment_store
 
 
-def create_metric(session: Session, metric_in: MetricPointCreate) -> MetricPoint:
-    metric = MetricPoint(
-        service=metric_in.service,
-        metric=metric_in.metric,
-        timestamp=metric_in.timestamp,
-        value=metric_in.value,
+class MetricRow(NamedTuple):
+    """Lightweight, detached view of a metric point (``id`` is ``None`` for sealed points)."""
+
+    id: Optional[int]
+    service: str
+    metric: str
+    timestamp: datetime
+    value: float
+
+
+class SeriesColumns(NamedTuple):
+    """One series as time-ordered parallel columns."""
+
+    timestamps: List[datetime]
+    values: List[float]
+
+
+_MICROSECOND = timedelta(microseconds=1)
+# (service, metric) pairs per batched series read; two bind parameters each
+PAIR_BATCH = 500
+
+
+def _row_columns(service: str, metric: str) -> tuple:
+    # rows only store the series key; the names come back as literals so results stay MetricRows
+    return (
+        MetricPoint.id,
+        literal(service, String).label("service"),
+        literal(metric, String).label("metric"),
+        MetricPoint.timestamp,
+        MetricPoint.value,
     )
-    session.add(metric)
-    session.commit()
-    session.refresh(metric)
-    return metric
 
 
-def bulk_create_metrics(
-    session: Session, metric_points: Iterable[MetricPointCreate]
-) -> List[MetricPoint]:
-    entries = [
-        MetricPoint(
-            service=item.service,
-            metric=item.metric,
-            timestamp=item.timestamp,
-            value=item.value,
-        )
+def create_metric(session: Session, metric_in: MetricPointCreate) -> MetricRow:
+    return insert_metric_rows(session, metric_params([metric_in]))[0]
+
+
+def metric_params(metric_points: Iterable[MetricPointCreate]) -> List[Dict[str, Any]]:
+    """Insert parameters for validated points, timestamps as naive UTC like every store keeps
+    them."""
+    return [
+        {
+            "service": item.service,
+            "metric": item.metric,
+            "timestamp": naive_utc(item.timestamp),
+            "value": item.value,
+        }
         for item in metric_points
     ]
 
-    if not entries:
+
+def series_pairs(params: Iterable[Dict[str, Any]]) -> set[SeriesKey]:
+    return {(item["service"], item["metric"]) for item in params}
+
+
+def point_params(
+    params: Sequence[Dict[str, Any]], keys: Dict[SeriesKey, int]
+) -> List[Dict[str, Any]]:
+    """``metrics`` table rows for name-keyed ``params``."""
+    return [
+        {
+            "series_id": keys[(item["service"], item["metric"])],
+            "timestamp": item["timestamp"],
+            "value": item["value"],
+        }
+        for item in params
+    ]
+
+
+def metric_rows(ids: Sequence[tuple], params: Sequence[Dict[str, Any]]) -> List[MetricRow]:
+    return [MetricRow(id=row_id, **item) for (row_id,), item in zip(ids, params, strict=True)]
+
+
+def bulk_create_metrics(
+    session: Session, metric_points: Iterable[MetricPointCreate]
+) -> List[MetricRow]:
+    return insert_metric_rows(session, metric_params(metric_points))
+
+
+def insert_metric_rows(session: Session, params: Sequence[Dict[str, Any]]) -> List[MetricRow]:
+    """Write pre-validated ``service/metric/timestamp/value`` mappings and their rollups, then
+    commit."""
+    if not params:
         return []
 
-    session.add_all(entries)
+    keys = series_ids(session, series_pairs(params))
+    table = MetricPoint.__table__
+    ids = bulk_insert(session, table, point_params(params, keys), returning=[table.c.id])
+    apply_rollups(session, params)
+    deltas = register_points(session, params, keys)
     session.commit()
+    dimension_cache.remember(series=keys)
+    series_registry.apply(deltas)
 
-    for entry in entries:
-        session.refresh(entry)
-
-    return entries
+    rows = metric_rows(ids, params)
+    hot_store.extend(rows)
+    online_detector.extend(rows)
+    segment_store.append(rows)
+    return rows
 
 
-def get_metric_series(
-    session: Session, service: str, metric: str, limit: int = 200
-) -> List[MetricPoint]:
-    statement = (
-        select(MetricPoint)
-        .where(MetricPoint.service == service, MetricPoint.metric == metric)
+def series_statement(service: str, metric: str, limit: int) -> Select:
+    """Newest-first raw rows of one series; callers reverse them into time order."""
+    return (
+        select(*_row_columns(service, metric))
+        .where(MetricPoint.series_id == series_key(service, metric))
         .order_by(MetricPoint.timestamp.desc())
         .limit(limit)
     )
-    results = session.exec(statement).all()
-    return list(reversed(results))
 
 
-def get_latest_metric(session: Session, service: str, metric: str) -> Optional[MetricPoint]:
+def window_statement(
+    service: str, metric: str, lower: datetime, upper: datetime, limit: Optional[int]
+) -> Select:
     statement = (
-        select(MetricPoint)
-        .where(MetricPoint.service == service, MetricPoint.metric == metric)
-        .order_by(MetricPoint.timestamp.desc())
-        .limit(1)
+        select(*_row_columns(service, metric))
+        .where(
+            MetricPoint.series_id == series_key(service, metric),
+            MetricPoint.timestamp >= lower,
+            MetricPoint.timestamp <= upper,
+        )
+        .order_by(MetricPoint.timestamp)
+    )
+    return statement.limit(limit) if limit is not None else statement
+
+
+def _chunk_rows(chunk: MetricChunk) -> List[MetricRow]:
+    return [
+        MetricRow(None, chunk.service, chunk.metric, timestamp, value)
+        for timestamp, value in chunk_points(chunk)
+    ]
+
+
+class SeriesTail:
+    """Newest ``limit`` points of one series gathered from raw rows and sealed chunks.
+
+    Start it with the raw rows from :func:`series_statement`, then feed it pages of
+    :func:`app.crud.chunks.chunk_page_statement` (starting before :attr:`before`) until
+    :attr:`done`. Chunks are disjoint time slices, so walking them newest-first can stop at the
+    first one that ends before the oldest point already kept.
+    """
+
+    def __init__(self, raw_rows: Iterable[Sequence[Any]], limit: int) -> None:
+        self.limit = limit
+        self.rows = [MetricRow(*row) for row in raw_rows]
+        self.before: Optional[datetime] = None
+        self.done = False
+
+    def feed(self, chunks: Sequence[MetricChunk]) -> None:
+        for chunk in chunks:
+            if len(self.rows) >= self.limit and chunk.end_time < self.rows[-1].timestamp:
+                self.done = True
+                return
+            self.rows.extend(_chunk_rows(chunk))
+            self.rows.sort(key=attrgetter("timestamp"), reverse=True)
+            del self.rows[self.limit :]
+        self.done = len(chunks) < CHUNK_PAGE
+        if chunks:
+            self.before = chunks[-1].chunk_start
+
+    def series(self) -> List[MetricRow]:
+        return list(reversed(self.rows))
+
+
+def merge_window(
+    raw_rows: Iterable[Sequence[Any]],
+    chunks: Iterable[MetricChunk],
+    lower: datetime,
+    upper: datetime,
+    limit: Optional[int],
+) -> List[MetricRow]:
+    rows = [MetricRow(*row) for row in raw_rows]
+    for chunk in chunks:
+        rows.extend(row for row in _chunk_rows(chunk) if lower <= row.timestamp <= upper)
+    rows.sort(key=attrgetter("timestamp"))
+    return rows[:limit] if limit is not None else rows
+
+
+def segment_rows(service: str, metric: str, arrays: Tuple[Any, Any]) -> List[MetricRow]:
+    timestamps, values = arrays
+    return [
+        MetricRow(None, service, metric, from_micros(ts), value)
+        for ts, value in zip(timestamps.tolist(), values.tolist(), strict=True)
+    ]
+
+
+def get_metric_series(
+    session: Session, service: str, metric: str, limit: int = 200
+) -> List[MetricRow]:
+    arrays = segment_store.tail(service, metric, limit)
+    if arrays is not None:
+        return segment_rows(service, metric, arrays)
+    return database_series(session, service, metric, limit)
+
+
+def database_series(session: Session, service: str, metric: str, limit: int) -> List[MetricRow]:
+    """Newest ``limit`` points from raw rows and chunks, bypassing the segment store."""
+    tail = SeriesTail(session.exec(series_statement(service, metric, limit)).all(), limit)
+    while not tail.done:
+        tail.feed(session.exec(chunk_page_statement(service, metric, tail.before)).all())
+    return tail.series()
+
+
+def latest_points_statement(pairs: Sequence[SeriesKey], limit: int) -> Select:
+    """Newest ``limit`` raw rows of every pair in one query, as (service, metric, ts, value).
+
+    Ranking with ``ROW_NUMBER`` reads every raw row of the series, which compaction keeps to the
+    last few hours.
+    """
+    series_id, service, metric = (
+        named_series().where(tuple_(Service.name, MetricName.name).in_(pairs)).subquery().c
+    )
+    rank = func.row_number().over(
+        partition_by=MetricPoint.series_id, order_by=MetricPoint.timestamp.desc()
+    )
+    ranked = (
+        select(
+            service.label("service"),
+            metric.label("metric"),
+            MetricPoint.timestamp,
+            MetricPoint.value,
+            rank.label("rank"),
+        )
+        .join(MetricPoint, MetricPoint.series_id == series_id)
+        .subquery()
+    )
+    return (
+        select(ranked.c.service, ranked.c.metric, ranked.c.timestamp, ranked.c.value)
+        .where(ranked.c.rank <= limit)
+        .order_by(ranked.c.service, ranked.c.metric, ranked.c.timestamp)
+    )
+
+
+def latest_chunks_statement(pairs: Sequence[SeriesKey], limit: int) -> Select:
+    """The newest sealed chunks of every pair, just as many as it takes to hold ``limit`` points.
+
+    Chunks are disjoint time slices, so an older chunk cannot hold any of the newest ``limit``
+    points once the newer ones already hold that many.
+    """
+    newer = func.sum(MetricChunk.count).over(
+        partition_by=(MetricChunk.service, MetricChunk.metric),
+        order_by=MetricChunk.chunk_start.desc(),
+    )
+    ranked = (
+        select(MetricChunk, (newer - MetricChunk.count).label("newer_points"))
+        .where(tuple_(MetricChunk.service, MetricChunk.metric).in_(pairs))
+        .subquery()
     )
-    return session.exec(statement).first()
+    return select(aliased(MetricChunk, ranked)).where(ranked.c.newer_points < limit)
+
+
+def get_metric_series_many(
+    session: Session, pairs: Iterable[SeriesKey], limit: int = 200
+) -> Dict[SeriesKey, SeriesColumns]:
+    """:func:`get_metric_series` for many pairs, as columns keyed by pair.
+
+    Pairs the segment store cannot serve are read with one raw-row query per :data:`PAIR_BATCH`
+    pairs, plus one chunk query for those with fewer than ``limit`` raw rows. Unknown pairs come
+    back empty.
+    """
+    series: Dict[SeriesKey, SeriesColumns] = {}
+    missing: List[SeriesKey] = []
+    for pair in dict.fromkeys(pairs):
+        arrays = segment_store.tail(*pair, limit)
+        if arrays is None:
+            missing.append(pair)
+        else:
+            series[pair] = SeriesColumns(
+                [from_micros(ts) for ts in arrays[0].tolist()], arrays[1].tolist()
+            )
+
+    for offset in range(0, len(missing), PAIR_BATCH):
+        batch = missing[offset : offset + PAIR_BATCH]
+        points: Dict[SeriesKey, List[Tuple[datetime, float]]] = {pair: [] for pair in batch}
+        for service, metric, timestamp, value in session.exec(
+            latest_points_statement(batch, limit)
+        ):
+            points[(service, metric)].append((timestamp, value))
+        short = [pair for pair, rows in points.items() if len(rows) < limit]
+        if short:
+            for chunk in session.exec(latest_chunks_statement(short, limit)):
+                points[(chunk.service, chunk.metric)].extend(chunk_points(chunk))
+            for pair in short:
+                points[pair] = sorted(points[pair], key=itemgetter(0))[-limit:]
+        for pair, rows in points.items():
+            series[pair] = SeriesColumns([ts for ts, _ in rows], [value for _, value in rows])
+    return series
+
+
+def get_latest_metric(session: Session, service: str, metric: str) -> Optional[MetricRow]:
+    series = get_metric_series(session, service, metric, limit=1)
+    return series[-1] if series else None
+
+
+def padded_window(
+    window_start: datetime, window_end: datetime, padding_minutes: int = 10
+) -> Tuple[datetime, datetime]:
+    padding = timedelta(minutes=padding_minutes)
+    return window_start - padding, window_end + padding
+
+
+def _window_rows(
+    session: Session,
+    service: str,
+    metric: str,
+    lower: datetime,
+    upper: datetime,
+    limit: Optional[int],
+) -> List[MetricRow]:
+    raw = session.exec(window_statement(service, metric, lower, upper, limit)).all()
+    chunks = session.exec(chunk_window_statement(service, metric, lower, upper)).all()
+    return merge_window(raw, chunks, lower, upper, limit)
 
 
 def get_metrics_window(
@@ -78,50 +363,103 @@ def get_metrics_window(
     window_end: datetime,
     limit: int = 240,
     padding_minutes: int = 10,
-) -> List[MetricPoint]:
-    lower = window_start - timedelta(minutes=padding_minutes)
-    upper = window_end + timedelta(minutes=padding_minutes)
+) -> List[MetricRow]:
+    lower, upper = padded_window(window_start, window_end, padding_minutes)
+    if cold_tier.covers(lower):
+        return cold_window(session, service, metric, lower, upper, limit)
+    arrays = segment_store.window(service, metric, lower, upper, limit)
+    if arrays is not None:
+        return segment_rows(service, metric, arrays)
+    return _window_rows(session, service, metric, lower, upper, limit)
 
-    statement = (
-        select(MetricPoint)
-        .where(
-            MetricPoint.service == service,
-            MetricPoint.metric == metric,
-            MetricPoint.timestamp >= lower,
-            MetricPoint.timestamp <= upper,
-        )
-        .order_by(MetricPoint.timestamp)
-        .limit(limit)
-    )
-    return session.exec(statement).all()
 
+def cold_window(
+    session: Session,
+    service: str,
+    metric: str,
+    lower: datetime,
+    upper: datetime,
+    limit: Optional[int],
+) -> List[MetricRow]:
+    """Window reaching past the hot horizon: archived points merged with the database's."""
+    archived = [
+        MetricRow(None, service, metric, timestamp, value)
+        for timestamp, value in cold_tier.metric_points(service, metric, lower, upper, limit)
+    ]
+    rows = archived + _window_rows(session, service, metric, lower, upper, limit)
+    rows.sort(key=attrgetter("timestamp"))
+    return rows[:limit] if limit is not None else rows
 
-def _flatten(rows: Iterable[object]) -> List[str]:
-    out: List[str] = []
-    for row in rows:
-        if isinstance(row, tuple):
-            out.append(row[0])
-        else:
-            out.append(row)
-    return out
+
+def iter_series(
+    session: Session, service: str, metric: str, span: timedelta = timedelta(days=1)
+) -> Iterator[List[MetricRow]]:
+    """Every point of one series in time order, one ``span`` of raw rows and chunks at a time."""
+    oldest = [
+        session.exec(
+            select(func.min(MetricPoint.timestamp)).where(
+                MetricPoint.series_id == series_key(service, metric)
+            )
+        ).one(),
+        session.exec(
+            select(func.min(MetricChunk.chunk_start)).where(
+                MetricChunk.service == service, MetricChunk.metric == metric
+            )
+        ).one(),
+    ]
+    latest = database_series(session, service, metric, limit=1)
+    if not latest:
+        return
+    lower = min(ts for ts in oldest if ts is not None)
+    while lower <= latest[-1].timestamp:
+        upper = lower + span
+        rows = _window_rows(session, service, metric, lower, upper - _MICROSECOND, None)
+        if rows:
+            yield rows
+        lower = upper
+
+
+def get_metric_range(
+    session: Session,
+    service: str,
+    metric: str,
+    window_start: datetime,
+    window_end: datetime,
+    points: int = 300,
+) -> Tuple[int, List[RangePoint]]:
+    """Read a window at the coarsest resolution that still gives ``points`` points."""
+    resolution = choose_resolution(window_start, window_end, points)
+    if resolution == RAW_RESOLUTION:
+        lower, upper = naive_utc(window_start), naive_utc(window_end)
+        rows = _window_rows(session, service, metric, lower, upper, None)
+    else:
+        statement = range_statement(service, metric, window_start, window_end, resolution)
+        rows = session.exec(statement).all()
+    return resolution, range_points(resolution, rows)
+
+
+def list_series_info(session: Session) -> List[SeriesInfo]:
+    """Registry entry of every series, by service and metric."""
+    return sorted(series_registry.entries(session))
+
+
+def list_series(session: Session) -> List[Tuple[str, str]]:
+    """Every (service, metric) pair that has been written."""
+    return [(info.service, info.metric) for info in list_series_info(session)]
 
 
 def list_services(session: Session) -> List[str]:
-    statement = select(MetricPoint.service).distinct()
-    rows = session.exec(statement).all()
-    return _flatten(rows)
+    return sorted({info.service for info in series_registry.entries(session)})
 
 
 def list_service_metrics(session: Session, service: str) -> List[str]:
-    statement = select(MetricPoint.metric).where(MetricPoint.service == service).distinct()
-    rows = session.exec(statement).all()
-    return _flatten(rows)
+    return sorted(
+        info.metric for info in series_registry.entries(session) if info.service == service
+    )
 
 
 def list_metric_names(session: Session) -> List[str]:
-    statement = select(MetricPoint.metric).distinct()
-    rows = session.exec(statement).all()
-    return _flatten(rows)
+    return sorted({info.metric for info in series_registry.entries(session)})
 
 
 def get_metrics_for_service(session: Session, service: str) -> List[str]:
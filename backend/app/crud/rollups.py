@@ -0,0 +1,235 @@
+"""Downsampled metric rollups.
+
+Every bulk metric insert folds its rows into ``metric_rollups`` at each resolution in
+``ROLLUP_RESOLUTIONS`` inside the same transaction, so range reads over days or weeks can use a
+few hundred pre-aggregated buckets instead of scanning raw points.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, NamedTuple, Sequence, Tuple
+
+from sqlalchemy import case, delete, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Dialect
+from sqlalchemy.sql.dml import Insert
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.sql.expression import SelectOfScalar
+
+from app.crud.dimensions import named_series
+from app.db.bulk import bulk_merge, bulk_merge_async
+from app.db.chunk_codec import decode_chunk, from_micros
+from app.models import MetricChunk, MetricPoint, MetricRollup
+
+Params = Dict[str, Any]
+
+# bucket widths in seconds: 1 minute, 5 minutes, 1 hour
+ROLLUP_RESOLUTIONS: Tuple[int, ...] = (60, 300, 3600)
+RAW_RESOLUTION = 0
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+class RangePoint(NamedTuple):
+    timestamp: datetime
+    value: float
+    min: float
+    max: float
+    count: int
+
+
+def naive_utc(timestamp: datetime) -> datetime:
+    if timestamp.tzinfo is None:
+        return timestamp
+    return timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def bucket_start(timestamp: datetime, resolution: int) -> datetime:
+    """Floor ``timestamp`` to the start of its ``resolution``-second bucket (naive UTC)."""
+    step = timedelta(seconds=resolution)
+    return _EPOCH + ((naive_utc(timestamp) - _EPOCH) // step) * step
+
+
+def aggregate_rollups(
+    params: Iterable[Params], resolutions: Sequence[int] = ROLLUP_RESOLUTIONS
+) -> List[Params]:
+    """Collapse metric mappings into one rollup row per (resolution, service, metric, bucket)."""
+    buckets: Dict[tuple, Params] = {}
+    for item in params:
+        timestamp = naive_utc(item["timestamp"])
+        value = item["value"]
+        for resolution in resolutions:
+            key = (resolution, item["service"], item["metric"], bucket_start(timestamp, resolution))
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = {
+                    "resolution": resolution,
+                    "service": item["service"],
+                    "metric": item["metric"],
+                    "bucket": key[3],
+                    "count": 1,
+                    "value_sum": value,
+                    "value_min": value,
+                    "value_max": value,
+                    "last_value": value,
+                    "last_timestamp": timestamp,
+                }
+                continue
+            bucket["count"] += 1
+            bucket["value_sum"] += value
+            bucket["value_min"] = min(bucket["value_min"], value)
+            bucket["value_max"] = max(bucket["value_max"], value)
+            if timestamp >= bucket["last_timestamp"]:
+                bucket["last_value"] = value
+                bucket["last_timestamp"] = timestamp
+    # a stable key order keeps concurrent upserts from deadlocking on Postgres
+    return [buckets[key] for key in sorted(buckets)]
+
+
+def _upsert_statement(dialect: Dialect) -> Insert:
+    table = MetricRollup.__table__
+    if dialect.name == "postgresql":
+        statement, least, greatest = postgresql.insert(table), func.least, func.greatest
+    elif dialect.name == "sqlite":
+        statement, least, greatest = sqlite.insert(table), func.min, func.max
+    else:
+        raise NotImplementedError(f"rollup upsert is not supported on {dialect.name!r}")
+
+    current, excluded = table.c, statement.excluded
+    newer = excluded.last_timestamp >= current.last_timestamp
+    return statement.on_conflict_do_update(
+        index_elements=[current.resolution, current.service, current.metric, current.bucket],
+        set_={
+            "count": current["count"] + excluded["count"],
+            "value_sum": current.value_sum + excluded.value_sum,
+            "value_min": least(current.value_min, excluded.value_min),
+            "value_max": greatest(current.value_max, excluded.value_max),
+            "last_value": case((newer, excluded.last_value), else_=current.last_value),
+            "last_timestamp": case((newer, excluded.last_timestamp), else_=current.last_timestamp),
+        },
+    )
+
+
+def apply_rollups(session: Session, params: Sequence[Params]) -> int:
+    """Fold ``params`` into the rollup tables without committing; returns buckets touched."""
+    rows = aggregate_rollups(params)
+    if rows:
+        statement = _upsert_statement(session.get_bind().dialect)
+        bulk_merge(session, MetricRollup.__table__, rows, statement)
+    return len(rows)
+
+
+async def apply_rollups_async(session: AsyncSession, params: Sequence[Params]) -> int:
+    rows = aggregate_rollups(params)
+    if rows:
+        statement = _upsert_statement(session.bind.dialect)
+        await bulk_merge_async(session, MetricRollup.__table__, rows, statement)
+    return len(rows)
+
+
+def backfill_rollups(session: Session, batch_size: int = 50_000) -> int:
+    """Rebuild every rollup from raw ``metrics`` rows and sealed chunks; returns points processed.
+
+    Existing rollups are cleared first and each batch commits on its own, so range reads may see
+    partial buckets while a backfill is running.
+    """
+    session.exec(delete(MetricRollup))
+    names = {key: (service, metric) for key, service, metric in session.exec(named_series()).all()}
+    processed = 0
+    last_id = 0
+    while True:
+        statement = (
+            select(MetricPoint.id, MetricPoint.series_id, MetricPoint.timestamp, MetricPoint.value)
+            .where(MetricPoint.id > last_id)
+            .order_by(MetricPoint.id)
+            .limit(batch_size)
+        )
+        rows = session.exec(statement).all()
+        if not rows:
+            break
+        apply_rollups(
+            session,
+            [
+                {
+                    "service": names[series_id][0],
+                    "metric": names[series_id][1],
+                    "timestamp": timestamp,
+                    "value": value,
+                }
+                for _, series_id, timestamp, value in rows
+            ],
+        )
+        session.commit()
+        last_id = rows[-1][0]
+        processed += len(rows)
+
+    last_id = 0
+    while True:
+        chunks = session.exec(
+            select(MetricChunk)
+            .where(MetricChunk.id > last_id)
+            .order_by(MetricChunk.id)
+            .limit(max(1, batch_size // 1000))
+        ).all()
+        if not chunks:
+            break
+        params = []
+        for chunk in chunks:
+            timestamps, values = decode_chunk(chunk.payload)
+            params.extend(
+                {
+                    "service": chunk.service,
+                    "metric": chunk.metric,
+                    "timestamp": from_micros(timestamp),
+                    "value": value,
+                }
+                for timestamp, value in zip(timestamps, values, strict=True)
+            )
+        apply_rollups(session, params)
+        session.commit()
+        last_id = chunks[-1].id
+        processed += len(params)
+    session.commit()
+    return processed
+
+
+def choose_resolution(window_start: datetime, window_end: datetime, points: int) -> int:
+    """Coarsest resolution that still yields ``points`` buckets; ``RAW_RESOLUTION`` otherwise."""
+    span = (window_end - window_start).total_seconds()
+    for resolution in sorted(ROLLUP_RESOLUTIONS, reverse=True):
+        if span / resolution >= points:
+            return resolution
+    return RAW_RESOLUTION
+
+
+def range_statement(
+    service: str,
+    metric: str,
+    window_start: datetime,
+    window_end: datetime,
+    resolution: int,
+) -> SelectOfScalar[MetricRollup]:
+    lower, upper = naive_utc(window_start), naive_utc(window_end)
+    return (
+        select(MetricRollup)
+        .where(
+            MetricRollup.resolution == resolution,
+            MetricRollup.service == service,
+            MetricRollup.metric == metric,
+            MetricRollup.bucket >= bucket_start(lower, resolution),
+            MetricRollup.bucket <= upper,
+        )
+        .order_by(MetricRollup.bucket)
+    )
+
+
+def range_points(resolution: int, rows: Sequence[Any]) -> List[RangePoint]:
+    """Rollup rows or raw points (anything with ``timestamp``/``value``) as range points."""
+    if resolution == RAW_RESOLUTION:
+        return [RangePoint(row.timestamp, row.value, row.value, row.value, 1) for row in rows]
+    return [
+        RangePoint(row.bucket, row.value_sum / row.count, row.value_min, row.value_max, row.count)
+        for row in rows
+    ]
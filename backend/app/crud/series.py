@@ -0,0 +1,330 @@
+"""Series registry: first and last point timestamps, point count and latest value per series.
+
+The registry lives on the ``series`` rows themselves (:class:`app.models.Series`). Every metric
+insert folds its batch into them in the same transaction (:func:`series_deltas`,
+:func:`register_statement`), and :data:`series_registry` keeps the whole registry in memory, so
+listing services, metrics or series costs O(series) and never touches ``metrics``. The cache
+reloads after ``ttl`` seconds to pick up series written by other processes.
+
+Retention and the cold tier take points away in bulk, so after a run they recount the series
+they touched (:func:`expired_series`, :func:`reconcile_series`); a series left without points
+stays registered with a zero count but drops out of the listings. Run
+``python -m scripts.reconcile_series`` to recompute every row from the points still in the
+database.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+from sqlalchemy import DateTime, Float, Integer, Select, bindparam, case, func, or_, tuple_, update
+from sqlalchemy.sql.dml import Update
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.crud.dimensions import SeriesKey, named_series
+from app.crud.rollups import naive_utc
+from app.db.chunk_codec import decode_chunk, from_micros
+from app.models import MetricChunk, MetricPoint, Series
+
+# (service, metric, chunk_start) keys per boundary-chunk read during a reconcile
+CHUNK_BATCH = 300
+# series ids per raw-row read during a scoped reconcile
+SERIES_BATCH = 5000
+
+
+class SeriesInfo(NamedTuple):
+    service: str
+    metric: str
+    first_seen: Optional[datetime]
+    last_seen: Optional[datetime]
+    point_count: int
+    last_value: Optional[float]
+
+
+class SeriesDelta(NamedTuple):
+    """What one insert batch adds to a series."""
+
+    first_seen: datetime
+    last_seen: datetime
+    point_count: int
+    last_value: float
+
+
+def series_deltas(params: Iterable[Dict[str, Any]]) -> Dict[SeriesKey, SeriesDelta]:
+    """Fold ``service/metric/timestamp/value`` mappings into one delta per series; of points
+    sharing the latest timestamp the one written last wins."""
+    folded: Dict[SeriesKey, List[Any]] = {}
+    for item in params:
+        timestamp = naive_utc(item["timestamp"])
+        entry = folded.get((item["service"], item["metric"]))
+        if entry is None:
+            folded[(item["service"], item["metric"])] = [timestamp, timestamp, 1, item["value"]]
+            continue
+        if timestamp < entry[0]:
+            entry[0] = timestamp
+        if timestamp >= entry[1]:
+            entry[1] = timestamp
+            entry[3] = item["value"]
+        entry[2] += 1
+    return {pair: SeriesDelta(*entry) for pair, entry in folded.items()}
+
+
+def register_statement() -> Update:
+    """Fold one delta into a ``series`` row; execute with :func:`register_params`."""
+    table = Series.__table__
+    first = bindparam("b_first", type_=DateTime())
+    last = bindparam("b_last", type_=DateTime())
+    newer = or_(table.c.last_seen.is_(None), table.c.last_seen <= last)
+    return (
+        update(table)
+        .where(table.c.id == bindparam("b_id", type_=Integer()))
+        .values(
+            first_seen=case(
+                (or_(table.c.first_seen.is_(None), table.c.first_seen > first), first),
+                else_=table.c.first_seen,
+            ),
+            last_seen=case((newer, last), else_=table.c.last_seen),
+            point_count=table.c.point_count + bindparam("b_count", type_=Integer()),
+            last_value=case((newer, bindparam("b_value", type_=Float())), else_=table.c.last_value),
+        )
+    )
+
+
+def register_params(
+    deltas: Dict[SeriesKey, SeriesDelta], keys: Dict[SeriesKey, int]
+) -> List[Dict[str, Any]]:
+    # ordered by id so concurrent writers lock the rows in the same order on Postgres
+    return sorted(
+        (
+            {
+                "b_id": keys[pair],
+                "b_first": delta.first_seen,
+                "b_last": delta.last_seen,
+                "b_count": delta.point_count,
+                "b_value": delta.last_value,
+            }
+            for pair, delta in deltas.items()
+        ),
+        key=lambda item: item["b_id"],
+    )
+
+
+def register_points(
+    session: Session, params: Sequence[Dict[str, Any]], keys: Dict[SeriesKey, int]
+) -> Dict[SeriesKey, SeriesDelta]:
+    """Add ``params`` to the registry rows without committing.
+
+    Pass the result to :meth:`SeriesRegistry.apply` once the caller has committed.
+    """
+    deltas = series_deltas(params)
+    session.execute(register_statement(), register_params(deltas, keys))
+    return deltas
+
+
+def registry_statement() -> Select:
+    return named_series().add_columns(
+        Series.first_seen, Series.last_seen, Series.point_count, Series.last_value
+    )
+
+
+class SeriesRegistry:
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self._entries: Optional[Dict[SeriesKey, SeriesInfo]] = None
+        self._loaded_at = 0.0
+        self._loads = 0
+        self._lock = threading.Lock()
+
+    def entries(self, session: Session) -> List[SeriesInfo]:
+        """Snapshot of every series that still holds points, reloaded from ``series`` once it is
+        stale."""
+        with self._lock:
+            if self._entries is not None and time.monotonic() - self._loaded_at < self.ttl:
+                return _live(self._entries)
+        loaded = {
+            (service, metric): SeriesInfo(service, metric, *stats)
+            for _, service, metric, *stats in session.exec(registry_statement()).all()
+        }
+        with self._lock:
+            self._entries = loaded
+            self._loaded_at = time.monotonic()
+            self._loads += 1
+            return _live(loaded)
+
+    def apply(self, deltas: Dict[SeriesKey, SeriesDelta]) -> None:
+        """Fold committed deltas into the cache (a no-op until the first read loads it)."""
+        with self._lock:
+            if self._entries is None:
+                return
+            for (service, metric), delta in deltas.items():
+                info = self._entries.get((service, metric))
+                if info is None or info.point_count == 0:
+                    self._entries[(service, metric)] = SeriesInfo(service, metric, *delta)
+                    continue
+                newer = info.last_seen is None or info.last_seen <= delta.last_seen
+                self._entries[(service, metric)] = SeriesInfo(
+                    service,
+                    metric,
+                    min(info.first_seen or delta.first_seen, delta.first_seen),
+                    delta.last_seen if newer else info.last_seen,
+                    info.point_count + delta.point_count,
+                    delta.last_value if newer else info.last_value,
+                )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries = None
+
+    def stats(self) -> Dict[str, Any]:
+        entries = self._entries
+        return {
+            "loaded": entries is not None,
+            "series": len(entries) if entries is not None else None,
+            "age_seconds": (
+                round(time.monotonic() - self._loaded_at, 3) if entries is not None else None
+            ),
+            "ttl_seconds": self.ttl,
+            "loads": self._loads,
+        }
+
+
+series_registry = SeriesRegistry(ttl=settings.series_registry_ttl_seconds)
+
+
+def _live(entries: Dict[SeriesKey, SeriesInfo]) -> List[SeriesInfo]:
+    return [info for info in entries.values() if info.point_count]
+
+
+def expired_series(session: Session, before: datetime) -> List[SeriesKey]:
+    """Series registered with points older than ``before``, i.e. those a cleanup up to
+    ``before`` may have taken points from."""
+    statement = named_series().where(Series.first_seen < naive_utc(before))
+    return [(service, metric) for _, service, metric in session.exec(statement).all()]
+
+
+def reconcile_series(
+    session: Session, series: Optional[Iterable[SeriesKey]] = None
+) -> Dict[str, Any]:
+    """Recompute registry rows from the raw rows and sealed chunks in the database: those of
+    ``series``, or every row when it is omitted.
+
+    Series whose points all expired or moved to the cold tier keep their row with a zero count.
+    Inserts that commit while the reconcile runs may be overwritten; run it when ingest is quiet.
+    """
+    started = time.perf_counter()
+    ids = {(service, metric): key for key, service, metric in session.exec(named_series()).all()}
+    if series is not None:
+        wanted = set(series)
+        ids = {pair: key for pair, key in ids.items() if pair in wanted}
+    stats: Dict[int, List[Any]] = {}
+
+    keys = sorted(ids.values())
+    scopes = (
+        [None]
+        if series is None
+        else [keys[i : i + SERIES_BATCH] for i in range(0, len(keys), SERIES_BATCH)]
+    )
+    for scope in scopes:
+        raw_statement = select(
+            MetricPoint.series_id,
+            func.min(MetricPoint.timestamp),
+            func.max(MetricPoint.timestamp),
+            func.count(),
+        ).group_by(MetricPoint.series_id)
+        latest = select(
+            MetricPoint.series_id, func.max(MetricPoint.timestamp).label("timestamp")
+        ).group_by(MetricPoint.series_id)
+        if scope is not None:
+            raw_statement = raw_statement.where(MetricPoint.series_id.in_(scope))
+            latest = latest.where(MetricPoint.series_id.in_(scope))
+        for series_id, first, last, count in session.exec(raw_statement).all():
+            stats[series_id] = [first, last, count, None]
+        latest = latest.subquery()
+        last_values = session.exec(
+            select(MetricPoint.series_id, MetricPoint.value)
+            .join(
+                latest,
+                (latest.c.series_id == MetricPoint.series_id)
+                & (latest.c.timestamp == MetricPoint.timestamp),
+            )
+            .order_by(MetricPoint.id)
+        ).all()
+        for series_id, value in last_values:
+            stats[series_id][3] = value
+
+    # compaction moves raw rows into chunks, so the two never hold the same point
+    bounds_statement = select(
+        MetricChunk.service,
+        MetricChunk.metric,
+        func.min(MetricChunk.chunk_start),
+        func.max(MetricChunk.chunk_start),
+        func.sum(MetricChunk.count),
+    ).group_by(MetricChunk.service, MetricChunk.metric)
+    if series is not None:
+        # pairs outside ``ids`` are skipped below
+        bounds_statement = bounds_statement.where(
+            MetricChunk.service.in_(sorted({service for service, _ in ids}))
+        )
+    bounds = session.exec(bounds_statement).all()
+    edges = {}
+    for service, metric, first_chunk, last_chunk, count in bounds:
+        key = ids.get((service, metric))
+        if key is None:
+            continue
+        edges[(service, metric, first_chunk)] = edges[(service, metric, last_chunk)] = key
+        entry = stats.setdefault(key, [None, None, 0, None])
+        entry[2] += count
+    keys = list(edges)
+    for offset in range(0, len(keys), CHUNK_BATCH):
+        batch = keys[offset : offset + CHUNK_BATCH]
+        chunks = session.exec(
+            select(MetricChunk.service, MetricChunk.metric, MetricChunk.payload).where(
+                tuple_(MetricChunk.service, MetricChunk.metric, MetricChunk.chunk_start).in_(batch)
+            )
+        ).all()
+        for service, metric, payload in chunks:
+            entry = stats[ids[(service, metric)]]
+            timestamps, values = decode_chunk(payload)
+            first, last = from_micros(timestamps[0]), from_micros(timestamps[-1])
+            if entry[0] is None or first < entry[0]:
+                entry[0] = first
+            if entry[1] is None or last > entry[1]:
+                entry[1], entry[3] = last, values[-1]
+
+    table = Series.__table__
+    params = [
+        {
+            "b_id": key,
+            "b_first": entry[0],
+            "b_last": entry[1],
+            "b_count": entry[2],
+            "b_value": entry[3],
+        }
+        for key, entry in sorted(
+            (key, stats.get(key, [None, None, 0, None])) for key in ids.values()
+        )
+    ]
+    if params:
+        session.execute(
+            update(table)
+            .where(table.c.id == bindparam("b_id"))
+            .values(
+                first_seen=bindparam("b_first"),
+                last_seen=bindparam("b_last"),
+                point_count=bindparam("b_count"),
+                last_value=bindparam("b_value"),
+            ),
+            params,
+        )
+    session.commit()
+    series_registry.clear()
+    return {
+        "series": len(ids),
+        "empty": sum(1 for key in ids.values() if key not in stats),
+        "points": sum(entry[2] for entry in stats.values()),
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
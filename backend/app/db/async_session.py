@@ -0,0 +1,55 @@
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import AsyncIterator, Optional
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.db.sqlite import apply_sqlite_pragmas, is_file_database
+
+
+def resolve_async_url(database_url: Optional[str] = None) -> str:
+    """Map the configured sync URL onto the async driver chosen in settings.
+
+    ``async_database_url`` wins when set; otherwise ``sqlite://`` becomes
+    ``sqlite+<async_sqlite_driver>://`` and ``postgresql://`` becomes
+    ``postgresql+<async_postgres_driver>://``.
+    """
+    if database_url is None and settings.async_database_url:
+        return settings.async_database_url
+    url = make_url(database_url or settings.database_url)
+    backend = url.get_backend_name()
+    if backend == "sqlite":
+        driver = settings.async_sqlite_driver
+    elif backend == "postgresql":
+        driver = settings.async_postgres_driver
+    else:
+        raise ValueError(f"no async driver configured for {backend!r}")
+    return url.set(drivername=f"{backend}+{driver}").render_as_string(hide_password=False)
+
+
+@lru_cache(maxsize=1)
+def get_async_engine() -> AsyncEngine:
+    url = resolve_async_url()
+    engine = create_async_engine(url, echo=False)
+    if settings.sqlite_production_mode and is_file_database(url):
+        apply_sqlite_pragmas(engine.sync_engine)
+    return engine
+
+
+async def get_async_session() -> AsyncIterator[AsyncSession]:
+    async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
+        yield session
+
+
+@asynccontextmanager
+async def async_session_scope() -> AsyncIterator[AsyncSession]:
+    async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
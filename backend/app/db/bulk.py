@@ -0,0 +1,244 @@
+"""Set-based inserts shared by the sync and async ingest paths.
+
+:func:`bulk_insert` writes a batch with one multi-row ``INSERT`` and :func:`bulk_merge` runs an
+upsert statement for a batch. On Postgres (psycopg2 or asyncpg) batches of at least
+``COPY_MIN_ROWS`` rows skip statement parameters entirely: they stream into a session-private
+staging table with ``COPY ... FROM STDIN`` (text format on psycopg2, binary on asyncpg) and one
+``INSERT ... SELECT`` (carrying the upsert's ``ON CONFLICT`` clause) merges them into the
+target. Primary keys for an inserted batch are drawn from the table's sequence up front, so
+returned ids still line up with the input rows.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Column, Table, column, insert, select, table
+from sqlalchemy.engine import Connection, Dialect
+from sqlalchemy.sql.dml import Insert
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+Params = Dict[str, Any]
+
+# below this many rows the COPY setup costs more than a multi-row INSERT
+COPY_MIN_ROWS = 1000
+
+_COPY_DRIVERS = ("psycopg2", "asyncpg")
+_TEXT_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def supports_bulk_returning(dialect: Dialect) -> bool:
+    """True when the dialect can run a multi-row ``INSERT ... RETURNING``."""
+    return bool(getattr(dialect, "insert_executemany_returning_sort_by_parameter_order", False))
+
+
+def supports_copy(dialect: Dialect) -> bool:
+    return dialect.name == "postgresql" and dialect.driver in _COPY_DRIVERS
+
+
+def _statement(dialect: Dialect, table: Table, returning: Sequence[Column]) -> Tuple[Insert, bool]:
+    if returning and supports_bulk_returning(dialect):
+        return insert(table).returning(*returning, sort_by_parameter_order=True), True
+    return insert(table), False
+
+
+def _collect(result, rows: Sequence[Params], returned: bool, width: int) -> List[tuple]:
+    if returned:
+        return [tuple(row) for row in result]
+    return [(None,) * width for _ in rows]
+
+
+class CopyPlan:
+    """Staging table and statements for copying ``rows`` into ``target``.
+
+    With ``keyed`` the plan allocates the target's primary keys and copies them along with the
+    rows; ``statement`` (an insert into ``target``, typically with ``ON CONFLICT``) replaces the
+    plain ``INSERT`` used for the merge.
+    """
+
+    def __init__(
+        self,
+        dialect: Dialect,
+        target: Table,
+        rows: Sequence[Params],
+        keyed: bool,
+        statement: Optional[Insert] = None,
+    ) -> None:
+        preparer = dialect.identifier_preparer
+        self.key = target.autoincrement_column if keyed else None
+        self.names = list(rows[0])
+        self.columns = [self.key.name, *self.names] if keyed else self.names
+        staging = table(f"copy_{target.name}", *(column(name) for name in self.columns))
+        self.staging = staging.name
+        # every writable column, so the staging table fits any batch of this table
+        writable = ", ".join(
+            preparer.quote(item.name) for item in target.columns if not item.computed
+        )
+        self.create = (
+            f"CREATE TEMPORARY TABLE IF NOT EXISTS {self.staging} AS "
+            f"SELECT {writable} FROM {preparer.format_table(target)} WITH NO DATA"
+        )
+        names = ", ".join(preparer.quote(name) for name in self.columns)
+        self.copy = f"COPY {self.staging} ({names}) FROM STDIN"
+        merge = statement if statement is not None else insert(target)
+        self.merge = merge.from_select(self.columns, select(*staging.c))
+        self.clear = f"TRUNCATE {self.staging}"
+        self.allocate = (
+            f"SELECT nextval(pg_get_serial_sequence('{target.name}', '{self.key.name}')) "
+            f"FROM generate_series(1, {len(rows)})"
+            if keyed
+            else None
+        )
+
+    @staticmethod
+    def wanted(dialect: Dialect, rows: Sequence[Params]) -> bool:
+        return len(rows) >= COPY_MIN_ROWS and supports_copy(dialect)
+
+    def records(self, ids: Optional[Sequence[int]], rows: Sequence[Params]) -> List[tuple]:
+        records = [tuple(_copy_value(row[name]) for name in self.names) for row in rows]
+        if ids is None:
+            return records
+        return [(key, *record) for key, record in zip(ids, records, strict=True)]
+
+
+def _insert_plan(
+    dialect: Dialect, target: Table, rows: Sequence[Params], returning: Sequence[Column]
+) -> Optional[CopyPlan]:
+    """A plan when ``rows`` should be copied; ``None`` means use a multi-row ``INSERT``."""
+    if not CopyPlan.wanted(dialect, rows):
+        return None
+    key = target.autoincrement_column
+    if key is None or key.name in rows[0] or any(item is not key for item in returning):
+        return None
+    return CopyPlan(dialect, target, rows, keyed=True)
+
+
+def _copy_value(value: Any) -> Any:
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+def _copy_text(value: Any) -> str:
+    kind = type(value)
+    if value is None:
+        return "\\N"
+    if kind is float or kind is int:
+        return repr(value)
+    if kind is str:
+        return value.translate(_TEXT_ESCAPES)
+    value = _copy_value(value)
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    return str(value).translate(_TEXT_ESCAPES)
+
+
+def _copy_rows(connection: Connection, plan: CopyPlan, rows: Sequence[Params]) -> List[int]:
+    ids: List[int] = []
+    with connection.connection.cursor() as cursor:
+        if plan.allocate is not None:
+            cursor.execute(plan.allocate)
+            ids = [key for (key,) in cursor.fetchall()]
+        cursor.execute(plan.create)
+        lines = ("\t".join([_copy_text(row[name]) for name in plan.names]) + "\n" for row in rows)
+        if plan.allocate is not None:
+            lines = (f"{key}\t{line}" for key, line in zip(ids, lines, strict=True))
+        cursor.copy_expert(plan.copy, io.StringIO("".join(lines)))
+    connection.execute(plan.merge)
+    connection.exec_driver_sql(plan.clear)
+    return ids
+
+
+async def _copy_rows_async(
+    session: AsyncSession, plan: CopyPlan, rows: Sequence[Params]
+) -> List[int]:
+    connection = await session.connection()
+    ids = None
+    if plan.allocate is not None:
+        ids = (await connection.exec_driver_sql(plan.allocate)).scalars().all()
+    await connection.exec_driver_sql(plan.create)
+    raw = await connection.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(
+        plan.staging, records=plan.records(ids, rows), columns=plan.columns
+    )
+    await connection.execute(plan.merge)
+    await connection.exec_driver_sql(plan.clear)
+    return list(ids or [])
+
+
+def bulk_insert(
+    session: Session,
+    table: Table,
+    rows: Sequence[Params],
+    returning: Sequence[Column] = (),
+) -> List[tuple]:
+    """Insert ``rows`` with SQLAlchemy Core instead of one ORM object per row.
+
+    When ``returning`` columns are given and the dialect supports it, the rows are written with
+    multi-row ``INSERT ... RETURNING`` and the returned tuples come back in parameter order. Older
+    SQLite builds fall back to a plain ``executemany`` and return ``None`` for every returning
+    column, so callers must treat generated values as optional. Large Postgres batches are
+    copied (see the module docstring); ``returning`` may then only name the primary key.
+    """
+    if not rows:
+        return []
+    dialect = session.get_bind().dialect
+    plan = _insert_plan(dialect, table, rows, returning)
+    if plan is not None:
+        ids = _copy_rows(session.connection(), plan, rows)
+        return [(key,) * len(returning) for key in ids]
+    statement, returned = _statement(dialect, table, returning)
+    result = session.execute(statement, list(rows))
+    return _collect(result, rows, returned, len(returning))
+
+
+async def bulk_insert_async(
+    session: AsyncSession,
+    table: Table,
+    rows: Sequence[Params],
+    returning: Sequence[Column] = (),
+) -> List[tuple]:
+    """Async counterpart of :func:`bulk_insert`."""
+    if not rows:
+        return []
+    dialect = session.bind.dialect
+    plan = _insert_plan(dialect, table, rows, returning)
+    if plan is not None:
+        ids = await _copy_rows_async(session, plan, rows)
+        return [(key,) * len(returning) for key in ids]
+    statement, returned = _statement(dialect, table, returning)
+    result = await session.execute(statement, list(rows))
+    return _collect(result, rows, returned, len(returning))
+
+
+def bulk_merge(session: Session, table: Table, rows: Sequence[Params], statement: Insert) -> None:
+    """Run the upsert ``statement`` into ``table`` for every row of ``rows``.
+
+    ``rows`` must not repeat a conflict key: a copied batch is merged by one statement, and
+    Postgres refuses to update the same row twice in one statement.
+    """
+    if not rows:
+        return
+    dialect = session.get_bind().dialect
+    if CopyPlan.wanted(dialect, rows):
+        _copy_rows(session.connection(), CopyPlan(dialect, table, rows, False, statement), rows)
+    else:
+        session.execute(statement, list(rows))
+
+
+async def bulk_merge_async(
+    session: AsyncSession, table: Table, rows: Sequence[Params], statement: Insert
+) -> None:
+    if not rows:
+        return
+    dialect = session.bind.dialect
+    if CopyPlan.wanted(dialect, rows):
+        await _copy_rows_async(session, CopyPlan(dialect, table, rows, False, statement), rows)
+    else:
+        await session.execute(statement, list(rows))
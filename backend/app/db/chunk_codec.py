@@ -0,0 +1,170 @@
+"""Gorilla-style compression for one chunk of a metric series.
+
+Layout: a 20-byte header (point count, first timestamp, first value bits) followed by a bit
+stream with, for every later point, its timestamp as a delta-of-delta and its value XORed with
+the previous value (Pelkonen et al., "Gorilla: A Fast, Scalable, In-Memory Time Series
+Database", VLDB 2015). Timestamps are integer epoch microseconds.
+
+A regular series costs one bit per timestamp; a value equal to the previous one costs one bit,
+and a value whose XOR fits inside the previous leading/trailing-zero window costs two bits plus
+the meaningful bits.
+"""
+
+from __future__ import annotations
+
+import struct
+from datetime import datetime, timedelta, timezone
+from typing import List, Sequence, Tuple
+
+_HEADER = struct.Struct(">Iqd")
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+# (prefix bits, prefix length, payload bits) for delta-of-delta buckets after the "0" case
+_DOD_BUCKETS = (
+    (0b10, 2, 7),
+    (0b110, 3, 9),
+    (0b1110, 4, 12),
+    (0b11110, 5, 32),
+    (0b11111, 5, 64),
+)
+
+
+def to_micros(timestamp: datetime) -> int:
+    """Naive-UTC datetime (aware ones are converted) to integer epoch microseconds."""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return (timestamp - _EPOCH) // _MICROSECOND
+
+
+def from_micros(micros: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=micros)
+
+
+def _float_bits(value: float) -> int:
+    return struct.unpack(">Q", struct.pack(">d", value))[0]
+
+
+def _bits_float(bits: int) -> float:
+    return struct.unpack(">d", struct.pack(">Q", bits))[0]
+
+
+class BitWriter:
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+        self._acc = 0
+        self._bits = 0
+
+    def write(self, value: int, nbits: int) -> None:
+        self._acc = (self._acc << nbits) | (value & ((1 << nbits) - 1))
+        self._bits += nbits
+        while self._bits >= 8:
+            self._bits -= 8
+            self._buffer.append((self._acc >> self._bits) & 0xFF)
+        self._acc &= (1 << self._bits) - 1
+
+    def getvalue(self) -> bytes:
+        if self._bits:
+            return bytes(self._buffer) + bytes([(self._acc << (8 - self._bits)) & 0xFF])
+        return bytes(self._buffer)
+
+
+class BitReader:
+    def __init__(self, data: bytes, offset: int = 0) -> None:
+        self._data = data
+        self._pos = offset * 8
+
+    def read(self, nbits: int) -> int:
+        start = self._pos >> 3
+        end = (self._pos + nbits + 7) >> 3
+        chunk = int.from_bytes(self._data[start:end], "big")
+        shift = (end << 3) - (self._pos + nbits)
+        self._pos += nbits
+        return (chunk >> shift) & ((1 << nbits) - 1)
+
+
+def _write_dod(writer: BitWriter, dod: int) -> None:
+    if dod == 0:
+        writer.write(0, 1)
+        return
+    for prefix, prefix_bits, payload_bits in _DOD_BUCKETS:
+        bound = 1 << (payload_bits - 1)
+        if -bound <= dod < bound:
+            writer.write(prefix, prefix_bits)
+            writer.write(dod, payload_bits)
+            return
+    raise ValueError(f"timestamp delta-of-delta {dod} does not fit in 64 bits")
+
+
+def _read_dod(reader: BitReader) -> int:
+    ones = 0
+    while ones < 5 and reader.read(1):
+        ones += 1
+    if ones == 0:
+        return 0
+    payload_bits = _DOD_BUCKETS[ones - 1][2]
+    raw = reader.read(payload_bits)
+    if raw >= 1 << (payload_bits - 1):
+        raw -= 1 << payload_bits
+    return raw
+
+
+def encode_chunk(timestamps: Sequence[int], values: Sequence[float]) -> bytes:
+    """Encode time-ordered ``timestamps`` (epoch microseconds) and their ``values``."""
+    if len(timestamps) != len(values):
+        raise ValueError("timestamps and values must have the same length")
+    if not timestamps:
+        raise ValueError("cannot encode an empty chunk")
+
+    header = _HEADER.pack(len(timestamps), timestamps[0], values[0])
+    writer = BitWriter()
+    prev_ts, prev_delta = timestamps[0], 0
+    prev_bits = _float_bits(values[0])
+    window = None  # (leading, trailing) zeros of the last XOR written with a full header
+    for timestamp, value in zip(timestamps[1:], values[1:], strict=True):
+        delta = timestamp - prev_ts
+        _write_dod(writer, delta - prev_delta)
+        prev_ts, prev_delta = timestamp, delta
+
+        bits = _float_bits(value)
+        xor = bits ^ prev_bits
+        prev_bits = bits
+        if xor == 0:
+            writer.write(0, 1)
+            continue
+        leading = min(64 - xor.bit_length(), 31)
+        trailing = (xor & -xor).bit_length() - 1
+        if window is not None and leading >= window[0] and trailing >= window[1]:
+            writer.write(0b10, 2)
+            writer.write(xor >> window[1], 64 - window[0] - window[1])
+            continue
+        meaningful = 64 - leading - trailing
+        writer.write(0b11, 2)
+        writer.write(leading, 5)
+        writer.write(meaningful - 1, 6)
+        writer.write(xor >> trailing, meaningful)
+        window = (leading, trailing)
+    return header + writer.getvalue()
+
+
+def decode_chunk(payload: bytes) -> Tuple[List[int], List[float]]:
+    count, first_ts, first_value = _HEADER.unpack_from(payload)
+    timestamps = [first_ts]
+    values = [first_value]
+    reader = BitReader(payload, _HEADER.size)
+    prev_ts, prev_delta = first_ts, 0
+    prev_bits = _float_bits(first_value)
+    leading = trailing = 0
+    for _ in range(count - 1):
+        prev_delta += _read_dod(reader)
+        prev_ts += prev_delta
+        timestamps.append(prev_ts)
+
+        if reader.read(1):
+            if reader.read(1):
+                leading = reader.read(5)
+                meaningful = reader.read(6) + 1
+                trailing = 64 - leading - meaningful
+            prev_bits ^= reader.read(64 - leading - trailing) << trailing
+        values.append(_bits_float(prev_bits))
+    return timestamps, values
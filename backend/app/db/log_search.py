@@ -0,0 +1,159 @@
+"""Full-text search over log messages and their JSON context.
+
+SQLite keeps an FTS5 external-content table ``logs_fts`` over ``logs.message`` and
+``logs.context``, synced by triggers; Postgres keeps a generated ``tsvector`` column
+``logs.search`` with a GIN index. Both tokenize without stemming, so the JSON context is indexed
+as its flattened keys and values (``{"region": "eu-west"}`` matches ``region``, ``eu`` and
+``west``).
+
+Search text is parsed once into terms: a double-quoted span is a phrase and a trailing ``*``
+makes a prefix match; terms are ANDed. The last term, unless quoted, is always a prefix so that
+search-as-you-type keeps matching while a word is half typed (``tim`` finds ``timeout``). Other
+terms stay whole words because FTS5 merges the posting lists of every matching token up front,
+which costs far more than a whole-word lookup on a big table.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import column, func, literal_column, select, table
+from sqlalchemy.engine import Connection, Dialect
+from sqlalchemy.sql.elements import ColumnElement
+
+SQLITE_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS logs_fts USING fts5("
+    "message, context, content='logs', content_rowid='id', tokenize='unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS logs_fts_insert AFTER INSERT ON logs BEGIN "
+    "INSERT INTO logs_fts(rowid, message, context) "
+    "VALUES (new.id, new.message, new.context); END",
+    "CREATE TRIGGER IF NOT EXISTS logs_fts_delete AFTER DELETE ON logs BEGIN "
+    "INSERT INTO logs_fts(logs_fts, rowid, message, context) "
+    "VALUES ('delete', old.id, old.message, old.context); END",
+    "CREATE TRIGGER IF NOT EXISTS logs_fts_update AFTER UPDATE OF message, context ON logs BEGIN "
+    "INSERT INTO logs_fts(logs_fts, rowid, message, context) "
+    "VALUES ('delete', old.id, old.message, old.context); "
+    "INSERT INTO logs_fts(rowid, message, context) "
+    "VALUES (new.id, new.message, new.context); END",
+)
+
+POSTGRES_DDL = (
+    "ALTER TABLE logs ADD COLUMN IF NOT EXISTS search tsvector GENERATED ALWAYS AS ("
+    "to_tsvector('simple', message || ' ' || coalesce(context::text, ''))) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_logs_search ON logs USING gin (search)",
+)
+
+# schema objects this module owns; the migration diff check must not try to drop them
+UNMANAGED_TABLES = (
+    "logs_fts",
+    "logs_fts_config",
+    "logs_fts_data",
+    "logs_fts_docsize",
+    "logs_fts_idx",
+)
+UNMANAGED_COLUMNS = (("logs", "search"),)
+UNMANAGED_INDEXES = ("ix_logs_search",)
+
+_TERM = re.compile(r'"([^"]*)"(\*?)|(\S+)')
+_WORD = re.compile(r"\w+")
+
+_fts = table("logs_fts", column("rowid"), column("rank"))
+_search_column = literal_column("logs.search")
+
+
+class SearchTerm(NamedTuple):
+    words: Tuple[str, ...]
+    prefix: bool
+
+
+def install(connection: Connection) -> None:
+    """Create the search index for ``connection``'s dialect (a no-op elsewhere)."""
+    statements = {"sqlite": SQLITE_DDL, "postgresql": POSTGRES_DDL}.get(connection.dialect.name, ())
+    for statement in statements:
+        connection.exec_driver_sql(statement)
+
+
+def parse_query(text: str) -> List[SearchTerm]:
+    terms: List[SearchTerm] = []
+    matches = list(_TERM.finditer(text))
+    for idx, match in enumerate(matches):
+        phrase, star, bare = match.groups()
+        words = tuple(_WORD.findall(phrase if phrase is not None else bare))
+        if not words:
+            continue
+        if phrase is not None:
+            prefix = bool(star)
+        else:
+            # the word still being typed
+            prefix = bare.endswith("*") or idx == len(matches) - 1
+        terms.append(SearchTerm(words, prefix))
+    return terms
+
+
+def fts5_expression(terms: List[SearchTerm]) -> str:
+    return " ".join(
+        '"' + " ".join(term.words) + '"' + ("*" if term.prefix else "") for term in terms
+    )
+
+
+def tsquery_expression(terms: List[SearchTerm]) -> str:
+    parts = []
+    for term in terms:
+        lexemes = [f"'{word}'" for word in term.words]
+        if term.prefix:
+            lexemes[-1] += ":*"
+        parts.append(" <-> ".join(lexemes))
+    return " & ".join(parts)
+
+
+def match_clause(
+    dialect: Dialect,
+    key: ColumnElement,
+    terms: List[SearchTerm],
+    id_range: Optional[Tuple[ColumnElement, ColumnElement]] = None,
+) -> ColumnElement[bool]:
+    """``key`` (the ``logs.id`` column) is one of the rows matching ``terms``.
+
+    ``id_range`` bounds the ids the caller can accept, letting FTS5 read only that slice of each
+    posting list instead of materializing every match.
+    """
+    if dialect.name == "postgresql":
+        return _search_column.op("@@")(func.to_tsquery("simple", tsquery_expression(terms)))
+    if dialect.name == "sqlite":
+        matches = select(_fts.c.rowid).where(
+            literal_column("logs_fts").op("MATCH")(fts5_expression(terms))
+        )
+        if id_range is not None:
+            matches = matches.where(_fts.c.rowid.between(*id_range))
+        return key.in_(matches)
+    raise NotImplementedError(f"log search is not supported on {dialect.name!r}")
+
+
+def unindexed(dialect: Dialect, column: ColumnElement) -> ColumnElement:
+    """``column`` with SQLite's unary ``+``, which keeps the planner off its index.
+
+    A search that has to go through the whole index must be driven by the (few) matching ids;
+    left alone SQLite prefers walking ``ix_logs_service_time`` to skip the sort, which probes
+    every row of the service.
+    """
+    if dialect.name == "sqlite":
+        return literal_column(f"+{column.table.name}.{column.name}", type_=column.type)
+    return column
+
+
+def relevance(dialect: Dialect, key: ColumnElement, terms: List[SearchTerm]) -> ColumnElement:
+    """Sort key putting the best match first (BM25 on SQLite, ``ts_rank`` on Postgres)."""
+    if dialect.name == "postgresql":
+        query = func.to_tsquery("simple", tsquery_expression(terms))
+        return func.ts_rank(_search_column, query).desc()
+    if dialect.name == "sqlite":
+        return (
+            select(_fts.c.rank)
+            .where(
+                literal_column("logs_fts").op("MATCH")(fts5_expression(terms)),
+                _fts.c.rowid == key,
+            )
+            .scalar_subquery()
+        )
+    raise NotImplementedError(f"log search is not supported on {dialect.name!r}")
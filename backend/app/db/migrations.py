@@ -0,0 +1,49 @@
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection, Engine
+
+from app.db.log_search import UNMANAGED_COLUMNS, UNMANAGED_INDEXES, UNMANAGED_TABLES
+
+ALEMBIC_DIR = Path(__file__).resolve().parents[2] / "alembic"
+
+# revision matching the schema ``SQLModel.metadata.create_all`` built before migrations existed
+BASELINE_REVISION = "0001"
+
+
+def include_object(obj, name, type_, reflected, compare_to) -> bool:
+    """Autogenerate filter hiding the search index objects that live outside the models."""
+    if type_ == "table":
+        return name not in UNMANAGED_TABLES
+    if type_ == "column":
+        return (obj.table.name, name) not in UNMANAGED_COLUMNS
+    if type_ == "index":
+        return name not in UNMANAGED_INDEXES
+    return True
+
+
+def alembic_config(connection: Connection) -> Config:
+    config = Config()
+    config.set_main_option("script_location", str(ALEMBIC_DIR))
+    config.attributes["connection"] = connection
+    return config
+
+
+def upgrade_database(engine: Engine, revision: str = "head") -> None:
+    """Bring ``engine`` up to ``revision``.
+
+    Databases created by the old ``create_all`` start-up path have the tables but no
+    ``alembic_version``; they are stamped at the baseline first so the index migration runs
+    instead of trying to create tables that already exist.
+    """
+    with engine.begin() as connection:
+        tables = set(inspect(connection).get_table_names())
+        if not tables and connection.dialect.name == "sqlite":
+            # only takes effect before the first table exists; lets retention hand pages back
+            connection.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+        config = alembic_config(connection)
+        if "metrics" in tables and "alembic_version" not in tables:
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, revision)
@@ -1,11 +1,33 @@
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Iterator
+from typing import Iterator, Tuple
 from urllib.parse import urlparse
 
-from sqlmodel import Session, SQLModel, create_engine
+from sqlalchemy.engine import Engine, make_url
+from sqlmodel import Session, create_engine
 
 from app.core.config import settings
+from app.db.migrations import upgrade_database
+from app.db.sqlite import create_sqlite_engines, is_file_database
+
+# the upserts (series, rollups, incidents, detector checkpoints) and log search are written for
+# these two; anything else would only fail at its first write
+SUPPORTED_BACKENDS = ("postgresql", "sqlite")
+
+
+def check_database_url(database_url: str) -> None:
+    """Refuse a database backend the storage layer cannot drive, before any engine is built."""
+    backend = make_url(database_url).get_backend_name()
+    if backend not in SUPPORTED_BACKENDS:
+        raise ValueError(
+            f"unsupported database backend {backend!r}; "
+            f"use one of {', '.join(SUPPORTED_BACKENDS)}"
+        )
+
+
+check_database_url(settings.database_url)
+if settings.async_database_url:
+    check_database_url(settings.async_database_url)
 
 connect_args = {"check_same_thread": False} if settings.database_url.startswith("sqlite") else {}
 
@@ -30,7 +52,16 @@ def _ensure_sqlite_dir() -> None:
 
 _ensure_sqlite_dir()
 
-engine = create_engine(settings.database_url, echo=False, connect_args=connect_args)
+
+def _create_engines() -> Tuple[Engine, Engine]:
+    if settings.sqlite_production_mode and is_file_database(settings.database_url):
+        return create_sqlite_engines(settings.database_url)
+    shared = create_engine(settings.database_url, echo=False, connect_args=connect_args)
+    return shared, shared
+
+
+# ``reader_engine`` is the same object as ``engine`` unless the SQLite production profile is on
+engine, reader_engine = _create_engines()
 
 
 def get_session() -> Iterator[Session]:
@@ -38,6 +69,12 @@ def get_session() -> Iterator[Session]:
         yield session
 
 
+def get_read_session() -> Iterator[Session]:
+    """Session on the read-only pool; use it for routes that never write."""
+    with Session(reader_engine) as session:
+        yield session
+
+
 @contextmanager
 def session_scope() -> Iterator[Session]:
     session = Session(engine)
@@ -51,5 +88,11 @@ def session_scope() -> Iterator[Session]:
         session.close()
 
 
+@contextmanager
+def read_session_scope() -> Iterator[Session]:
+    with Session(reader_engine) as session:
+        yield session
+
+
 def init_db() -> None:
-    SQLModel.metadata.create_all(engine)
+    upgrade_database(engine)
@@ -0,0 +1,76 @@
+"""SQLite production profile.
+
+A file-backed SQLite database gets WAL journaling plus connection pragmas, and the app talks to
+it through two engines: a single-connection writer, so writes queue in the pool instead of
+fighting over the file lock, and a pool of ``query_only`` readers that WAL lets run alongside
+the writer.
+"""
+
+from __future__ import annotations
+
+from typing import Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlmodel import create_engine
+
+from app.core.config import settings
+
+
+def is_file_database(database_url: str) -> bool:
+    """True for SQLite URLs that point at a file (WAL does not apply to memory databases)."""
+    url = make_url(database_url)
+    if url.get_backend_name() != "sqlite":
+        return False
+    database = url.database or ""
+    return database not in ("", ":memory:") and url.query.get("mode") != "memory"
+
+
+def connection_pragmas(read_only: bool = False) -> Tuple[str, ...]:
+    pragmas = (
+        f"PRAGMA busy_timeout = {settings.sqlite_busy_timeout_ms}",
+        f"PRAGMA synchronous = {settings.sqlite_synchronous}",
+        f"PRAGMA cache_size = -{settings.sqlite_cache_size_kib}",
+        f"PRAGMA mmap_size = {settings.sqlite_mmap_size_mb * 1024 * 1024}",
+        "PRAGMA temp_store = MEMORY",
+    )
+    if read_only:
+        return pragmas + ("PRAGMA query_only = ON",)
+    # journal_mode is persistent in the file; setting it from the writer is enough
+    return ("PRAGMA journal_mode = WAL",) + pragmas
+
+
+def apply_sqlite_pragmas(engine: Engine, read_only: bool = False) -> None:
+    """Run the profile pragmas on every new DBAPI connection of ``engine``."""
+    pragmas = connection_pragmas(read_only)
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+def create_sqlite_engines(database_url: str) -> Tuple[Engine, Engine]:
+    """Build the ``(writer, reader)`` engine pair for a file-backed SQLite database."""
+    connect_args = {"check_same_thread": False}
+    writer = create_engine(
+        database_url,
+        echo=False,
+        connect_args=connect_args,
+        pool_size=1,
+        max_overflow=0,
+    )
+    reader = create_engine(
+        database_url,
+        echo=False,
+        connect_args=connect_args,
+        pool_size=settings.sqlite_reader_pool_size,
+        max_overflow=0,
+    )
+    apply_sqlite_pragmas(writer)
+    apply_sqlite_pragmas(reader, read_only=True)
+    return writer, reader
@@ -7,9 +7,19 @@ from sqlmodel import select
 
 from app.api.routes import api_router
 from app.core.config import settings
-from app.db.session import init_db, session_scope
+from app.db.session import init_db, read_session_scope, session_scope
 from app.models import LogEntry, MetricPoint
 from app.seed import seed_sample_data
+from app.services.cold_tier import cold_tier
+from app.services.compaction import compaction_job
+from app.services.detection_pool import detection_pool
+from app.services.detection_scheduler import detection_scheduler
+from app.services.hot_store import hot_store
+from app.services.ingest_buffer import ingest_buffer
+from app.services.loop_monitor import loop_monitor
+from app.services.online_detector import online_detector
+from app.services.retention import retention_engine
+from app.services.segment_store import segment_store
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +47,46 @@ def create_app() -> FastAPI:
                     seed_sample_data(session)
             except Exception as exc:  # pragma: no cover - defensive
                 logger.exception("startup seeding failed", exc_info=exc)
+        if settings.hot_store_enabled:
+            with read_session_scope() as session:
+                loaded = hot_store.warm(session)
+            logger.info("hot store warmed with %d points", loaded)
+        if settings.online_detector_enabled:
+            with read_session_scope() as session:
+                report = online_detector.load(session)
+            logger.info("online detector loaded: %s", report)
+        if settings.segment_store_enabled:
+            recovered = segment_store.open()
+            with read_session_scope() as session:
+                synced = segment_store.sync(session)
+            logger.info("segment store opened: %s, synced: %s", recovered, synced)
+
+    @app.on_event("startup")
+    async def start_background_tasks() -> None:  # pragma: no cover
+        await loop_monitor.start()
+        if settings.detection_scheduler_enabled:
+            await detection_scheduler.start()
+        await ingest_buffer.start()
+        if settings.online_detector_enabled:
+            await online_detector.start()
+        if settings.retention_enabled:
+            await retention_engine.start()
+        if settings.compaction_enabled:
+            await compaction_job.start()
+        if settings.cold_tier_enabled:
+            await cold_tier.start()
+
+    @app.on_event("shutdown")
+    async def stop_background_tasks() -> None:  # pragma: no cover
+        await cold_tier.stop()
+        await compaction_job.stop()
+        await retention_engine.stop()
+        await online_detector.stop()
+        await ingest_buffer.stop()
+        # after the buffer, so the series its final flush queued are evaluated too
+        await detection_scheduler.stop()
+        await loop_monitor.stop()
+        detection_pool.shutdown()
 
     app.include_router(api_router, prefix="/api/v1")
 
@@ -1,5 +1,19 @@
+from .chunk import MetricChunk
+from .detector import DetectorState
+from .dimension import MetricName, Series, Service
 from .incident import Incident
 from .log import LogEntry
 from .metric import MetricPoint
+from .rollup import MetricRollup
 
-__all__ = ["LogEntry", "MetricPoint", "Incident"]
+__all__ = [
+    "DetectorState",
+    "LogEntry",
+    "MetricChunk",
+    "MetricName",
+    "MetricPoint",
+    "MetricRollup",
+    "Incident",
+    "Series",
+    "Service",
+]
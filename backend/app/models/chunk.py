@@ -0,0 +1,23 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Column, Index, LargeBinary
+from sqlmodel import Field, SQLModel
+
+
+class MetricChunk(SQLModel, table=True):
+    """One sealed, Gorilla-encoded time slice of a metric series (see ``app.db.chunk_codec``)."""
+
+    __tablename__ = "metric_chunks"
+    __table_args__ = (
+        Index("ux_metric_chunks_series_start", "service", "metric", "chunk_start", unique=True),
+        Index("ix_metric_chunks_end_time", "end_time"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    service: str
+    metric: str
+    chunk_start: datetime
+    end_time: datetime
+    count: int
+    payload: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from sqlalchemy import Column, LargeBinary
+from sqlmodel import Field, SQLModel
+
+
+class DetectorState(SQLModel, table=True):
+    """Checkpoint of one series' online detector state (see ``app.services.online_detector``).
+
+    ``payload`` holds the detection window as a Gorilla chunk (``app.db.chunk_codec``); the
+    accumulators carry on from where the process that wrote the row stopped.
+    """
+
+    __tablename__ = "detector_state"
+
+    series_id: int = Field(
+        primary_key=True, foreign_key="series.id", sa_column_kwargs={"autoincrement": False}
+    )
+    last_timestamp: datetime
+    count: int
+    mean: float
+    m2: float
+    ewma: float
+    payload: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+    updated_at: datetime
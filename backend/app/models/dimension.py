@@ -0,0 +1,42 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Index
+from sqlmodel import Field, SQLModel
+
+
+class Service(SQLModel, table=True):
+    """Service name interned to a small integer key (see ``app.crud.dimensions``)."""
+
+    __tablename__ = "services"
+    __table_args__ = (Index("ux_services_name", "name", unique=True),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    name: str
+
+
+class MetricName(SQLModel, table=True):
+    __tablename__ = "metric_names"
+    __table_args__ = (Index("ux_metric_names_name", "name", unique=True),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    name: str
+
+
+class Series(SQLModel, table=True):
+    """One (service, metric) pair; raw metric rows reference it instead of repeating names.
+
+    The row doubles as the series registry: writers keep the first and last point timestamps,
+    the number of points written and the latest value up to date (see ``app.crud.series``).
+    """
+
+    __tablename__ = "series"
+    __table_args__ = (Index("ux_series_service_metric", "service_id", "metric_id", unique=True),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    service_id: int = Field(foreign_key="services.id")
+    metric_id: int = Field(foreign_key="metric_names.id")
+    first_seen: Optional[datetime] = None
+    last_seen: Optional[datetime] = None
+    point_count: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    last_value: Optional[float] = None
@@ -1,16 +1,31 @@
 from datetime import datetime
 from typing import Optional
 
+from sqlalchemy import Index, text
 from sqlmodel import Field, SQLModel
 
 
 class Incident(SQLModel, table=True):
+    """A detected anomaly on one series; at most one incident per key is open at a time."""
+
     __tablename__ = "incidents"
+    __table_args__ = (
+        Index("ix_incidents_key_status", "incident_key", "status"),
+        Index(
+            "ux_incidents_open_key",
+            "incident_key",
+            unique=True,
+            sqlite_where=text("status = 'open'"),
+            postgresql_where=text("status = 'open'"),
+        ),
+        Index("ix_incidents_status_severity", "status", "severity", "detected_at"),
+        Index("ix_incidents_service_metric", "service", "metric"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    incident_key: str = Field(index=True)
-    service: str = Field(index=True)
-    metric: str = Field(index=True)
+    incident_key: str
+    service: str
+    metric: str
     severity: int = Field(default=0)
     detected_at: datetime = Field(default_factory=datetime.utcnow, index=True)
     window_start: datetime
@@ -1,18 +1,44 @@
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, Optional
 
-from sqlalchemy import Column, Text
+from sqlalchemy import JSON, Column, Computed, Index, String, event
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlmodel import Field, SQLModel
 
+from app.db import log_search
+
+
+def _promoted(key: str) -> Column:
+    # ``->>`` reads a key as text on both Postgres and SQLite (3.38+); generated columns are
+    # VIRTUAL on SQLite and STORED on Postgres
+    return Column(key, String, Computed(f"context ->> '{key}'"), index=True)
+
 
 class LogEntry(SQLModel, table=True):
     __tablename__ = "logs"
+    __table_args__ = (Index("ix_logs_service_time", "service_id", "timestamp"),)
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    service: str = Field(index=True)
+    service_id: int = Field(foreign_key="services.id")
     level: str = Field(default="INFO", index=True)
     timestamp: datetime = Field(default_factory=datetime.utcnow, index=True)
     request_id: Optional[str] = Field(default=None, index=True)
     message: str
     latency_ms: Optional[float] = None
-    context: Optional[str] = Field(default=None, sa_column=Column(Text))
+    context: Optional[Dict[str, Any]] = Field(
+        default=None,
+        sa_column=Column(
+            JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), "postgresql")
+        ),
+    )
+    # context keys that are filtered on, promoted to indexed generated columns
+    path: Optional[str] = Field(default=None, sa_column=_promoted("path"))
+    upstream: Optional[str] = Field(default=None, sa_column=_promoted("upstream"))
+    keyword: Optional[str] = Field(default=None, sa_column=_promoted("keyword"))
+    status_code: Optional[str] = Field(default=None, sa_column=_promoted("status_code"))
+
+
+@event.listens_for(LogEntry.__table__, "after_create")
+def _install_search(target, connection, **kw) -> None:
+    # create_all builds the full-text index too; migration 0006 does the same for alembic
+    log_search.install(connection)
@@ -1,14 +1,19 @@
 from datetime import datetime
 from typing import Optional
 
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 
 
 class MetricPoint(SQLModel, table=True):
     __tablename__ = "metrics"
+    __table_args__ = (
+        # every series read filters on the series and orders by time; carrying the value
+        # makes the index covering so the table is never touched
+        Index("ix_metrics_series_time", "series_id", "timestamp", "value"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    service: str = Field(index=True)
-    metric: str = Field(index=True)
+    series_id: int = Field(foreign_key="series.id")
     timestamp: datetime = Field(default_factory=datetime.utcnow, index=True)
     value: float
@@ -0,0 +1,36 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Index
+from sqlmodel import Field, SQLModel
+
+
+class MetricRollup(SQLModel, table=True):
+    """Pre-aggregated metric bucket at a fixed resolution (in seconds)."""
+
+    __tablename__ = "metric_rollups"
+    __table_args__ = (
+        # the upsert conflict target and the range-read index in one
+        Index(
+            "ux_metric_rollups_series_bucket",
+            "resolution",
+            "service",
+            "metric",
+            "bucket",
+            unique=True,
+        ),
+        # retention deletes expired buckets across every series
+        Index("ix_metric_rollups_bucket", "bucket"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    resolution: int
+    service: str
+    metric: str
+    bucket: datetime
+    count: int
+    value_sum: float
+    value_min: float
+    value_max: float
+    last_value: float
+    last_timestamp: datetime
@@ -5,10 +5,20 @@ from .incidents import (
     IncidentTimelineResponse,
 )
 from .logs import LogBatch, LogCreate, LogIngestResult, LogRead
-from .metrics import MetricBatch, MetricIngestResult, MetricPointCreate, MetricQuery
+from .metrics import (
+    IngestBufferStats,
+    MetricBatch,
+    MetricEnqueueResult,
+    MetricIngestResult,
+    MetricPointCreate,
+    MetricQuery,
+    MetricStreamChunk,
+    MetricStreamResult,
+)
 from .postmortem import PostmortemResponse
 from .root_cause import Evidence, Hypothesis, RootCauseResponse
 from .services import (
+    MetricRangeResponse,
     ServiceLogsResponse,
     ServiceMetricsResponse,
     ServiceSummaryResponse,
@@ -23,10 +33,15 @@ __all__ = [
     "LogCreate",
     "LogIngestResult",
     "LogRead",
+    "IngestBufferStats",
     "MetricBatch",
+    "MetricEnqueueResult",
     "MetricIngestResult",
     "MetricPointCreate",
     "MetricQuery",
+    "MetricRangeResponse",
+    "MetricStreamChunk",
+    "MetricStreamResult",
     "PostmortemResponse",
     "Evidence",
     "Hypothesis",
@@ -25,6 +25,9 @@ class LogBatch(BaseModel):
 class LogIngestResult(BaseModel):
     ingested: int
     skipped: int
+    lines: Optional[int] = None
+    duration_ms: Optional[float] = None
+    lines_per_sec: Optional[float] = None
 
 
 class LogRead(LogBase):
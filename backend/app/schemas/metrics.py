@@ -25,6 +25,44 @@ class MetricIngestResult(BaseModel):
     incidents_triggered: int = 0
 
 
+class MetricStreamChunk(BaseModel):
+    index: int
+    accepted: int
+    skipped: int
+
+
+class MetricStreamResult(BaseModel):
+    ingested: int
+    skipped: int
+    chunks: List[MetricStreamChunk]
+    incidents_triggered: int = 0
+
+
+class MetricEnqueueResult(BaseModel):
+    accepted: int
+    pending: int
+
+
+class IngestBufferStats(BaseModel):
+    accepted_total: int
+    rejected_total: int
+    flushed_total: int
+    retried_total: int
+    dropped_total: int
+    flushes: int
+    incidents_triggered: int
+    last_flush_rows: int
+    last_flush_ms: Optional[float] = None
+    last_error: Optional[str] = None
+    pending: int
+    in_flight: int
+    capacity: int
+    flush_rows: int
+    flush_interval_ms: int
+    max_retries: int
+    running: bool
+
+
 class MetricQuery(BaseModel):
     service: str
     metric: str
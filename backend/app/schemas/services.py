@@ -29,6 +29,21 @@ class ServiceMetricsResponse(BaseModel):
     points: List[SparklinePoint]
 
 
+class MetricRangePoint(BaseModel):
+    timestamp: str
+    value: float
+    min: float
+    max: float
+    count: int
+
+
+class MetricRangeResponse(BaseModel):
+    service: str
+    metric: str
+    resolution_seconds: int
+    points: List[MetricRangePoint]
+
+
 class ServiceLogsResponse(BaseModel):
     service: str
     items: List[LogRead]
@@ -6,12 +6,29 @@ from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Dict, Iterable, List, Tuple
 
-from sqlalchemy import delete, func, select
-from sqlmodel import Session
-
-from app.models import Incident, LogEntry, MetricPoint
+from sqlalchemy import delete, func
+from sqlmodel import Session, select
+
+from app.crud import logs as log_crud
+from app.crud import metrics as metric_crud
+from app.crud.dimensions import dimension_cache
+from app.crud.series import series_registry
+from app.models import (
+    DetectorState,
+    Incident,
+    LogEntry,
+    MetricChunk,
+    MetricName,
+    MetricPoint,
+    MetricRollup,
+    Series,
+    Service,
+)
 from app.schemas import LogCreate, MetricPointCreate
+from app.services.hot_store import hot_store
 from app.services.incident_detector import IncidentDetector
+from app.services.online_detector import online_detector
+from app.services.segment_store import segment_store
 
 BASE_PATH = Path(__file__).resolve()
 DATA_FILENAMES = {
@@ -39,21 +56,32 @@ def seed_sample_data(session: Session, *, force: bool = False) -> Dict[str, obje
 
     if force:
         session.exec(delete(Incident))
+        session.exec(delete(DetectorState))
         session.exec(delete(MetricPoint))
+        session.exec(delete(MetricRollup))
+        session.exec(delete(MetricChunk))
+        hot_store.clear()
+        online_detector.clear()
+        segment_store.clear()
         session.exec(delete(LogEntry))
+        session.exec(delete(Series))
+        session.exec(delete(MetricName))
+        session.exec(delete(Service))
         session.commit()
+        dimension_cache.clear()
+        series_registry.clear()
 
     raw_metrics, raw_logs = _load_payloads()
     latest_demo_ts = _latest_timestamp(raw_metrics, raw_logs)
     now = datetime.now(timezone.utc)
     shift = now - latest_demo_ts if latest_demo_ts else timedelta(0)
 
-    metrics = [_build_metric(entry, shift=shift) for entry in raw_metrics]
-    logs = [_build_log(entry, shift=shift) for entry in raw_logs]
-
-    session.add_all(metrics)
-    session.add_all(logs)
-    session.commit()
+    metrics = metric_crud.bulk_create_metrics(
+        session, (_build_metric(entry, shift=shift) for entry in raw_metrics)
+    )
+    logs = log_crud.bulk_create_logs(
+        session, (_build_log(entry, shift=shift) for entry in raw_logs)
+    )
 
     detector = IncidentDetector(session)
     incidents = detector.evaluate_all_services()
@@ -66,25 +94,24 @@ def seed_sample_data(session: Session, *, force: bool = False) -> Dict[str, obje
     }
 
 
-def _build_metric(entry: Dict[str, object], *, shift: timedelta) -> MetricPoint:
+def _build_metric(entry: Dict[str, object], *, shift: timedelta) -> MetricPointCreate:
     timestamp = _parse_timestamp(entry["timestamp"]) + shift
     metric_name = METRIC_NAME_MAP.get(
         entry.get("metric", ""), entry.get("metric", "latency_p95_ms")
     )
-    payload = MetricPointCreate(
+    return MetricPointCreate(
         service=entry["service"],
         metric=metric_name,
         timestamp=timestamp,
         value=float(entry["value"]),
     )
-    return MetricPoint.model_validate(payload)
 
 
-def _build_log(entry: Dict[str, object], *, shift: timedelta) -> LogEntry:
+def _build_log(entry: Dict[str, object], *, shift: timedelta) -> LogCreate:
     latency = entry.get("latency_ms")
     if latency is None:
         latency = entry.get("latency_p95_ms")
-    payload = LogCreate(
+    return LogCreate(
         service=entry["service"],
         timestamp=_parse_timestamp(entry["timestamp"]) + shift,
         level=entry.get("level", "INFO"),
@@ -93,15 +120,6 @@ def _build_log(entry: Dict[str, object], *, shift: timedelta) -> LogEntry:
         latency_ms=latency,
         context=entry.get("context"),
     )
-    return LogEntry(
-        service=payload.service,
-        timestamp=payload.timestamp,
-        level=payload.level,
-        request_id=payload.request_id,
-        message=payload.message,
-        latency_ms=payload.latency_ms,
-        context=json.dumps(payload.context) if payload.context else None,
-    )
 
 
 def _load_payloads() -> Tuple[List[Dict[str, object]], List[Dict[str, object]]]:
@@ -2,9 +2,17 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import datetime
+from itertools import chain
 from statistics import fmean, pstdev
-from typing import Iterable, Sequence
+from typing import Any, Iterable, List, Optional, Sequence
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+# points of one series the detectors look at: the history plus the recent window
+DETECTION_POINTS = 240
 POSITIVE_ONLY_METRICS = {"latency_p95_ms", "error_rate", "memory_rss_mb", "cpu_pct"}
 
 
@@ -55,29 +63,51 @@ def detect_anomaly(
     recent_window = values[-window_size:]
     baseline = _safe_mean(baseline_window[-window_size * 3 :])
     observed = _safe_mean(recent_window)
+    if metric in POSITIVE_ONLY_METRICS and observed <= (baseline or 1e-6) * 1.05:
+        return None  # assess_window would reject it too; skip the pstdev
+
+    return assess_window(
+        metric,
+        baseline=baseline,
+        observed=observed,
+        z_score=abs(_z_score(baseline_window, observed)),
+        ewma_baseline=_ewma(baseline_window),
+        window_start=timestamps[-window_size],
+        window_end=timestamps[-1],
+    )
+
+
+def assess_window(
+    metric: str,
+    baseline: float,
+    observed: float,
+    z_score: float,
+    ewma_baseline: float,
+    window_start: datetime,
+    window_end: datetime,
+) -> AnomalyAssessment | None:
+    """Score a recent window against its baseline statistics (shared by every detector).
+
+    ``baseline`` is the mean of the last three windows before the recent one, ``z_score`` the
+    absolute z-score of ``observed`` against the whole history and ``ewma_baseline`` the EWMA
+    of that history.
+    """
     if baseline == 0 and metric in POSITIVE_ONLY_METRICS:
         baseline = 1e-6
 
     if metric in POSITIVE_ONLY_METRICS and observed <= baseline * 1.05:
         return None
 
-    z_val = abs(_z_score(baseline_window, observed))
-    ewma_baseline = _ewma(baseline_window)
     ewma_delta = abs(observed - ewma_baseline)
     pct_change = abs((observed - baseline) / (abs(baseline) + 1e-6))
 
-    severity_score = pct_change * 45 + z_val * 20 + (ewma_delta / (abs(baseline) + 1e-6)) * 25
+    severity_score = pct_change * 45 + z_score * 20 + (ewma_delta / (abs(baseline) + 1e-6)) * 25
 
     severity = min(100, int(round(severity_score)))
     if severity < 55:
         return None
 
-    window_start = timestamps[-window_size]
-    window_end = timestamps[-1]
-
-    summary = (
-        f"{metric} deviated by {pct_change:.1%} (baseline {baseline:.2f}, observed {observed:.2f})"
-    )
+    summary = _summary(metric, pct_change, baseline, observed)
 
     return AnomalyAssessment(
         severity=severity,
@@ -90,6 +120,12 @@ def detect_anomaly(
     )
 
 
+def _summary(metric: str, pct_change: float, baseline: float, observed: float) -> str:
+    return (
+        f"{metric} deviated by {pct_change:.1%} (baseline {baseline:.2f}, observed {observed:.2f})"
+    )
+
+
 def detect_for_series(
     series: Iterable[tuple[datetime, float]],
     metric: str,
@@ -100,3 +136,141 @@ def detect_for_series(
         timestamps.append(ts)
         values.append(value)
     return detect_anomaly(values, timestamps, metric=metric, window_size=window_size)
+
+
+@dataclass
+class BatchScores:
+    """Per-series detector outputs of :func:`detect_batch`, one array entry per row."""
+
+    baseline: Any
+    observed: Any
+    z_score: Any
+    ewma: Any
+    pct_change: Any
+    severity: Any
+    flagged: Any
+
+
+def _right_align(lengths: Any, flat: Any, width: Optional[int] = None) -> tuple[Any, Any]:
+    width = int(lengths.max(initial=0)) if width is None else width
+    rows = np.repeat(np.arange(len(lengths)), lengths)
+    starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    columns = np.arange(len(flat)) - starts + np.repeat(width - lengths, lengths)
+    values = np.zeros((len(lengths), width))
+    mask = np.zeros((len(lengths), width), dtype=bool)
+    values[rows, columns] = flat
+    mask[rows, columns] = True
+    return values, mask
+
+
+def pack_series(series: Sequence[Sequence[float]], width: Optional[int] = None) -> tuple[Any, Any]:
+    """Right-align ragged series into a ``(series, width)`` array and its validity mask.
+
+    ``width`` defaults to the longest series. Row sums depend on it through NumPy's pairwise
+    summation, so batches that must score identically need the same width.
+    """
+    lengths = np.fromiter(map(len, series), dtype=np.intp, count=len(series))
+    flat = np.fromiter(chain.from_iterable(series), dtype=float, count=int(lengths.sum()))
+    return _right_align(lengths, flat, width)
+
+
+def detect_batch(
+    values: Any,
+    mask: Any,
+    metrics: Sequence[str],
+    window_size: int = 5,
+    min_points: int = 20,
+    alpha: float = 0.3,
+) -> BatchScores:
+    """:func:`detect_anomaly` for every row of ``values`` in one vectorized pass.
+
+    Rows are right-aligned (see :func:`pack_series`): ``mask`` is False for the leading padding
+    of shorter series. Scores agree with the scalar detector to float rounding (it sums with
+    ``fsum`` and exact fractions), so a severity can only differ where a score sits on a
+    rounding boundary. Needs NumPy.
+    """
+    if np is None:
+        raise RuntimeError("batch detection needs NumPy; install the 'segments' extra")
+    values = np.asarray(values, dtype=float)
+    mask = np.asarray(mask, dtype=bool)
+    rows, width = values.shape
+    cut = max(width - window_size, 0)
+    lengths = mask.sum(axis=1)
+    enough = lengths >= max(window_size * 2, min_points)
+    history = np.where(mask[:, :cut], values[:, :cut], 0.0)
+    history_mask = mask[:, :cut]
+    count = np.maximum(lengths - window_size, 1)
+
+    observed = values[:, cut:].sum(axis=1) / window_size
+    tail_mask = history_mask & (np.arange(cut) >= cut - window_size * 3)
+    baseline = (history * tail_mask).sum(axis=1) / np.maximum(tail_mask.sum(axis=1), 1)
+    positive = np.isin(np.asarray(metrics, dtype=object), list(POSITIVE_ONLY_METRICS))
+    baseline = np.where(positive & (baseline == 0), 1e-6, baseline)
+
+    mean = history.sum(axis=1) / count
+    spread = np.where(history_mask, history - mean[:, None], 0.0)
+    sigma = np.sqrt((spread**2).sum(axis=1) / count)
+    # a flat history has exactly zero spread, which summation error would otherwise hide
+    padded_max = np.where(history_mask, history, -np.inf).max(axis=1, initial=-np.inf)
+    padded_min = np.where(history_mask, history, np.inf).min(axis=1, initial=np.inf)
+    varies = (count >= 2) & (padded_max != padded_min)
+    z_score = np.abs(
+        np.divide(observed - mean, sigma, out=np.zeros(rows), where=varies & (sigma != 0))
+    )
+
+    # closed form of the EWMA recursion seeded with each row's first point
+    age = (cut - 1 - np.arange(cut)).astype(float)
+    weights = np.where(history_mask, alpha * (1 - alpha) ** age, 0.0)
+    first = np.argmax(history_mask, axis=1)
+    weights[np.arange(rows), first] = np.where(
+        lengths > window_size, (1 - alpha) ** (count - 1), 0.0
+    )
+    ewma = (weights * history).sum(axis=1)
+
+    scale = np.abs(baseline) + 1e-6
+    pct_change = np.abs((observed - baseline) / scale)
+    score = pct_change * 45 + z_score * 20 + (np.abs(observed - ewma) / scale) * 25
+    severity = np.minimum(100, np.round(score)).astype(int)
+    rising = ~positive | (observed > baseline * 1.05)
+    return BatchScores(
+        baseline=baseline,
+        observed=observed,
+        z_score=z_score,
+        ewma=ewma,
+        pct_change=pct_change,
+        severity=severity,
+        flagged=enough & rising & (severity >= 55),
+    )
+
+
+def detect_many(
+    series: Sequence[tuple[Sequence[datetime], Sequence[float]]],
+    metrics: Sequence[str],
+    window_size: int = 5,
+    width: Optional[int] = None,
+) -> List[Optional[AnomalyAssessment]]:
+    """:func:`detect_anomaly` for many ``(timestamps, values)`` series, batched through NumPy
+    when it is installed (see :func:`pack_series` for ``width``)."""
+    if np is None or len(series) < 2:
+        return [
+            detect_anomaly(values, timestamps, metric=metric, window_size=window_size)
+            for (timestamps, values), metric in zip(series, metrics, strict=True)
+        ]
+    values, mask = pack_series([values for _, values in series], width)
+    scores = detect_batch(values, mask, metrics, window_size=window_size)
+    assessments: List[Optional[AnomalyAssessment]] = [None] * len(series)
+    for row in np.flatnonzero(scores.flagged).tolist():
+        baseline = float(scores.baseline[row])
+        observed = float(scores.observed[row])
+        pct_change = float(scores.pct_change[row])
+        timestamps = series[row][0]
+        assessments[row] = AnomalyAssessment(
+            severity=int(scores.severity[row]),
+            baseline=baseline,
+            observed=observed,
+            window_start=timestamps[-window_size],
+            window_end=timestamps[-1],
+            detector="zscore_ewma",
+            summary=_summary(metrics[row], pct_change, baseline, observed),
+        )
+    return assessments
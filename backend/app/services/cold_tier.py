@@ -0,0 +1,408 @@
+"""Parquet cold tier for aged metrics and logs.
+
+Metric points (raw rows and sealed chunks) and log entries older than ``cold_tier_hot_days``
+move out of the database into compressed Parquet files partitioned by day and service::
+
+    <cold_tier_dir>/metrics/date=2024-03-01/service=api/raw-<first id>-<last id>.parquet
+    <cold_tier_dir>/logs/date=2024-03-01/service=api/part-<first id>-<last id>.parquet
+
+Each batch is written (to a temporary name, then renamed) before its rows are deleted, and the
+file name comes from the batch's id range, so a run interrupted between the two rewrites the
+same file instead of duplicating it. Rows are sorted by metric and timestamp inside a file, which
+keeps the row-group statistics tight: reads only open the day/service directories a window
+covers and let Parquet skip row groups whose metric or time range does not match.
+
+Set the hot horizon below the retention TTLs, or retention deletes rows before they are tiered.
+Needs the ``cold`` extra (pyarrow).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import shutil
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import quote
+
+from sqlalchemy import delete
+from sqlmodel import Session, select
+
+from app.core.concurrency import run_blocking
+from app.core.config import settings
+from app.db.chunk_codec import decode_chunk, from_micros
+from app.db.session import session_scope
+from app.models import LogEntry, MetricChunk, MetricPoint, Service
+from app.services.hot_store import hot_store
+from app.services.online_detector import online_detector
+from app.services.segment_store import segment_store
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+ROW_GROUP_ROWS = 65_536
+_COMPRESSION = "zstd"
+
+Partition = Tuple[date, str]
+
+
+def _metric_schema() -> Any:
+    return pa.schema(
+        [
+            ("metric", pa.dictionary(pa.int32(), pa.string())),
+            ("timestamp", pa.timestamp("us")),
+            ("value", pa.float64()),
+        ]
+    )
+
+
+def _log_schema() -> Any:
+    return pa.schema(
+        [
+            ("timestamp", pa.timestamp("us")),
+            ("level", pa.dictionary(pa.int32(), pa.string())),
+            ("request_id", pa.string()),
+            ("message", pa.string()),
+            ("latency_ms", pa.float64()),
+            ("context", pa.string()),
+        ]
+    )
+
+
+def _days(lower: datetime, upper: datetime) -> Iterable[date]:
+    day = lower.date()
+    while day <= upper.date():
+        yield day
+        day += timedelta(days=1)
+
+
+class ColdTier:
+    def __init__(
+        self,
+        root: Path,
+        hot_after: timedelta,
+        batch_rows: int,
+        keep: Optional[timedelta],
+        interval: float,
+        enabled: bool = True,
+    ) -> None:
+        self.root = root
+        self.hot_after = hot_after
+        self.batch_rows = batch_rows
+        self.keep = keep
+        self.interval = interval
+        self.enabled = enabled
+        self.last_report: Optional[Dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+        self._files_read = 0
+
+    @property
+    def available(self) -> bool:
+        return pa is not None
+
+    def horizon(self, now: Optional[datetime] = None) -> datetime:
+        """Rows older than this belong in the cold tier."""
+        return (now or datetime.utcnow()) - self.hot_after
+
+    def covers(self, lower: datetime) -> bool:
+        """Whether a window starting at ``lower`` may reach into the cold tier."""
+        return self.enabled and self.available and lower < self.horizon()
+
+    def _directory(self, kind: str, partition: Partition) -> Path:
+        day, service = partition
+        return self.root / kind / f"date={day.isoformat()}" / f"service={quote(service, safe='')}"
+
+    def _write(self, kind: str, partition: Partition, name: str, table: Any) -> int:
+        directory = self._directory(kind, partition)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{name}.parquet"
+        partial = path.with_suffix(".tmp")
+        pq.write_table(table, partial, compression=_COMPRESSION, row_group_size=ROW_GROUP_ROWS)
+        os.replace(partial, path)
+        return path.stat().st_size
+
+    def _write_points(
+        self, prefix: str, ids: Sequence[int], points: Iterable[Tuple[str, str, datetime, float]]
+    ) -> Dict[str, int]:
+        partitions: Dict[Partition, List[Tuple[str, datetime, float]]] = defaultdict(list)
+        for service, metric, timestamp, value in points:
+            partitions[(timestamp.date(), service)].append((metric, timestamp, value))
+        written = {"files": 0, "bytes": 0, "points": 0}
+        name = f"{prefix}-{min(ids)}-{max(ids)}"
+        for partition, rows in partitions.items():
+            rows.sort()
+            metrics, timestamps, values = zip(*rows, strict=True)
+            table = pa.table([metrics, timestamps, values], schema=_metric_schema())
+            written["bytes"] += self._write("metrics", partition, name, table)
+            written["files"] += 1
+            written["points"] += len(rows)
+        return written
+
+    def _archive_raw(self, session: Session, before: datetime) -> Dict[str, int]:
+        from app.crud.dimensions import named_series  # the crud layer reads this tier
+
+        totals = {"files": 0, "bytes": 0, "points": 0}
+        while True:
+            rows = session.exec(
+                select(
+                    MetricPoint.id, MetricPoint.series_id, MetricPoint.timestamp, MetricPoint.value
+                )
+                .where(MetricPoint.timestamp < before)
+                .order_by(MetricPoint.id)
+                .limit(self.batch_rows)
+            ).all()
+            if not rows:
+                return totals
+            names = {
+                key: (service, metric) for key, service, metric in session.exec(named_series())
+            }
+            ids = [row[0] for row in rows]
+            points = ((*names[series_id], ts, value) for _, series_id, ts, value in rows)
+            for key, value in self._write_points("raw", ids, points).items():
+                totals[key] += value
+            session.exec(delete(MetricPoint).where(MetricPoint.id.in_(ids)))
+            session.commit()
+
+    def _archive_chunks(self, session: Session, before: datetime) -> Dict[str, int]:
+        totals = {"files": 0, "bytes": 0, "points": 0, "chunks": 0}
+        # a chunk holds up to an hour of one series, so batches are counted in chunks
+        limit = max(1, self.batch_rows // 1000)
+        while True:
+            chunks = session.exec(
+                select(MetricChunk)
+                .where(MetricChunk.end_time < before)
+                .order_by(MetricChunk.id)
+                .limit(limit)
+            ).all()
+            if not chunks:
+                return totals
+            points = []
+            for chunk in chunks:
+                timestamps, values = decode_chunk(chunk.payload)
+                points.extend(
+                    (chunk.service, chunk.metric, from_micros(ts), value)
+                    for ts, value in zip(timestamps, values, strict=True)
+                )
+            ids = [chunk.id for chunk in chunks]
+            for key, value in self._write_points("chunk", ids, points).items():
+                totals[key] += value
+            totals["chunks"] += len(chunks)
+            session.exec(delete(MetricChunk).where(MetricChunk.id.in_(ids)))
+            session.commit()
+
+    def _archive_logs(self, session: Session, before: datetime) -> Dict[str, int]:
+        totals = {"files": 0, "bytes": 0, "logs": 0}
+        columns = (
+            LogEntry.id,
+            LogEntry.service_id,
+            LogEntry.timestamp,
+            LogEntry.level,
+            LogEntry.request_id,
+            LogEntry.message,
+            LogEntry.latency_ms,
+            LogEntry.context,
+        )
+        while True:
+            rows = session.exec(
+                select(*columns)
+                .where(LogEntry.timestamp < before)
+                .order_by(LogEntry.id)
+                .limit(self.batch_rows)
+            ).all()
+            if not rows:
+                return totals
+            names = dict(session.exec(select(Service.id, Service.name)).all())
+            partitions: Dict[Partition, List[tuple]] = defaultdict(list)
+            for _, service_id, timestamp, *rest in rows:
+                partitions[(timestamp.date(), names[service_id])].append((timestamp, *rest))
+            ids = [row[0] for row in rows]
+            name = f"part-{min(ids)}-{max(ids)}"
+            for partition, entries in partitions.items():
+                entries.sort(key=lambda entry: entry[0])
+                columns_out = [list(column) for column in zip(*entries, strict=True)]
+                columns_out[5] = [
+                    json.dumps(context) if context is not None else None
+                    for context in columns_out[5]
+                ]
+                table = pa.table(columns_out, schema=_log_schema())
+                totals["bytes"] += self._write("logs", partition, name, table)
+                totals["files"] += 1
+            totals["logs"] += len(rows)
+            session.exec(delete(LogEntry).where(LogEntry.id.in_(ids)))
+            session.commit()
+
+    def _prune(self, now: datetime) -> int:
+        """Remove day partitions older than the cold retention; returns directories removed."""
+        if self.keep is None:
+            return 0
+        oldest = (now - self.keep).date().isoformat()
+        removed = 0
+        for directory in self.root.glob("*/date=*"):
+            if directory.name.removeprefix("date=") < oldest:
+                shutil.rmtree(directory)
+                removed += 1
+        return removed
+
+    def run(self, session: Session, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Move every row older than the hot horizon into Parquet and delete it."""
+        if pa is None:
+            raise RuntimeError("the cold tier needs pyarrow; install the 'cold' extra")
+        now = now or datetime.utcnow()
+        started = time.perf_counter()
+        before = self.horizon(now)
+        raw = self._archive_raw(session, before)
+        chunks = self._archive_chunks(session, before)
+        logs = self._archive_logs(session, before)
+        if raw["points"]:
+            hot_store.trim_before(before)
+            online_detector.trim_before(before)
+            segment_store.drop_before(before)
+        recounted = 0
+        if raw["points"] or chunks["points"]:
+            from app.crud.series import expired_series, reconcile_series  # see _archive_raw
+
+            series = expired_series(session, before)
+            reconcile_series(session, series)
+            recounted = len(series)
+        report = {
+            "started_at": now.isoformat(),
+            "tiered_before": before.isoformat(),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            "points": raw["points"] + chunks["points"],
+            "series_recounted": recounted,
+            "chunks": chunks["chunks"],
+            "logs": logs["logs"],
+            "files": raw["files"] + chunks["files"] + logs["files"],
+            "bytes": raw["bytes"] + chunks["bytes"] + logs["bytes"],
+            "pruned_partitions": self._prune(now),
+        }
+        self.last_report = report
+        logger.info(
+            "cold tier moved %d points and %d logs in %.0f ms",
+            report["points"],
+            report["logs"],
+            report["duration_ms"],
+        )
+        return report
+
+    def _files(self, kind: str, service: str, lower: datetime, upper: datetime) -> List[str]:
+        files = [
+            str(path)
+            for day in _days(lower, upper)
+            for path in sorted(self._directory(kind, (day, service)).glob("*.parquet"))
+        ]
+        self._files_read += len(files)
+        return files
+
+    def metric_points(
+        self, service: str, metric: str, lower: datetime, upper: datetime, limit: Optional[int]
+    ) -> List[Tuple[datetime, float]]:
+        """Archived ``(timestamp, value)`` points of one series in ``[lower, upper]``."""
+        files = self._files("metrics", service, lower, upper)
+        if not files:
+            return []
+        condition = (
+            (pc.field("metric") == metric)
+            & (pc.field("timestamp") >= pa.scalar(lower, pa.timestamp("us")))
+            & (pc.field("timestamp") <= pa.scalar(upper, pa.timestamp("us")))
+        )
+        table = (
+            ds.dataset(files, schema=_metric_schema(), format="parquet")
+            .to_table(columns=["timestamp", "value"], filter=condition)
+            .sort_by("timestamp")
+        )
+        if limit is not None:
+            table = table.slice(0, limit)
+        return list(
+            zip(
+                table.column("timestamp").to_pylist(),
+                table.column("value").to_pylist(),
+                strict=True,
+            )
+        )
+
+    def log_entries(
+        self, service: str, lower: datetime, upper: datetime, limit: Optional[int]
+    ) -> List[Dict[str, Any]]:
+        """Archived entries of one service in ``[lower, upper]`` as ``LogRow`` fields."""
+        files = self._files("logs", service, lower, upper)
+        if not files:
+            return []
+        condition = (pc.field("timestamp") >= pa.scalar(lower, pa.timestamp("us"))) & (
+            pc.field("timestamp") <= pa.scalar(upper, pa.timestamp("us"))
+        )
+        table = (
+            ds.dataset(files, schema=_log_schema(), format="parquet")
+            .to_table(filter=condition)
+            .sort_by("timestamp")
+        )
+        if limit is not None:
+            table = table.slice(0, limit)
+        entries = table.to_pylist()
+        for entry in entries:
+            entry["context"] = json.loads(entry["context"]) if entry["context"] else None
+        return entries
+
+    def stats(self) -> Dict[str, Any]:
+        files = list(self.root.glob("*/date=*/service=*/*.parquet")) if self.root.exists() else []
+        return {
+            "enabled": self.enabled,
+            "available": self.available,
+            "root": str(self.root),
+            "hot_days": self.hot_after / timedelta(days=1),
+            "keep_days": self.keep / timedelta(days=1) if self.keep is not None else None,
+            "files": len(files),
+            "bytes": sum(path.stat().st_size for path in files),
+            "files_read": self._files_read,
+            "interval_minutes": self.interval / 60,
+            "running": self._task is not None and not self._task.done(),
+            "last_report": self.last_report,
+        }
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await run_blocking(self._run_scheduled)
+            except Exception:
+                logger.exception("scheduled cold tier run failed")
+
+    def _run_scheduled(self) -> Dict[str, Any]:
+        with session_scope() as session:
+            return self.run(session)
+
+
+cold_tier = ColdTier(
+    root=Path(settings.cold_tier_dir),
+    hot_after=timedelta(days=settings.cold_tier_hot_days),
+    batch_rows=settings.cold_tier_batch_rows,
+    keep=(timedelta(days=settings.cold_tier_keep_days) if settings.cold_tier_keep_days else None),
+    interval=settings.cold_tier_interval_minutes * 60,
+    enabled=settings.cold_tier_enabled,
+)
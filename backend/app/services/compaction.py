@@ -0,0 +1,110 @@
+"""Seal old raw metric rows into compressed chunks.
+
+Rows stay in ``metrics`` while they are recent enough to receive late points and to be read by
+detection; once a whole ``metric_chunk_seconds`` slice is older than ``compaction_delay_minutes``
+the job folds it into one ``metric_chunks`` row per series (see ``app.db.chunk_codec``) and
+deletes the raw rows. Each series commits on its own so ingest can interleave with a large run.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlmodel import Session
+
+from app.core.concurrency import run_blocking
+from app.core.config import settings
+from app.crud import chunks as chunk_crud
+from app.crud.rollups import bucket_start
+from app.db.session import session_scope
+
+logger = logging.getLogger(__name__)
+
+
+class CompactionJob:
+    def __init__(self, chunk_seconds: int, delay: timedelta, interval: float) -> None:
+        self.chunk_seconds = chunk_seconds
+        self.delay = delay
+        self.interval = interval
+        self.last_report: Optional[Dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def horizon(self, now: datetime) -> datetime:
+        """Start of the newest slice that is not sealed yet."""
+        return bucket_start(now - self.delay, self.chunk_seconds)
+
+    def run(self, session: Session, now: Optional[datetime] = None) -> Dict[str, Any]:
+        now = now or datetime.utcnow()
+        started = time.perf_counter()
+        before = self.horizon(now)
+        sealed = {"series": 0, "points": 0, "chunks": 0, "bytes": 0}
+        for service, metric in chunk_crud.sealable_series(session, before):
+            result = chunk_crud.seal_series(session, service, metric, before)
+            session.commit()
+            sealed["series"] += 1
+            for key, value in result.items():
+                sealed[key] += value
+        report = {
+            "started_at": now.isoformat(),
+            "sealed_before": before.isoformat(),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            **sealed,
+            "run_bytes_per_point": (
+                round(sealed["bytes"] / sealed["points"], 3) if sealed["points"] else None
+            ),
+            "storage": chunk_crud.storage_stats(session),
+        }
+        self.last_report = report
+        logger.info(
+            "compaction sealed %d points into %d chunks in %.0f ms",
+            sealed["points"],
+            sealed["chunks"],
+            report["duration_ms"],
+        )
+        return report
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "chunk_seconds": self.chunk_seconds,
+            "delay_minutes": self.delay / timedelta(minutes=1),
+            "interval_minutes": self.interval / 60,
+            "running": self._task is not None and not self._task.done(),
+            "last_report": self.last_report,
+        }
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await run_blocking(self._run_scheduled)
+            except Exception:
+                logger.exception("scheduled compaction run failed")
+
+    def _run_scheduled(self) -> Dict[str, Any]:
+        with session_scope() as session:
+            return self.run(session)
+
+
+compaction_job = CompactionJob(
+    chunk_seconds=settings.metric_chunk_seconds,
+    delay=timedelta(minutes=settings.compaction_delay_minutes),
+    interval=settings.compaction_interval_minutes * 60,
+)
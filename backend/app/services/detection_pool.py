@@ -0,0 +1,131 @@
+"""Process pool that scores large detection refreshes on every core.
+
+:func:`app.services.anomaly.detect_many` runs on one core. A refresh of at least ``min_series``
+series is instead split into one contiguous shard per worker, and each shard travels as flat
+``array`` buffers of lengths and values rather than row objects. Every shard is packed to the
+width of the whole refresh, so each series goes through exactly the arithmetic of the serial
+path and the assessments are identical to it.
+
+Workers are spawned rather than forked, because the API process runs threads. They start on
+first use and are kept for later refreshes.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import threading
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from datetime import datetime
+from itertools import chain
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.services.anomaly import AnomalyAssessment, detect_many
+
+Columns = Tuple[Sequence[datetime], Sequence[float]]
+
+
+def _score_shard(
+    lengths: array, values: array, metrics: List[str], width: int
+) -> List[Tuple[int, AnomalyAssessment]]:
+    # workers only see values, so window bounds come back as positions within each series
+    series = []
+    offset = 0
+    for length in lengths:
+        series.append((range(length), values[offset : offset + length]))
+        offset += length
+    assessments = detect_many(series, metrics, width=width)
+    return [(row, assessment) for row, assessment in enumerate(assessments) if assessment]
+
+
+class DetectionPool:
+    def __init__(self, workers: int, min_series: int) -> None:
+        self.workers = workers
+        self.min_series = min_series
+        self.last_report: Optional[Dict[str, Any]] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 1
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def detect(
+        self, series: Sequence[Columns], metrics: Sequence[str]
+    ) -> List[Optional[AnomalyAssessment]]:
+        """:func:`~app.services.anomaly.detect_many`, sharded across the workers when enabled
+        and the refresh is large enough."""
+        if not self.enabled or len(series) < max(self.min_series, self.workers * 2):
+            return detect_many(series, metrics)
+
+        started = time.perf_counter()
+        width = max(len(values) for _, values in series)
+        step, extra = divmod(len(series), self.workers)
+        bounds = []
+        lower = 0
+        for shard in range(self.workers):
+            upper = lower + step + (shard < extra)
+            bounds.append((lower, upper))
+            lower = upper
+
+        pool = self._pool()
+        futures = []
+        for lower, upper in bounds:
+            shard = series[lower:upper]
+            futures.append(
+                pool.submit(
+                    _score_shard,
+                    array("q", [len(values) for _, values in shard]),
+                    array("d", chain.from_iterable(values for _, values in shard)),
+                    list(metrics[lower:upper]),
+                    width,
+                )
+            )
+
+        results: List[Optional[AnomalyAssessment]] = [None] * len(series)
+        for (lower, _), future in zip(bounds, futures, strict=True):
+            for row, assessment in future.result():
+                timestamps = series[lower + row][0]
+                results[lower + row] = replace(
+                    assessment,
+                    window_start=timestamps[assessment.window_start],
+                    window_end=timestamps[assessment.window_end],
+                )
+        self.last_report = {
+            "series": len(series),
+            "shards": len(bounds),
+            "flagged": sum(result is not None for result in results),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+        return results
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "enabled": self.enabled,
+            "min_series": self.min_series,
+            "started": self._executor is not None,
+            "last_report": self.last_report,
+        }
+
+
+detection_pool = DetectionPool(
+    workers=settings.detection_workers, min_series=settings.detection_parallel_min_series
+)
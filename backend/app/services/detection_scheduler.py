@@ -0,0 +1,197 @@
+"""Background detection for series that received points.
+
+Ingest used to score every touched series inline, so an agent pushing once a second re-read and
+re-scored the same series every second, and ingest latency grew with detector cost. While the
+scheduler runs, ingest only marks series dirty (:meth:`DetectionScheduler.detect`). Every
+``tick`` seconds the loop evaluates the dirty series that have been quiet for ``debounce``
+seconds or first marked ``max_latency`` seconds ago, oldest first and at most
+``max_series_per_tick`` of them, then publishes the resulting incident alerts.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from contextlib import AbstractContextManager
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlmodel import Session
+
+from app.core.concurrency import run_blocking
+from app.core.config import settings
+from app.db.session import session_scope
+from app.models import Incident
+from app.services.event_bus import event_bus
+from app.services.incident_detector import IncidentDetector, TrackedMetric
+
+logger = logging.getLogger(__name__)
+
+SessionFactory = Callable[[], AbstractContextManager[Session]]
+
+
+def incident_alert(incident: Incident) -> Dict[str, Any]:
+    return {
+        "type": "incident_alert",
+        "incident_id": incident.id,
+        "service": incident.service,
+        "metric": incident.metric,
+        "severity": incident.severity,
+        "summary": incident.summary,
+    }
+
+
+class DetectionScheduler:
+    def __init__(
+        self,
+        tick: float,
+        debounce: float,
+        max_latency: float,
+        max_series_per_tick: int,
+        session_factory: Optional[SessionFactory] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.tick = tick
+        self.debounce = debounce
+        self.max_latency = max_latency
+        self.max_series_per_tick = max_series_per_tick
+        self.last_report: Optional[Dict[str, Any]] = None
+        self._session_factory = session_factory
+        self._clock = clock
+        # pair -> (first mark not yet evaluated, latest mark)
+        self._dirty: Dict[TrackedMetric, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._totals = {"marked": 0, "evaluated": 0, "incidents": 0, "failed_ticks": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def mark(self, pairs: Iterable[TrackedMetric], now: Optional[float] = None) -> int:
+        """Queue ``pairs`` for evaluation and return the queue depth."""
+        now = self._clock() if now is None else now
+        with self._lock:
+            for pair in pairs:
+                first, _ = self._dirty.get(pair, (now, now))
+                self._dirty[pair] = (first, now)
+                self._totals["marked"] += 1
+            return len(self._dirty)
+
+    def detect(self, session: Session, pairs: Iterable[TrackedMetric]) -> List[Incident]:
+        """Mark ``pairs`` while the loop runs; otherwise evaluate them now and return incidents."""
+        if self.running:
+            self.mark(pairs)
+            return []
+        return IncidentDetector(session).evaluate_metrics(sorted(set(pairs)))
+
+    def _take(self, now: float, drain: bool) -> List[Tuple[float, TrackedMetric]]:
+        with self._lock:
+            ready = [
+                (first, pair)
+                for pair, (first, last) in self._dirty.items()
+                if drain or now - last >= self.debounce or now - first >= self.max_latency
+            ]
+            ready.sort()
+            if not drain:
+                del ready[self.max_series_per_tick :]
+            for _, pair in ready:
+                del self._dirty[pair]
+        return ready
+
+    def due(self, now: Optional[float] = None, drain: bool = False) -> List[TrackedMetric]:
+        """Take the pairs to evaluate this tick off the queue (all of them when ``drain``)."""
+        now = self._clock() if now is None else now
+        return [pair for _, pair in self._take(now, drain)]
+
+    def _requeue(self, taken: List[Tuple[float, TrackedMetric]]) -> None:
+        with self._lock:
+            for first, pair in taken:
+                _, last = self._dirty.get(pair, (first, first))
+                self._dirty[pair] = (first, last)
+
+    def run_once(
+        self, session: Session, now: Optional[float] = None, drain: bool = False
+    ) -> List[Incident]:
+        now = self._clock() if now is None else now
+        started = time.perf_counter()
+        taken = self._take(now, drain)
+        pairs = [pair for _, pair in taken]
+        waited = [now - first for first, _ in taken]
+        try:
+            incidents = IncidentDetector(session).evaluate_metrics(pairs) if pairs else []
+        except Exception:
+            self._totals["failed_ticks"] += 1
+            self._requeue(taken)
+            raise
+        self._totals["evaluated"] += len(pairs)
+        self._totals["incidents"] += len(incidents)
+        self.last_report = {
+            "evaluated": len(pairs),
+            "incidents": len(incidents),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            "max_lag_seconds": round(max(waited, default=0.0), 3),
+            "mean_lag_seconds": round(sum(waited) / len(waited), 3) if waited else 0.0,
+        }
+        return incidents
+
+    def stats(self, now: Optional[float] = None) -> Dict[str, Any]:
+        now = self._clock() if now is None else now
+        with self._lock:
+            depth = len(self._dirty)
+            oldest = min((first for first, _ in self._dirty.values()), default=None)
+        return {
+            "running": self.running,
+            "queue_depth": depth,
+            "oldest_pending_seconds": round(now - oldest, 3) if oldest is not None else None,
+            "tick_seconds": self.tick,
+            "debounce_seconds": self.debounce,
+            "max_latency_seconds": self.max_latency,
+            "max_series_per_tick": self.max_series_per_tick,
+            **{f"{key}_total": value for key, value in self._totals.items()},
+            "last_report": self.last_report,
+        }
+
+    async def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the loop and evaluate everything still queued."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self._tick(drain=True)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.tick)
+            await self._tick()
+
+    async def _tick(self, drain: bool = False) -> None:
+        try:
+            alerts = await run_blocking(self._run_scheduled, drain)
+        except Exception:
+            logger.exception("scheduled detection failed")
+            return
+        for alert in alerts:
+            await event_bus.publish(alert)
+
+    def _run_scheduled(self, drain: bool = False) -> List[Dict[str, Any]]:
+        factory = self._session_factory or session_scope
+        with factory() as session:
+            return [incident_alert(incident) for incident in self.run_once(session, drain=drain)]
+
+
+detection_scheduler = DetectionScheduler(
+    tick=settings.detection_tick_ms / 1000,
+    debounce=settings.detection_debounce_ms / 1000,
+    max_latency=settings.detection_max_latency_ms / 1000,
+    max_series_per_tick=settings.detection_max_series_per_tick,
+)
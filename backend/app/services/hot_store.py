@@ -0,0 +1,270 @@
+"""Process-local hot store for recent metric points.
+
+Each (service, metric) series keeps its newest ``capacity`` points in a fixed-size ring of
+``array('q')`` epoch microseconds and ``array('d')`` values, so memory per series is bounded and
+known up front. The store is filled by ``app.crud.metrics.insert_metric_rows`` after each commit
+and warmed from the database at startup; until :meth:`HotStore.warm` has run it reports every
+read as a miss and callers fall back to SQL.
+
+The store only sees writes made by this process. Run a single API worker per database (or turn
+``hot_store_enabled`` off) and use :meth:`HotStore.verify` to check it against the database.
+"""
+
+from __future__ import annotations
+
+import bisect
+import threading
+from array import array
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.db.chunk_codec import from_micros, to_micros
+
+SeriesKey = Tuple[str, str]
+
+
+class HotPoint(NamedTuple):
+    timestamp: datetime
+    value: float
+
+
+class SeriesRing:
+    """Time-ordered ring of the newest ``capacity`` points of one series."""
+
+    __slots__ = ("capacity", "timestamps", "values", "start", "size", "evicted")
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.timestamps = array("q", bytes(8 * capacity))
+        self.values = array("d", bytes(8 * capacity))
+        self.start = 0
+        self.size = 0
+        # once a point has been evicted the ring no longer holds the whole series
+        self.evicted = False
+
+    @property
+    def nbytes(self) -> int:
+        return (len(self.timestamps) + len(self.values)) * 8
+
+    def _at(self, offset: int) -> int:
+        return (self.start + offset) % self.capacity
+
+    def point(self, offset: int) -> Tuple[int, float]:
+        """``(micros, value)`` ``offset`` places from the oldest point; negative counts back."""
+        slot = self._at(offset % self.size)
+        return self.timestamps[slot], self.values[slot]
+
+    def oldest(self) -> Optional[int]:
+        return self.timestamps[self.start] if self.size else None
+
+    def append(self, micros: int, value: float) -> None:
+        if self.size and micros < self.timestamps[self._at(self.size - 1)]:
+            self._insert_sorted(micros, value)
+            return
+        slot = self._at(self.size)
+        if self.size < self.capacity:
+            self.size += 1
+        else:
+            self.start = (self.start + 1) % self.capacity
+            self.evicted = True
+        self.timestamps[slot] = micros
+        self.values[slot] = value
+
+    def _insert_sorted(self, micros: int, value: float) -> None:
+        # late points are rare; rebuild the ring in order rather than shifting in place
+        points = self.tail(self.size)
+        bisect.insort(points, (micros, value))
+        if len(points) > self.capacity:
+            points = points[-self.capacity :]
+            self.evicted = True
+        self.start = 0
+        self.size = len(points)
+        for idx, (ts, val) in enumerate(points):
+            self.timestamps[idx] = ts
+            self.values[idx] = val
+
+    def tail(self, limit: int) -> List[Tuple[int, float]]:
+        count = min(limit, self.size)
+        first = self.size - count
+        return [
+            (self.timestamps[self._at(idx)], self.values[self._at(idx)])
+            for idx in range(first, self.size)
+        ]
+
+    def trim_before(self, micros: int) -> None:
+        while self.size and self.timestamps[self.start] < micros:
+            self.start = (self.start + 1) % self.capacity
+            self.size -= 1
+            self.evicted = True
+
+
+# stands in for a series the store knows has no points yet
+_EMPTY_RING = SeriesRing(1)
+
+
+class HotStore:
+    def __init__(self, capacity: int, max_series: int) -> None:
+        self.capacity = capacity
+        self.max_series = max_series
+        self.ready = False
+        self._series: Dict[SeriesKey, SeriesRing] = {}
+        self._untracked: set[SeriesKey] = set()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def warm(self, session: Session) -> int:
+        """Load the newest ``capacity`` points of every series and start serving reads."""
+        from app.crud import metrics as metric_crud  # the crud layer feeds this store
+
+        pairs = metric_crud.list_series(session)
+        loaded = 0
+        with self._lock:
+            self._series.clear()
+            self._untracked.clear()
+            for service, metric in pairs:
+                ring = self._ring((service, metric))
+                if ring is None:
+                    continue
+                rows = metric_crud.get_metric_series(session, service, metric, self.capacity + 1)
+                for row in rows[-self.capacity :]:
+                    ring.append(to_micros(row.timestamp), row.value)
+                ring.evicted = len(rows) > self.capacity
+                loaded += min(len(rows), self.capacity)
+            self.ready = True
+        return loaded
+
+    def _ring(self, key: SeriesKey) -> Optional[SeriesRing]:
+        ring = self._series.get(key)
+        if ring is None and key not in self._untracked:
+            if len(self._series) >= self.max_series:
+                self._untracked.add(key)
+                return None
+            ring = self._series[key] = SeriesRing(self.capacity)
+        return ring
+
+    def extend(self, rows: Iterable[Any]) -> None:
+        """Append committed rows (anything with service/metric/timestamp/value attributes)."""
+        if not self.ready:
+            return
+        with self._lock:
+            for row in rows:
+                ring = self._ring((row.service, row.metric))
+                if ring is not None:
+                    ring.append(to_micros(row.timestamp), row.value)
+
+    def _lookup(
+        self, service: str, metric: str, reach: Optional[int], limit: int
+    ) -> Optional[SeriesRing]:
+        """Ring to serve the read from, or ``None`` when the caller must fall back to SQL.
+
+        ``reach`` is the oldest timestamp the read needs; ``limit`` how many points it wants.
+        """
+        key = (service, metric)
+        if not self.ready or key in self._untracked:
+            self._misses += 1
+            return None
+        ring = self._series.get(key)
+        if ring is None:
+            self._hits += 1
+            return _EMPTY_RING
+        # a ring that has dropped points can only answer reads it still fully covers
+        if ring.evicted and (
+            (reach is None and limit > ring.size) or (reach is not None and ring.oldest() > reach)
+        ):
+            self._misses += 1
+            return None
+        self._hits += 1
+        return ring
+
+    def series(self, service: str, metric: str, limit: int) -> Optional[List[HotPoint]]:
+        """Newest ``limit`` points in time order, or ``None`` when the caller must use SQL."""
+        with self._lock:
+            ring = self._lookup(service, metric, None, limit)
+            if ring is None:
+                return None
+            points = ring.tail(limit)
+        return [HotPoint(from_micros(ts), value) for ts, value in points]
+
+    def window(
+        self, service: str, metric: str, lower: datetime, upper: datetime, limit: int
+    ) -> Optional[List[HotPoint]]:
+        """Points in ``[lower, upper]`` if the ring reaches back to ``lower``, else ``None``."""
+        low, high = to_micros(lower), to_micros(upper)
+        with self._lock:
+            ring = self._lookup(service, metric, low, limit)
+            if ring is None:
+                return None
+            points = [(ts, value) for ts, value in ring.tail(ring.size) if low <= ts <= high]
+        return [HotPoint(from_micros(ts), value) for ts, value in points[:limit]]
+
+    def services(self) -> Optional[List[str]]:
+        with self._lock:
+            if not self.ready or self._untracked:
+                return None
+            return sorted({service for (service, _), ring in self._series.items() if ring.size})
+
+    def trim_before(self, timestamp: datetime) -> None:
+        """Drop points the retention engine has deleted from the database."""
+        micros = to_micros(timestamp)
+        with self._lock:
+            for key, ring in list(self._series.items()):
+                ring.trim_before(micros)
+                if not ring.size:
+                    del self._series[key]
+
+    def clear(self) -> None:
+        """Forget every point but keep serving reads (the database was just emptied)."""
+        with self._lock:
+            self._series.clear()
+            self._untracked.clear()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+            self._untracked.clear()
+            self.ready = False
+            self._hits = self._misses = 0
+
+    def verify(self, session: Session) -> Dict[str, Any]:
+        """Compare every ring with the newest points of its series in the database."""
+        from app.crud import metrics as metric_crud
+
+        with self._lock:
+            snapshot = {key: ring.tail(ring.size) for key, ring in self._series.items()}
+        mismatched: List[str] = []
+        for (service, metric), points in snapshot.items():
+            rows = metric_crud.get_metric_series(session, service, metric, len(points))
+            expected = sorted((to_micros(row.timestamp), row.value) for row in rows)
+            if expected != sorted(points):
+                mismatched.append(f"{service}:{metric}")
+        return {
+            "ready": self.ready,
+            "checked": len(snapshot),
+            "consistent": not mismatched,
+            "mismatched": mismatched[:50],
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            series = len(self._series)
+            points = sum(ring.size for ring in self._series.values())
+            nbytes = sum(ring.nbytes for ring in self._series.values())
+        return {
+            "ready": self.ready,
+            "series": series,
+            "untracked_series": len(self._untracked),
+            "points": points,
+            "capacity_per_series": self.capacity,
+            "bytes_per_series": self.capacity * 16,
+            "bytes_total": nbytes,
+            "max_bytes": self.capacity * 16 * self.max_series,
+            "hits": self._hits,
+            "misses": self._misses,
+        }
+
+
+hot_store = HotStore(capacity=settings.hot_store_capacity, max_series=settings.hot_store_max_series)
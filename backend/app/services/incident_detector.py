@@ -1,13 +1,17 @@
 from __future__ import annotations
 
-from typing import Iterable, List, Sequence, Tuple
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
 from sqlmodel import Session
 
 from app.crud import incidents as incident_crud
 from app.crud import metrics as metric_crud
 from app.models import Incident
-from app.services.anomaly import detect_for_series
+from app.services.anomaly import DETECTION_POINTS, AnomalyAssessment, detect_for_series
+from app.services.detection_pool import DetectionPool, detection_pool
+from app.services.hot_store import HotStore, hot_store
+from app.services.online_detector import OnlineDetector, online_detector
 
 TrackedMetric = Tuple[str, str]
 DEFAULT_METRICS: Sequence[str] = (
@@ -19,37 +23,85 @@ DEFAULT_METRICS: Sequence[str] = (
 
 
 class IncidentDetector:
-    def __init__(self, session: Session) -> None:
+    def __init__(
+        self,
+        session: Session,
+        store: Optional[HotStore] = None,
+        online: Optional[OnlineDetector] = None,
+        pool: Optional[DetectionPool] = None,
+    ) -> None:
         self.session = session
+        self.store = store or hot_store
+        self.online = online or online_detector
+        self.pool = pool or detection_pool
 
-    def evaluate_metric(self, service: str, metric: str) -> Incident | None:
-        series = metric_crud.get_metric_series(
-            self.session, service=service, metric=metric, limit=240
-        )
-        if not series:
-            return None
+    def _series(self, service: str, metric: str) -> List[Tuple[datetime, float]]:
+        series = self.store.series(service, metric, limit=DETECTION_POINTS)
+        if series is None:
+            series = metric_crud.get_metric_series(
+                self.session, service=service, metric=metric, limit=DETECTION_POINTS
+            )
+        return [(point.timestamp, point.value) for point in series]
 
-        payload = [(point.timestamp, point.value) for point in series]
-        assessment = detect_for_series(payload, metric=metric)
-        if not assessment:
-            return None
+    def _series_many(self, pairs: Sequence[TrackedMetric]) -> List[metric_crud.SeriesColumns]:
+        """Hot-store series where it has them, the rest in one batched database read."""
+        found: Dict[TrackedMetric, metric_crud.SeriesColumns] = {}
+        missing: List[TrackedMetric] = []
+        for service, metric in pairs:
+            points = self.store.series(service, metric, limit=DETECTION_POINTS)
+            if points is None:
+                missing.append((service, metric))
+            else:
+                found[(service, metric)] = metric_crud.SeriesColumns(
+                    [point.timestamp for point in points], [point.value for point in points]
+                )
+        found.update(metric_crud.get_metric_series_many(self.session, missing, DETECTION_POINTS))
+        return [found.get(pair, metric_crud.SeriesColumns([], [])) for pair in pairs]
 
-        incident = incident_crud.upsert_incident(
+    def _record(self, service: str, metric: str, assessment: AnomalyAssessment) -> Incident:
+        return incident_crud.upsert_incident(
             session=self.session,
             incident_key=f"{service}:{metric}",
             service=service,
             metric=metric,
             assessment=assessment,
         )
-        return incident
+
+    def evaluate_metric(self, service: str, metric: str) -> Incident | None:
+        if self.online.covers(service, metric):
+            assessment = self.online.assess(service, metric)
+        else:
+            payload = self._series(service, metric)
+            if not payload:
+                return None
+            assessment = detect_for_series(payload, metric=metric)
+        if not assessment:
+            return None
+
+        return self._record(service, metric, assessment)
 
     def evaluate_metrics(self, metrics: Iterable[TrackedMetric]) -> List[Incident]:
-        incidents: List[Incident] = []
+        """Read streaming assessments where the online detector has them, score the other pairs
+        in one batch (across the detection pool when it is enabled) and record every incident in
+        one transaction."""
+        assessed: List[Tuple[TrackedMetric, Optional[AnomalyAssessment]]] = []
+        pairs: List[TrackedMetric] = []
         for service, metric in metrics:
-            incident = self.evaluate_metric(service, metric)
-            if incident:
-                incidents.append(incident)
-        return incidents
+            if self.online.covers(service, metric):
+                assessed.append(((service, metric), self.online.assess(service, metric)))
+            else:
+                pairs.append((service, metric))
+        payloads = self._series_many(pairs)
+        scores = self.pool.detect(payloads, [metric for _, metric in pairs])
+        assessed.extend(zip(pairs, scores, strict=True))
+        return incident_crud.upsert_incidents(
+            self.session,
+            [
+                (service, metric, assessment)
+                for (service, metric), assessment in assessed
+                if assessment
+            ],
+        )
 
     def evaluate_all_services(self) -> List[Incident]:
         return self.evaluate_metrics(self.candidate_pairs())
@@ -59,12 +111,4 @@ class IncidentDetector:
         if tracked:
             return tracked
 
-        pairs: List[TrackedMetric] = []
-
-        services = metric_crud.list_services(self.session)
-        for service in services:
-            for metric in metric_crud.list_service_metrics(self.session, service):
-                if metric in DEFAULT_METRICS:
-                    pairs.append((service, metric))
-
-        return pairs
+        return incident_crud.list_service_metrics(self.session, DEFAULT_METRICS)
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from contextlib import AbstractContextManager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlmodel import Session
+
+from app.core.concurrency import run_blocking
+from app.core.config import settings
+from app.crud import metrics as metric_crud
+from app.crud.metrics import MetricRow
+from app.db.session import session_scope
+from app.services.detection_scheduler import detection_scheduler, incident_alert
+from app.services.event_bus import event_bus
+
+logger = logging.getLogger(__name__)
+
+SessionFactory = Callable[[], AbstractContextManager[Session]]
+
+
+class IngestBufferFull(Exception):
+    """Raised when accepting a batch would exceed the buffer capacity."""
+
+
+@dataclass
+class FlushResult:
+    rows: List[MetricRow]
+    alerts: List[Dict[str, Any]]
+
+
+class IngestBuffer:
+    """In-process group-commit buffer for metric points.
+
+    Requests hand rows to :meth:`offer` and return immediately. A background task writes the
+    buffered rows in one transaction whenever ``flush_rows`` points are waiting or
+    ``flush_interval`` seconds have passed, then hands the pairs it wrote to the detection
+    scheduler.
+
+    A batch whose write fails goes back to the head of the queue and is retried on the next
+    tick, up to ``max_retries`` times; only then is it dropped (and counted in
+    ``dropped_total``). Once the write commits, a failing detection pass only puts the series
+    back on the scheduler's queue.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        flush_rows: int,
+        flush_interval: float,
+        max_retries: int = 3,
+        session_factory: Optional[SessionFactory] = None,
+    ) -> None:
+        self.capacity = capacity
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self._session_factory = session_factory
+        self._pending: List[Dict[str, Any]] = []
+        self._in_flight = 0
+        self._failures = 0
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self._stats: Dict[str, Any] = {
+            "accepted_total": 0,
+            "rejected_total": 0,
+            "flushed_total": 0,
+            "retried_total": 0,
+            "dropped_total": 0,
+            "flushes": 0,
+            "incidents_triggered": 0,
+            "last_flush_rows": 0,
+            "last_flush_ms": None,
+            "last_error": None,
+        }
+
+    @property
+    def depth(self) -> int:
+        return len(self._pending) + self._in_flight
+
+    def offer(self, rows: List[Dict[str, Any]]) -> int:
+        """Queue ``rows`` for the next flush and return the resulting depth."""
+        if self._closing:
+            raise IngestBufferFull("ingest buffer is shutting down")
+        if self.depth + len(rows) > self.capacity:
+            self._stats["rejected_total"] += len(rows)
+            raise IngestBufferFull(f"ingest buffer at capacity ({self.capacity} points)")
+
+        self._ensure_started()
+        self._pending.extend(rows)
+        self._stats["accepted_total"] += len(rows)
+        if len(self._pending) >= self.flush_rows:
+            self._wake.set()
+        return self.depth
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "pending": len(self._pending),
+            "in_flight": self._in_flight,
+            "capacity": self.capacity,
+            "flush_rows": self.flush_rows,
+            "flush_interval_ms": int(self.flush_interval * 1000),
+            "max_retries": self.max_retries,
+            "running": self._task is not None and not self._task.done(),
+        }
+
+    def _ensure_started(self) -> None:
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def start(self) -> None:
+        self._closing = False
+        self._ensure_started()
+
+    async def stop(self) -> None:
+        """Stop accepting rows and drain everything still buffered."""
+        self._closing = True
+        if self._task is None:
+            return
+        self._wake.set()
+        await self._task
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            timed_out = False
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                timed_out = True
+            self._wake.clear()
+            # full batches go out immediately; a partial tail waits for the timer or shutdown
+            while len(self._pending) >= self.flush_rows or (
+                self._pending and (timed_out or self._closing)
+            ):
+                # a failed batch is retried on the next tick; a draining buffer retries right away
+                if await self.flush() is None and not self._closing:
+                    break
+            if self._closing:
+                return
+
+    async def flush(self) -> Optional[FlushResult]:
+        if not self._pending:
+            return None
+        batch = self._pending[: self.flush_rows]
+        del self._pending[: self.flush_rows]
+        self._in_flight = len(batch)
+        started = time.perf_counter()
+        try:
+            result = await run_blocking(self._write, batch)
+        except Exception as exc:
+            self._stats["last_error"] = str(exc)
+            self._failures += 1
+            if self._failures > self.max_retries:
+                logger.exception(
+                    "ingest buffer flush failed %d times; dropping %d points",
+                    self._failures,
+                    len(batch),
+                )
+                self._stats["dropped_total"] += len(batch)
+                self._failures = 0
+            else:
+                logger.warning(
+                    "ingest buffer flush failed; requeueing %d points (attempt %d of %d)",
+                    len(batch),
+                    self._failures,
+                    self.max_retries + 1,
+                    exc_info=True,
+                )
+                self._stats["retried_total"] += len(batch)
+                self._pending[:0] = batch
+            return None
+        finally:
+            self._in_flight = 0
+
+        self._failures = 0
+        self._stats["flushes"] += 1
+        self._stats["flushed_total"] += len(result.rows)
+        self._stats["incidents_triggered"] += len(result.alerts)
+        self._stats["last_flush_rows"] = len(result.rows)
+        self._stats["last_flush_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        await _publish(result)
+        return result
+
+    def _write(self, batch: List[Dict[str, Any]]) -> FlushResult:
+        factory = self._session_factory or session_scope
+        with factory() as session:
+            rows = metric_crud.insert_metric_rows(session, batch)
+            # the points are committed from here on: a detection failure must not requeue them
+            pairs = sorted({(row.service, row.metric) for row in rows})
+            try:
+                incidents = detection_scheduler.detect(session, pairs)
+            except Exception:
+                logger.exception(
+                    "detection after ingest flush failed; requeueing %d series", len(pairs)
+                )
+                session.rollback()
+                detection_scheduler.mark(pairs)
+                incidents = []
+            alerts = [incident_alert(incident) for incident in incidents]
+            return FlushResult(rows=rows, alerts=alerts)
+
+
+async def _publish(result: FlushResult) -> None:
+    for entry in result.rows[-10:]:
+        await event_bus.publish(
+            {
+                "type": "metric_update",
+                "service": entry.service,
+                "metric": entry.metric,
+                "timestamp": entry.timestamp.isoformat(),
+                "value": entry.value,
+            }
+        )
+    for alert in result.alerts:
+        await event_bus.publish(alert)
+
+
+ingest_buffer = IngestBuffer(
+    capacity=settings.ingest_buffer_capacity,
+    flush_rows=settings.ingest_buffer_flush_rows,
+    flush_interval=settings.ingest_buffer_flush_interval_ms / 1000,
+    max_retries=settings.ingest_buffer_max_retries,
+)
+
+
+def get_ingest_buffer() -> IngestBuffer:
+    return ingest_buffer
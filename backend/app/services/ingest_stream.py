@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import json
+import math
+from datetime import datetime
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Optional
+
+from app.crud.rollups import naive_utc
+
+MAX_LINE_BYTES = 64 * 1024
+
+
+async def iter_lines(
+    chunks: AsyncIterable[bytes], max_line_bytes: int = MAX_LINE_BYTES
+) -> AsyncIterator[bytes]:
+    """Split an async byte stream into lines without buffering the whole body.
+
+    Partial lines at chunk edges are carried over to the next chunk. A line longer than
+    ``max_line_bytes`` is truncated to that length and the rest of it is discarded, so a
+    malformed upload cannot grow the carry-over buffer without bound.
+    """
+    pending = b""
+    overflow = False
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            if overflow:
+                overflow = False
+                continue
+            yield line.rstrip(b"\r")
+        if len(pending) > max_line_bytes:
+            if not overflow:
+                yield pending[:max_line_bytes]
+            overflow = True
+            pending = b""
+    if pending and not overflow:
+        yield pending.rstrip(b"\r")
+
+
+def _parse_timestamp(value: Any) -> Optional[datetime]:
+    if not isinstance(value, str):
+        return None
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    try:
+        return naive_utc(datetime.fromisoformat(value))
+    except ValueError:
+        return None
+
+
+def parse_metric_line(line: bytes) -> Optional[Dict[str, Any]]:
+    """Validate one NDJSON metric record and return insert parameters, or ``None``.
+
+    This mirrors ``MetricPointCreate`` but skips pydantic model construction, which dominates
+    the cost of large uploads.
+    """
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(record, dict):
+        return None
+
+    service = record.get("service")
+    metric = record.get("metric")
+    value = record.get("value")
+    if not isinstance(service, str) or not service:
+        return None
+    if not isinstance(metric, str) or not metric:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    if not math.isfinite(value):
+        return None
+
+    raw_timestamp = record.get("timestamp")
+    if raw_timestamp is None:
+        timestamp = datetime.utcnow()
+    else:
+        timestamp = _parse_timestamp(raw_timestamp)
+        if timestamp is None:
+            return None
+
+    return {"service": service, "metric": metric, "timestamp": timestamp, "value": float(value)}
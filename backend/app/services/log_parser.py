@@ -3,7 +3,7 @@ from __future__ import annotations
 import re
 import shlex
 from datetime import datetime
-from typing import List, Optional
+from typing import Iterable, Iterator, List, Optional
 
 from app.schemas import LogCreate
 
@@ -124,10 +124,16 @@ def _parse_latency(value: str) -> Optional[float]:
         return None
 
 
-def parse_log_blob(blob: str) -> List[LogCreate]:
-    entries: List[LogCreate] = []
-    for line in blob.splitlines():
-        parsed = parse_log_line(line)
+def parse_log_lines(lines: Iterable[str]) -> Iterator[LogCreate]:
+    for line in lines:
+        try:
+            parsed = parse_log_line(line)
+        except ValueError:
+            # unbalanced quotes make shlex give up; treat the line as unparseable
+            continue
         if parsed:
-            entries.append(parsed)
-    return entries
+            yield parsed
+
+
+def parse_log_blob(blob: str) -> Iterator[LogCreate]:
+    return parse_log_lines(blob.splitlines())
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+LAG_BUCKETS_MS = (10, 50, 100, 250, 500, 1000, 5000, float("inf"))
+
+
+class LoopLagMonitor:
+    """Measure how long the event loop is blocked.
+
+    A task sleeps for ``interval`` seconds and records how much later than scheduled it woke
+    up. Any wake-up later than ``warn_threshold`` is logged with its delay.
+    """
+
+    def __init__(self, interval: float, warn_threshold: float) -> None:
+        self.interval = interval
+        self.warn_threshold = warn_threshold
+        self._task: Optional[asyncio.Task] = None
+        self._samples = 0
+        self._stalls = 0
+        self._last_ms = 0.0
+        self._max_ms = 0.0
+        self._total_ms = 0.0
+        self._buckets = {bound: 0 for bound in LAG_BUCKETS_MS}
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def record(self, lag: float) -> None:
+        lag_ms = max(lag, 0.0) * 1000
+        self._samples += 1
+        self._last_ms = lag_ms
+        self._total_ms += lag_ms
+        self._max_ms = max(self._max_ms, lag_ms)
+        for bound in LAG_BUCKETS_MS:
+            if lag_ms <= bound:
+                self._buckets[bound] += 1
+                break
+        if lag >= self.warn_threshold:
+            self._stalls += 1
+            logger.warning("event loop blocked for %.1f ms", lag_ms)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "samples": self._samples,
+            "stalls": self._stalls,
+            "last_lag_ms": round(self._last_ms, 2),
+            "max_lag_ms": round(self._max_ms, 2),
+            "mean_lag_ms": round(self._total_ms / self._samples, 2) if self._samples else 0.0,
+            "warn_threshold_ms": round(self.warn_threshold * 1000, 2),
+            "buckets_ms": {f"le_{bound:g}": count for bound, count in self._buckets.items()},
+            "running": self._task is not None and not self._task.done(),
+        }
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            scheduled = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.record(loop.time() - scheduled)
+
+
+loop_monitor = LoopLagMonitor(
+    interval=settings.loop_lag_interval_ms / 1000,
+    warn_threshold=settings.loop_lag_warn_ms / 1000,
+)
@@ -0,0 +1,414 @@
+"""Streaming anomaly detection state kept up to date on the ingest path.
+
+:func:`app.services.anomaly.detect_anomaly` rescans the newest ``DETECTION_POINTS`` points of a
+series on every evaluation. :class:`OnlineDetector` instead keeps, per series, that window in a
+:class:`~app.services.hot_store.SeriesRing` plus running statistics of its history (everything
+before the newest ``window_size`` points): a Welford mean and variance, an EWMA and the sum of
+the recent window. Each committed point updates them in O(1), and an assessment scores them with
+the same :func:`~app.services.anomaly.assess_window` as the batch detector.
+
+Running sums drift, so a series recomputes its statistics from the window every ``capacity``
+updates and after a late point reorders it. In between the EWMA carries on past the window
+instead of restarting at its first point; the difference is weighted by
+``(1 - alpha) ** (capacity - window_size)``, far below float precision at the default size.
+
+State is checkpointed to ``detector_state`` every ``persist_interval`` seconds and on shutdown.
+:meth:`OnlineDetector.load` restores the checkpoints, replays points written after them and
+rebuilds series without a usable one from the database. Like the hot store, the detector only
+sees writes made by this process.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import threading
+import time
+from datetime import datetime
+from statistics import fmean
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Dialect
+from sqlalchemy.sql.dml import Insert
+from sqlmodel import Session, select
+
+from app.core.concurrency import run_blocking
+from app.core.config import settings
+from app.db.chunk_codec import decode_chunk, encode_chunk, from_micros, to_micros
+from app.db.session import session_scope
+from app.models import DetectorState
+from app.services.anomaly import DETECTION_POINTS, AnomalyAssessment, assess_window
+from app.services.hot_store import SeriesKey, SeriesRing
+
+logger = logging.getLogger(__name__)
+
+
+class SeriesState:
+    """Detection window of one series and running statistics of its history."""
+
+    __slots__ = (
+        "ring",
+        "window_size",
+        "alpha",
+        "count",
+        "mean",
+        "m2",
+        "ewma",
+        "recent_sum",
+        "run",
+        "updates",
+        "dirty",
+    )
+
+    def __init__(self, capacity: int, window_size: int, alpha: float) -> None:
+        self.ring = SeriesRing(capacity)
+        self.window_size = window_size
+        self.alpha = alpha
+        self.count = 0
+        self.mean = self.m2 = self.ewma = self.recent_sum = 0.0
+        # trailing history points equal to the newest one; a flat history has no spread at all
+        self.run = 0
+        self.updates = 0
+        self.dirty = False
+
+    def push(self, micros: int, value: float) -> None:
+        ring = self.ring
+        self.dirty = True
+        if ring.size and micros < ring.point(-1)[0]:
+            ring.append(micros, value)
+            self.rebase()
+            return
+
+        leaving = ring.point(0)[1] if ring.size == ring.capacity else None
+        ring.append(micros, value)
+        self.recent_sum += value
+        if ring.size > self.window_size:
+            entering = ring.point(-self.window_size - 1)[1]
+            self.recent_sum -= entering
+            previous = ring.point(-self.window_size - 2)[1] if self.count else None
+            self._enter(entering, previous)
+        if leaving is not None:
+            self._leave(leaving)
+        self.updates += 1
+        if self.updates >= ring.capacity:
+            self.rebase()
+
+    def _enter(self, value: float, previous: Optional[float]) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if self.count == 1:
+            self.ewma = value
+        else:
+            self.ewma = self.alpha * value + (1 - self.alpha) * self.ewma
+        self.run = self.run + 1 if value == previous else 1
+
+    def _leave(self, value: float) -> None:
+        self.count -= 1
+        if not self.count:
+            self.mean = self.m2 = 0.0
+        else:
+            delta = value - self.mean
+            self.mean -= delta / self.count
+            self.m2 = max(self.m2 - delta * (value - self.mean), 0.0)
+        self.run = min(self.run, self.count)
+
+    def rebase(self) -> None:
+        """Recompute every statistic from the window."""
+        values = [value for _, value in self.ring.tail(self.ring.size)]
+        history = values[: -self.window_size] if len(values) > self.window_size else []
+        self.count = len(history)
+        self.mean = fmean(history) if history else 0.0
+        self.m2 = math.fsum((value - self.mean) ** 2 for value in history)
+        self.ewma = history[0] if history else 0.0
+        for value in history[1:]:
+            self.ewma = self.alpha * value + (1 - self.alpha) * self.ewma
+        self.recent_sum = math.fsum(values[-self.window_size :])
+        self.run = 0
+        for value in reversed(history):
+            if value != history[-1]:
+                break
+            self.run += 1
+        self.updates = 0
+
+    def trim_before(self, micros: int) -> None:
+        oldest = self.ring.oldest()
+        if oldest is not None and oldest < micros:
+            self.ring.trim_before(micros)
+            self.rebase()
+            self.dirty = True
+
+    def assess(self, metric: str, min_points: int = 20) -> Optional[AnomalyAssessment]:
+        ring, window = self.ring, self.window_size
+        if ring.size < max(window * 2, min_points):
+            return None
+        tail = min(window * 3, self.count)
+        baseline = fmean(ring.point(-window - offset)[1] for offset in range(tail, 0, -1))
+        observed = self.recent_sum / window
+        z_score = 0.0
+        if self.count >= 2 and self.run < self.count and self.m2 > 0:
+            z_score = abs(observed - self.mean) / math.sqrt(self.m2 / self.count)
+        return assess_window(
+            metric,
+            baseline=baseline,
+            observed=observed,
+            z_score=z_score,
+            ewma_baseline=self.ewma,
+            window_start=from_micros(ring.point(-window)[0]),
+            window_end=from_micros(ring.point(-1)[0]),
+        )
+
+    def checkpoint(self) -> Dict[str, Any]:
+        points = self.ring.tail(self.ring.size)
+        timestamps = [ts for ts, _ in points]
+        return {
+            "last_timestamp": from_micros(timestamps[-1]),
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self.m2,
+            "ewma": self.ewma,
+            "payload": encode_chunk(timestamps, [value for _, value in points]),
+        }
+
+    def restore(self, row: DetectorState) -> None:
+        self.ring = SeriesRing(self.ring.capacity)
+        for micros, value in zip(*decode_chunk(row.payload), strict=True):
+            self.ring.append(micros, value)
+        self.rebase()
+        # carry on from the saved accumulators rather than the recomputed ones
+        self.count, self.mean, self.m2, self.ewma = row.count, row.mean, row.m2, row.ewma
+
+
+def _upsert_statement(dialect: Dialect) -> Insert:
+    table = DetectorState.__table__
+    if dialect.name == "postgresql":
+        statement = postgresql.insert(table)
+    elif dialect.name == "sqlite":
+        statement = sqlite.insert(table)
+    else:
+        raise NotImplementedError(f"detector checkpoints are not supported on {dialect.name!r}")
+    return statement.on_conflict_do_update(
+        index_elements=[table.c.series_id],
+        set_={
+            column.name: statement.excluded[column.name]
+            for column in table.columns
+            if column.name != "series_id"
+        },
+    )
+
+
+class OnlineDetector:
+    def __init__(
+        self,
+        capacity: int,
+        max_series: int,
+        persist_interval: float,
+        window_size: int = 5,
+        alpha: float = 0.3,
+    ) -> None:
+        if capacity <= window_size * 2:
+            raise ValueError("capacity must hold a history of more than two windows")
+        self.capacity = capacity
+        self.max_series = max_series
+        self.persist_interval = persist_interval
+        self.window_size = window_size
+        self.alpha = alpha
+        self.ready = False
+        self.last_report: Optional[Dict[str, Any]] = None
+        self._states: Dict[SeriesKey, SeriesState] = {}
+        self._untracked: set[SeriesKey] = set()
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def _state(self, key: SeriesKey) -> Optional[SeriesState]:
+        state = self._states.get(key)
+        if state is None and key not in self._untracked:
+            if len(self._states) >= self.max_series:
+                self._untracked.add(key)
+                return None
+            state = self._states[key] = SeriesState(self.capacity, self.window_size, self.alpha)
+        return state
+
+    def load(self, session: Session, restore: bool = True) -> Dict[str, Any]:
+        """Rebuild every series' state, from its checkpoint when ``restore`` and one is usable.
+
+        A checkpoint is usable while the newest ``capacity`` points still reach back to it; the
+        points after it are replayed.
+        """
+        from app.crud import metrics as metric_crud  # the crud layer feeds this detector
+        from app.crud.dimensions import named_series
+
+        started = time.perf_counter()
+        checkpoints = (
+            {row.series_id: row for row in session.exec(select(DetectorState)).all()}
+            if restore
+            else {}
+        )
+        restored = rebuilt = replayed = 0
+        with self._lock:
+            self._states.clear()
+            self._untracked.clear()
+            for series_id, service, metric in session.exec(named_series()).all():
+                rows = metric_crud.get_metric_series(session, service, metric, self.capacity)
+                state = self._state((service, metric)) if rows else None
+                if state is None:
+                    continue
+                points = [(to_micros(row.timestamp), row.value) for row in rows]
+                checkpoint = checkpoints.get(series_id)
+                if checkpoint is not None and points[0][0] <= to_micros(checkpoint.last_timestamp):
+                    state.restore(checkpoint)
+                    last = to_micros(checkpoint.last_timestamp)
+                    points = [point for point in points if point[0] > last]
+                    restored += 1
+                else:
+                    rebuilt += 1
+                for micros, value in points:
+                    state.push(micros, value)
+                state.dirty = bool(points) or checkpoint is None
+                replayed += len(points)
+            self.ready = True
+        return {
+            "restored": restored,
+            "rebuilt": rebuilt,
+            "replayed_points": replayed,
+            "untracked_series": len(self._untracked),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+
+    def rebuild(self, session: Session) -> Dict[str, Any]:
+        """Discard the checkpoints, rebuild every series from the database and save the result."""
+        report = self.load(session, restore=False)
+        return {**report, **self.persist(session)}
+
+    def extend(self, rows: Iterable[Any]) -> None:
+        """Fold committed rows (anything with service/metric/timestamp/value attributes) in."""
+        if not self.ready:
+            return
+        with self._lock:
+            for row in rows:
+                state = self._state((row.service, row.metric))
+                if state is not None:
+                    state.push(to_micros(row.timestamp), row.value)
+
+    def covers(self, service: str, metric: str) -> bool:
+        """Whether :meth:`assess` answers for this series; otherwise use the batch detector."""
+        return self.ready and (service, metric) not in self._untracked
+
+    def assess(self, service: str, metric: str) -> Optional[AnomalyAssessment]:
+        with self._lock:
+            state = self._states.get((service, metric))
+            return state.assess(metric) if state is not None else None
+
+    def trim_before(self, timestamp: datetime) -> None:
+        """Drop points the retention engine has deleted from the database."""
+        micros = to_micros(timestamp)
+        with self._lock:
+            for key, state in list(self._states.items()):
+                state.trim_before(micros)
+                if not state.ring.size:
+                    del self._states[key]
+
+    def persist(self, session: Session) -> Dict[str, Any]:
+        """Checkpoint every series that changed since the last call."""
+        from app.crud.dimensions import series_ids
+
+        started = time.perf_counter()
+        with self._lock:
+            dirty = [
+                (key, state, state.checkpoint())
+                for key, state in self._states.items()
+                if state.dirty and state.ring.size
+            ]
+            for _, state, _ in dirty:
+                state.dirty = False
+        if dirty:
+            try:
+                keys = series_ids(session, [key for key, _, _ in dirty])
+                now = datetime.utcnow()
+                session.execute(
+                    _upsert_statement(session.get_bind().dialect),
+                    [
+                        {"series_id": keys[key], **checkpoint, "updated_at": now}
+                        for key, _, checkpoint in dirty
+                    ],
+                )
+                session.commit()
+            except Exception:
+                session.rollback()
+                for _, state, _ in dirty:
+                    state.dirty = True
+                raise
+        report = {
+            "persisted_at": datetime.utcnow().isoformat(),
+            "series": len(dirty),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+        self.last_report = report
+        return report
+
+    def clear(self) -> None:
+        """Forget every series but keep serving (the database was just emptied)."""
+        with self._lock:
+            self._states.clear()
+            self._untracked.clear()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._states.clear()
+            self._untracked.clear()
+            self.ready = False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            series = len(self._states)
+            dirty = sum(state.dirty for state in self._states.values())
+        return {
+            "ready": self.ready,
+            "series": series,
+            "untracked_series": len(self._untracked),
+            "dirty_series": dirty,
+            "capacity_per_series": self.capacity,
+            "persist_interval_seconds": self.persist_interval,
+            "running": self._task is not None and not self._task.done(),
+            "last_report": self.last_report,
+        }
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        try:
+            await run_blocking(self._run_scheduled)
+        except Exception:
+            logger.exception("final detector checkpoint failed")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.persist_interval)
+            try:
+                await run_blocking(self._run_scheduled)
+            except Exception:
+                logger.exception("scheduled detector checkpoint failed")
+
+    def _run_scheduled(self) -> Dict[str, Any]:
+        with session_scope() as session:
+            return self.persist(session)
+
+
+online_detector = OnlineDetector(
+    capacity=DETECTION_POINTS,
+    max_series=settings.online_detector_max_series,
+    persist_interval=settings.online_detector_persist_seconds,
+)
@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import Column, Table, delete, select
+from sqlalchemy.sql.elements import ColumnElement
+from sqlmodel import Session
+
+from app.core.concurrency import run_blocking
+from app.core.config import settings
+from app.crud.series import expired_series, reconcile_series
+from app.db.session import session_scope
+from app.models import Incident, LogEntry, MetricChunk, MetricPoint, MetricRollup
+from app.services.hot_store import hot_store
+from app.services.online_detector import online_detector
+from app.services.segment_store import segment_store
+
+logger = logging.getLogger(__name__)
+
+ERROR_LOG_LEVELS = ("ERROR", "CRITICAL", "FATAL")
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """Delete rows of ``table`` whose ``column`` is older than ``ttl`` (and match ``condition``)."""
+
+    name: str
+    table: Table
+    column: Column
+    ttl: timedelta
+    condition: Optional[ColumnElement[bool]] = None
+
+
+def default_policies() -> List[RetentionPolicy]:
+    metrics = MetricPoint.__table__
+    chunks = MetricChunk.__table__
+    rollups = MetricRollup.__table__
+    logs = LogEntry.__table__
+    incidents = Incident.__table__
+    return [
+        RetentionPolicy(
+            "metrics", metrics, metrics.c.timestamp, timedelta(days=settings.retention_metrics_days)
+        ),
+        # a sealed chunk goes once its newest point is past the raw metrics TTL
+        RetentionPolicy(
+            "metric_chunks",
+            chunks,
+            chunks.c.end_time,
+            timedelta(days=settings.retention_metrics_days),
+        ),
+        RetentionPolicy(
+            "metric_rollups",
+            rollups,
+            rollups.c.bucket,
+            timedelta(days=settings.retention_rollups_days),
+        ),
+        RetentionPolicy(
+            "logs_info",
+            logs,
+            logs.c.timestamp,
+            timedelta(days=settings.retention_info_logs_days),
+            logs.c.level.not_in(ERROR_LOG_LEVELS),
+        ),
+        RetentionPolicy(
+            "logs_error",
+            logs,
+            logs.c.timestamp,
+            timedelta(days=settings.retention_error_logs_days),
+            logs.c.level.in_(ERROR_LOG_LEVELS),
+        ),
+        RetentionPolicy(
+            "incidents_resolved",
+            incidents,
+            incidents.c.updated_at,
+            timedelta(days=settings.retention_resolved_incidents_days),
+            incidents.c.status == "resolved",
+        ),
+    ]
+
+
+class RetentionEngine:
+    """Apply TTL policies in small delete chunks, then hand space back and refresh statistics.
+
+    Each chunk deletes at most ``chunk_rows`` rows and commits, so the SQLite write lock is held
+    for one short transaction at a time and ingest can interleave with a large cleanup.
+    """
+
+    def __init__(
+        self, policies: Sequence[RetentionPolicy], chunk_rows: int, interval: float
+    ) -> None:
+        self.policies = list(policies)
+        self.chunk_rows = chunk_rows
+        self.interval = interval
+        self.last_report: Optional[Dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def run(self, session: Session, now: Optional[datetime] = None) -> Dict[str, Any]:
+        now = now or datetime.utcnow()
+        started = time.perf_counter()
+        results = [self._apply(session, policy, now) for policy in self.policies]
+        touched = sorted({r["table"] for r in results if r["deleted"]})
+        recounted = self._recount_series(session, results, now)
+        maintenance = self._maintain(session, touched)
+        report = {
+            "started_at": now.isoformat(),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            "deleted_total": sum(r["deleted"] for r in results),
+            "series_recounted": recounted,
+            "policies": results,
+            **maintenance,
+        }
+        self.last_report = report
+        logger.info(
+            "retention removed %d rows in %.0f ms", report["deleted_total"], report["duration_ms"]
+        )
+        return report
+
+    def _apply(self, session: Session, policy: RetentionPolicy, now: datetime) -> Dict[str, Any]:
+        cutoff = now - policy.ttl
+        started = time.perf_counter()
+        key = policy.table.c.id
+        victims = select(key).where(policy.column < cutoff)
+        if policy.condition is not None:
+            victims = victims.where(policy.condition)
+        statement = delete(policy.table).where(
+            key.in_(victims.limit(self.chunk_rows).scalar_subquery())
+        )
+
+        deleted = chunks = 0
+        while True:
+            removed = session.execute(statement).rowcount
+            session.commit()
+            chunks += 1
+            deleted += removed
+            if removed < self.chunk_rows:
+                break
+        if policy.table is MetricPoint.__table__ and policy.condition is None:
+            hot_store.trim_before(cutoff)
+            online_detector.trim_before(cutoff)
+            segment_store.drop_before(cutoff)
+        return {
+            "policy": policy.name,
+            "table": policy.table.name,
+            "cutoff": cutoff.isoformat(),
+            "deleted": deleted,
+            "chunks": chunks,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+
+    def _recount_series(
+        self, session: Session, results: Sequence[Dict[str, Any]], now: datetime
+    ) -> int:
+        """Recount the registry rows of the series that lost points, so their counts drop and
+        series left empty fall out of the listings."""
+        metric_tables = (MetricPoint.__table__, MetricChunk.__table__)
+        cutoffs = [
+            now - policy.ttl
+            for policy, result in zip(self.policies, results, strict=True)
+            if policy.table in metric_tables and result["deleted"]
+        ]
+        if not cutoffs:
+            return 0
+        series = expired_series(session, max(cutoffs))
+        if series:
+            reconcile_series(session, series)
+        return len(series)
+
+    def _maintain(self, session: Session, tables: Sequence[str]) -> Dict[str, Any]:
+        connection = session.connection()
+        # Postgres leaves space reclamation to autovacuum; ANALYZE keeps plans honest on both
+        for table in tables:
+            connection.exec_driver_sql(f"ANALYZE {table}")
+        session.commit()
+
+        freed_pages: Optional[int] = None
+        connection = session.connection()
+        # incremental_vacuum only works when the file was created with auto_vacuum=INCREMENTAL
+        if (
+            connection.dialect.name == "sqlite"
+            and connection.exec_driver_sql("PRAGMA auto_vacuum").scalar() == 2
+        ):
+            before = connection.exec_driver_sql("PRAGMA freelist_count").scalar()
+            session.commit()
+            # the pragma frees one page per step; executescript steps it to completion where a
+            # plain execute would stop after the first page
+            session.connection().connection.driver_connection.executescript(
+                "PRAGMA incremental_vacuum;"
+            )
+            after = session.connection().exec_driver_sql("PRAGMA freelist_count").scalar()
+            freed_pages = before - after
+        session.commit()
+        return {"freed_pages": freed_pages, "analyzed": list(tables)}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "policies": [
+                {
+                    "policy": policy.name,
+                    "table": policy.table.name,
+                    "ttl_days": policy.ttl / timedelta(days=1),
+                }
+                for policy in self.policies
+            ],
+            "chunk_rows": self.chunk_rows,
+            "interval_minutes": self.interval / 60,
+            "running": self._task is not None and not self._task.done(),
+            "last_report": self.last_report,
+        }
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await run_blocking(self._run_scheduled)
+            except Exception:
+                logger.exception("scheduled retention run failed")
+
+    def _run_scheduled(self) -> Dict[str, Any]:
+        with session_scope() as session:
+            return self.run(session)
+
+
+retention_engine = RetentionEngine(
+    policies=default_policies(),
+    chunk_rows=settings.retention_chunk_rows,
+    interval=settings.retention_interval_minutes * 60,
+)
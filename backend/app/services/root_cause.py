@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import json
 from dataclasses import dataclass, field
 from statistics import StatisticsError, correlation
 from typing import Dict, Iterable, List, Sequence, Tuple
@@ -155,14 +154,11 @@ class RootCauseAnalyzer:
     def _keyword_hypotheses(self, incident: Incident, logs) -> List[HypothesisResult]:
         by_title: Dict[str, HypothesisResult] = {}
         for log in logs:
-            tokens = [log.message.lower()]
+            haystack = log.message.lower()
             if log.context:
-                try:
-                    payload = json.loads(log.context)
-                    tokens.append(json.dumps(payload).lower())
-                except json.JSONDecodeError:
-                    tokens.append(log.context.lower())
-            haystack = " ".join(tokens)
+                haystack += (
+                    " " + " ".join(f"{key} {value}" for key, value in log.context.items()).lower()
+                )
             for keyword, title in self.KEYWORD_RULES.items():
                 if keyword in haystack:
                     evidence = EvidenceItem(
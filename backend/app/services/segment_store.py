@@ -0,0 +1,342 @@
+"""Append-only, memory-mapped segment files for metric series.
+
+An optional storage engine for the busiest services: every committed point of a tracked series
+is also appended to ``<segment_store_dir>/<service>/<metric>/<seq>.seg`` as a fixed-width
+little-endian record (int64 epoch microseconds, float64 value). A segment rolls once it holds
+``segment_max_bytes``. Reads map the segments with :mod:`mmap` and slice them as zero-copy NumPy
+views; a sparse index of every ``segment_index_every``-th timestamp narrows each binary search
+to one block of records.
+
+The database stays the source of truth. :meth:`SegmentStore.sync` (run at startup) rebuilds any
+series whose newest segment point disagrees with the database, and a point that arrives older
+than its series' tail marks the series stale so reads fall back to SQL until the next sync. Like
+the hot store, the files only see writes made by this process. Needs the ``segments`` extra
+(NumPy).
+"""
+
+from __future__ import annotations
+
+import mmap
+import shutil
+import threading
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import quote, unquote
+
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.db.chunk_codec import to_micros
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+SeriesKey = Tuple[str, str]
+Arrays = Tuple[Any, Any]
+
+RECORD_SIZE = 16
+_SUFFIX = ".seg"
+_STALE_MARKER = "STALE"
+
+
+def _record_dtype() -> Any:
+    return np.dtype([("ts", "<i8"), ("value", "<f8")])
+
+
+class Segment:
+    """One segment file holding ``count`` whole records, remapped lazily as it grows."""
+
+    def __init__(self, path: Path, index_every: int) -> None:
+        self.path = path
+        self.index_every = index_every
+        # a torn tail record is not counted, and :meth:`recover` removes it
+        self.count = path.stat().st_size // RECORD_SIZE if path.exists() else 0
+        self._records: Any = None
+        self._sparse: Any = None
+
+    def recover(self) -> int:
+        """Drop a torn tail record left by a crash mid-append; returns the bytes removed."""
+        size = self.path.stat().st_size
+        torn = size % RECORD_SIZE
+        if torn:
+            with self.path.open("r+b") as handle:
+                handle.truncate(size - torn)
+        return torn
+
+    def records(self) -> Any:
+        if self._records is None or len(self._records) != self.count:
+            if not self.count:
+                return np.empty(0, dtype=_record_dtype())
+            with self.path.open("rb") as handle:
+                mapped = mmap.mmap(
+                    handle.fileno(), self.count * RECORD_SIZE, access=mmap.ACCESS_READ
+                )
+            # views keep the old mapping alive, so readers holding them are unaffected by a remap
+            self._records = np.frombuffer(mapped, dtype=_record_dtype())
+            self._sparse = self._records["ts"][:: self.index_every].copy()
+        return self._records
+
+    def first(self) -> int:
+        return int(self.records()["ts"][0])
+
+    def last(self) -> int:
+        return int(self.records()["ts"][-1])
+
+    def search(self, micros: int, side: str) -> int:
+        """``numpy.searchsorted`` over the timestamps, touching one block of the file."""
+        timestamps = self.records()["ts"]
+        block = int(np.searchsorted(self._sparse, micros, side=side))
+        low = max(block - 1, 0) * self.index_every
+        high = min(block * self.index_every, self.count)
+        return low + int(np.searchsorted(timestamps[low:high], micros, side=side))
+
+    def append(self, payload: bytes) -> None:
+        with self.path.open("ab") as handle:
+            handle.write(payload)
+        self.count += len(payload) // RECORD_SIZE
+
+
+class SeriesLog:
+    def __init__(self, directory: Path, segments: List[Segment]) -> None:
+        self.directory = directory
+        self.segments = segments
+        self.stale = (directory / _STALE_MARKER).exists()
+        self.last: Optional[int] = None
+        for segment in reversed(segments):
+            if segment.count:
+                self.last = segment.last()
+                break
+
+    def mark_stale(self) -> None:
+        self.stale = True
+        (self.directory / _STALE_MARKER).touch()
+
+
+class SegmentStore:
+    def __init__(
+        self,
+        root: Path,
+        max_segment_bytes: int,
+        index_every: int,
+        services: Sequence[str] = (),
+    ) -> None:
+        self.root = root
+        self.max_records = max(1, max_segment_bytes // RECORD_SIZE)
+        self.index_every = index_every
+        self.services = set(services)
+        self.ready = False
+        self._series: Dict[SeriesKey, SeriesLog] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def tracks(self, service: str) -> bool:
+        return not self.services or service in self.services
+
+    def _directory(self, key: SeriesKey) -> Path:
+        return self.root / quote(key[0], safe="") / quote(key[1], safe="")
+
+    def _load(self, directory: Path) -> Tuple[SeriesLog, int]:
+        segments = [
+            Segment(path, self.index_every) for path in sorted(directory.glob("*" + _SUFFIX))
+        ]
+        torn = sum(segment.recover() for segment in segments)
+        return SeriesLog(directory, segments), torn
+
+    def open(self) -> Dict[str, int]:
+        """Scan the data dir, truncating torn tail records; reads stay off until :meth:`sync`."""
+        if np is None:
+            raise RuntimeError("the segment store needs NumPy; install the 'segments' extra")
+        self.root.mkdir(parents=True, exist_ok=True)
+        torn_bytes = 0
+        with self._lock:
+            self._series.clear()
+            for directory in sorted(path for path in self.root.glob("*/*") if path.is_dir()):
+                key = (unquote(directory.parent.name), unquote(directory.name))
+                self._series[key], torn = self._load(directory)
+                torn_bytes += torn
+        return {"series": len(self._series), "torn_bytes": torn_bytes}
+
+    def sync(self, session: Session) -> Dict[str, int]:
+        """Rebuild every tracked series whose segments disagree with the database."""
+        from app.crud import metrics as metric_crud  # the crud layer feeds this store
+
+        rebuilt = points = 0
+        for key in metric_crud.list_series(session):
+            if not self.tracks(key[0]):
+                continue
+            latest = to_micros(metric_crud.database_series(session, *key, limit=1)[-1].timestamp)
+            with self._lock:
+                log = self._series.get(key)
+                if log is not None and not log.stale and log.last == latest:
+                    continue
+                points += self._rebuild(session, key)
+                rebuilt += 1
+        with self._lock:
+            self.ready = True
+        return {"series": len(self._series), "rebuilt": rebuilt, "points": points}
+
+    def _rebuild(self, session: Session, key: SeriesKey) -> int:
+        from app.crud import metrics as metric_crud
+
+        directory = self._directory(key)
+        shutil.rmtree(directory, ignore_errors=True)
+        directory.mkdir(parents=True)
+        log = self._series[key] = SeriesLog(directory, [])
+        written = 0
+        for rows in metric_crud.iter_series(session, *key):
+            self._write(
+                log, [to_micros(row.timestamp) for row in rows], [row.value for row in rows]
+            )
+            written += len(rows)
+        return written
+
+    def _write(self, log: SeriesLog, timestamps: List[int], values: List[float]) -> None:
+        records = np.empty(len(timestamps), dtype=_record_dtype())
+        records["ts"] = timestamps
+        records["value"] = values
+        offset = 0
+        while offset < len(records):
+            if not log.segments or log.segments[-1].count >= self.max_records:
+                path = log.directory / f"{len(log.segments):08d}{_SUFFIX}"
+                log.segments.append(Segment(path, self.index_every))
+            segment = log.segments[-1]
+            room = self.max_records - segment.count
+            segment.append(records[offset : offset + room].tobytes())
+            offset += room
+        log.last = timestamps[-1]
+
+    def append(self, rows: Iterable[Any]) -> None:
+        """Append committed rows (anything with service/metric/timestamp/value attributes)."""
+        if not self.ready:
+            return
+        batches: Dict[SeriesKey, List[Tuple[int, float]]] = defaultdict(list)
+        for row in rows:
+            if self.tracks(row.service):
+                batches[(row.service, row.metric)].append((to_micros(row.timestamp), row.value))
+        with self._lock:
+            for key, points in batches.items():
+                log = self._series.get(key)
+                if log is None:
+                    directory = self._directory(key)
+                    directory.mkdir(parents=True, exist_ok=True)
+                    log = self._series[key] = SeriesLog(directory, [])
+                if log.stale:
+                    continue
+                points.sort()
+                if log.last is not None and points[0][0] < log.last:
+                    # an append-only file cannot take a late point; SQL serves it until sync
+                    log.mark_stale()
+                    continue
+                self._write(log, [ts for ts, _ in points], [value for _, value in points])
+
+    def _readable(self, service: str, metric: str) -> Optional[SeriesLog]:
+        if not self.ready or not self.tracks(service):
+            return None
+        log = self._series.get((service, metric))
+        if log is not None and log.stale:
+            self._misses += 1
+            return None
+        self._hits += 1
+        return log or SeriesLog(self._directory((service, metric)), [])
+
+    def tail(self, service: str, metric: str, limit: int) -> Optional[Arrays]:
+        """Newest ``limit`` (timestamps, values) in time order, or ``None`` to fall back to SQL."""
+        with self._lock:
+            log = self._readable(service, metric)
+            if log is None:
+                return None
+            segments = list(log.segments)
+        pieces = []
+        remaining = limit
+        for segment in reversed(segments):
+            records = segment.records()
+            pieces.append(records[max(len(records) - remaining, 0) :])
+            remaining -= len(pieces[-1])
+            if remaining <= 0:
+                break
+        return _columns(pieces[::-1])
+
+    def window(
+        self, service: str, metric: str, lower: datetime, upper: datetime, limit: Optional[int]
+    ) -> Optional[Arrays]:
+        """Points in ``[lower, upper]`` as (timestamps, values), or ``None`` to fall back to SQL."""
+        low, high = to_micros(lower), to_micros(upper)
+        with self._lock:
+            log = self._readable(service, metric)
+            if log is None:
+                return None
+            segments = list(log.segments)
+        pieces = []
+        for segment in segments:
+            if not segment.count or segment.last() < low or segment.first() > high:
+                continue
+            start, stop = segment.search(low, "left"), segment.search(high, "right")
+            pieces.append(segment.records()[start:stop])
+        timestamps, values = _columns(pieces)
+        return (timestamps[:limit], values[:limit]) if limit is not None else (timestamps, values)
+
+    def drop_before(self, timestamp: datetime) -> int:
+        """Delete whole segments whose newest point is older than ``timestamp``."""
+        micros = to_micros(timestamp)
+        dropped = 0
+        with self._lock:
+            for log in self._series.values():
+                while log.segments and (
+                    not log.segments[0].count or log.segments[0].last() < micros
+                ):
+                    log.segments.pop(0).path.unlink(missing_ok=True)
+                    dropped += 1
+                if not log.segments:
+                    log.last = None
+        return dropped
+
+    def clear(self) -> None:
+        """Remove every series file but keep serving reads (the database was just emptied)."""
+        with self._lock:
+            for log in self._series.values():
+                shutil.rmtree(log.directory, ignore_errors=True)
+            self._series.clear()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+            self.ready = False
+            self._hits = self._misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            logs = list(self._series.values())
+        return {
+            "ready": self.ready,
+            "root": str(self.root),
+            "series": len(logs),
+            "stale_series": sum(log.stale for log in logs),
+            "segments": sum(len(log.segments) for log in logs),
+            "points": sum(segment.count for log in logs for segment in log.segments),
+            "max_segment_bytes": self.max_records * RECORD_SIZE,
+            "hits": self._hits,
+            "misses": self._misses,
+        }
+
+
+def _columns(pieces: List[Any]) -> Arrays:
+    if len(pieces) == 1:
+        return pieces[0]["ts"], pieces[0]["value"]
+    if not pieces:
+        return np.empty(0, dtype="<i8"), np.empty(0, dtype="<f8")
+    # only a read spanning segments pays for a copy
+    records = np.concatenate(pieces)
+    return records["ts"], records["value"]
+
+
+segment_store = SegmentStore(
+    root=Path(settings.segment_store_dir),
+    max_segment_bytes=settings.segment_max_bytes,
+    index_every=settings.segment_index_every,
+    services=settings.segment_store_services,
+)
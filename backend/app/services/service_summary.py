@@ -1,22 +1,27 @@
 from __future__ import annotations
 
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
 from sqlmodel import Session
 
 from app.crud import metrics as metric_crud
 from app.schemas.services import ServiceSummary
+from app.services.hot_store import HotStore, hot_store
 
 SUMMARY_METRICS = ["latency_p95_ms", "error_rate", "cpu_pct", "memory_rss_mb"]
 SPARKLINE_METRICS = ["latency_p95_ms", "error_rate"]
 
 
 class ServiceSummaryBuilder:
-    def __init__(self, session: Session) -> None:
+    def __init__(self, session: Session, store: Optional[HotStore] = None) -> None:
         self.session = session
+        self.store = store or hot_store
+        self._registry: Optional[Dict[Tuple[str, str], Optional[float]]] = None
 
     def build(self) -> List[ServiceSummary]:
-        services = metric_crud.list_services(self.session)
+        services = self.store.services()
+        if services is None:
+            services = metric_crud.list_services(self.session)
         summaries: List[ServiceSummary] = []
         for service in services:
             latest_values = self._latest_metrics(service)
@@ -36,15 +41,30 @@ class ServiceSummaryBuilder:
     def _latest_metrics(self, service: str) -> Dict[str, float]:
         values: Dict[str, float] = {}
         for metric in SUMMARY_METRICS:
-            latest = metric_crud.get_latest_metric(self.session, service, metric)
-            if latest:
-                values[metric] = latest.value
+            cached = self.store.series(service, metric, limit=1)
+            if cached is None:
+                value = self._latest_values().get((service, metric))
+            else:
+                value = cached[-1].value if cached else None
+            if value is not None:
+                values[metric] = value
         return values
 
+    def _latest_values(self) -> Dict[Tuple[str, str], Optional[float]]:
+        # one registry read per summary instead of a latest-point query per service and metric
+        if self._registry is None:
+            self._registry = {
+                (info.service, info.metric): info.last_value
+                for info in metric_crud.list_series_info(self.session)
+            }
+        return self._registry
+
     def _sparkline_payload(self, service: str) -> Dict[str, List[Dict[str, float]]]:
         payload: Dict[str, List[Dict[str, float]]] = {}
         for metric in SPARKLINE_METRICS:
-            series = metric_crud.get_metric_series(self.session, service, metric, limit=30)
+            series = self.store.series(service, metric, limit=30)
+            if series is None:
+                series = metric_crud.get_metric_series(self.session, service, metric, limit=30)
             if not series:
                 continue
             payload[metric] = [
@@ -9,7 +9,8 @@ from sqlmodel import Session
 
 from app.crud import logs as log_crud
 from app.crud import metrics as metric_crud
-from app.models import LogEntry, MetricPoint
+from app.crud.logs import LogRow
+from app.crud.metrics import MetricRow
 from app.schemas import LogCreate, MetricPointCreate
 from app.seed import SERVICES
 
@@ -70,13 +71,13 @@ class IncidentSimulator:
         self.session = session
         self.rng = random.Random(SIM_SEED)
 
-    def run(self, minutes: int = 45) -> Tuple[List[MetricPoint], List[LogEntry], SimulationPlan]:
+    def run(self, minutes: int = 45) -> Tuple[List[MetricRow], List[LogRow], SimulationPlan]:
         plan = self.rng.choice(PLANS)
         metrics_payload = self._build_metrics(plan, minutes)
         logs_payload = self._build_logs(plan)
         metrics = metric_crud.bulk_create_metrics(self.session, metrics_payload)
         logs = log_crud.bulk_create_logs(self.session, logs_payload)
-        return list(metrics), list(logs), plan
+        return metrics, logs, plan
 
     def _build_metrics(self, plan: SimulationPlan, minutes: int) -> List[MetricPointCreate]:
         baseline = SERVICES.get(plan.service, {}).get(plan.metric, 100.0)
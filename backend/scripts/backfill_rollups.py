@@ -0,0 +1,30 @@
+"""Rebuild ``metric_rollups`` from the raw ``metrics`` table.
+
+Usage: ``python -m scripts.backfill_rollups --batch-size 50000``
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+from app.crud import rollups as rollup_crud
+from app.db.session import init_db, session_scope
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    args = parser.parse_args()
+
+    init_db()
+    started = time.perf_counter()
+    with session_scope() as session:
+        processed = rollup_crud.backfill_rollups(session, batch_size=args.batch_size)
+    elapsed = time.perf_counter() - started
+    print(json.dumps({"rows": processed, "duration_s": round(elapsed, 2)}, indent=2))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
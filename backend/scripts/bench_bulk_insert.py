@@ -0,0 +1,83 @@
+"""Compare the legacy ORM ingest path against the Core bulk insert path.
+
+Usage: ``python -m scripts.bench_bulk_insert --rows 5000 --repeat 3``
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, List
+
+from app.crud import metrics as metric_crud
+from app.crud.dimensions import series_ids
+from app.models import MetricPoint
+from app.schemas import MetricPointCreate
+from sqlmodel import Session, SQLModel, create_engine
+
+
+def _payload(rows: int) -> List[MetricPointCreate]:
+    start = datetime.utcnow() - timedelta(minutes=rows)
+    return [
+        MetricPointCreate(
+            service=f"service-{idx % 20}",
+            metric="latency_p95_ms",
+            timestamp=start + timedelta(minutes=idx),
+            value=100.0 + idx % 17,
+        )
+        for idx in range(rows)
+    ]
+
+
+def legacy_orm_insert(session: Session, points: List[MetricPointCreate]) -> int:
+    keys = series_ids(session, {(p.service, p.metric) for p in points})
+    entries = [
+        MetricPoint(series_id=keys[(p.service, p.metric)], timestamp=p.timestamp, value=p.value)
+        for p in points
+    ]
+    session.add_all(entries)
+    session.commit()
+    for entry in entries:
+        session.refresh(entry)
+    return len(entries)
+
+
+def core_bulk_insert(session: Session, points: List[MetricPointCreate]) -> int:
+    return len(metric_crud.bulk_create_metrics(session, points))
+
+
+def _measure(
+    label: str, writer: Callable[[Session, List[MetricPointCreate]], int], rows: int, repeat: int
+) -> float:
+    best = 0.0
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_engine(f"sqlite:///{Path(tmp) / 'bench.db'}")
+            SQLModel.metadata.create_all(engine)
+            points = _payload(rows)
+            with Session(engine) as session:
+                started = time.perf_counter()
+                written = writer(session, points)
+                elapsed = time.perf_counter() - started
+            engine.dispose()
+        best = max(best, written / elapsed)
+    print(f"{label:<12} {rows:>8} rows  {best:>12,.0f} rows/sec")
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    before = _measure("orm+refresh", legacy_orm_insert, args.rows, args.repeat)
+    after = _measure("core bulk", core_bulk_insert, args.rows, args.repeat)
+    print(f"speedup      {after / before:.1f}x")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
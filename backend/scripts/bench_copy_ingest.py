@@ -0,0 +1,79 @@
+"""Compare COPY-based and multi-row INSERT metric ingest on a scratch Postgres database.
+
+The tables in ``--url`` are dropped and recreated for every run.
+
+Usage: ``python -m scripts.bench_copy_ingest --url postgresql://localhost/scratch --rows 200000``
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from app.crud import metrics as metric_crud
+from app.crud.dimensions import dimension_cache
+from app.db import bulk
+from app.models import MetricPoint
+from app.services.hot_store import hot_store
+from sqlmodel import Session, SQLModel, create_engine
+
+
+def _rows(rows: int, series: int) -> List[Dict[str, Any]]:
+    start = datetime(2024, 3, 1)
+    return [
+        {
+            "service": f"service-{idx % series % 10}",
+            "metric": f"metric-{idx % series // 10}",
+            "timestamp": start + timedelta(seconds=15 * (idx // series)),
+            "value": 100.0 + idx % 17,
+        }
+        for idx in range(rows)
+    ]
+
+
+def _measure(label: str, url: str, rows: List[Dict[str, Any]], batch: int, copy: bool) -> None:
+    bulk.COPY_MIN_ROWS = 1000 if copy else len(rows) + 1
+    engine = create_engine(url)
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    dimension_cache.clear()
+    hot_store.reset()
+    with Session(engine) as session:
+        # resolve every series first so both runs time only the point writes
+        metric_crud.insert_metric_rows(session, rows[:batch])
+        table = MetricPoint.__table__
+        keys = metric_crud.series_ids(session, metric_crud.series_pairs(rows))
+        params = metric_crud.point_params(rows[batch:], keys)
+
+        started = time.perf_counter()
+        for offset in range(0, len(params), batch):
+            bulk.bulk_insert(session, table, params[offset : offset + batch], [table.c.id])
+            session.commit()
+        table_rate = len(params) / (time.perf_counter() - started)
+
+        started = time.perf_counter()
+        for offset in range(batch, len(rows), batch):
+            metric_crud.insert_metric_rows(session, rows[offset : offset + batch])
+        ingest_rate = (len(rows) - batch) / (time.perf_counter() - started)
+    SQLModel.metadata.drop_all(engine)
+    engine.dispose()
+    print(f"{label:<8} metrics table {table_rate:>10,.0f} rows/sec  ingest {ingest_rate:>10,.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", required=True)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--batch", type=int, default=50_000)
+    parser.add_argument("--series", type=int, default=50)
+    args = parser.parse_args()
+
+    rows = _rows(args.rows, args.series)
+    _measure("insert", args.url, rows, args.batch, copy=False)
+    _measure("copy", args.url, rows, args.batch, copy=True)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
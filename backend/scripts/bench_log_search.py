@@ -0,0 +1,109 @@
+"""Log viewer search latency: ``lower(message) LIKE '%q%'`` vs the full-text index.
+
+Loads ``--rows`` synthetic log lines across 10 services into a temporary SQLite database (the
+FTS5 triggers index them as they land), then times the viewer's query, 100 newest matches for
+one service, for a few search shapes through both paths.
+
+Usage: ``python -m scripts.bench_log_search --rows 10000000``
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, List
+
+from app.crud import logs as log_crud
+from app.crud.dimensions import service_ids, service_key
+from app.db.bulk import bulk_insert
+from app.db.migrations import upgrade_database
+from app.models import LogEntry
+from sqlalchemy import func
+from sqlmodel import Session, create_engine, select
+
+SERVICES = [f"service-{idx}" for idx in range(10)]
+WORDS = (
+    "request handled upstream timeout connection reset retry cache miss hit queue backlog "
+    "payment declined checkout latency slow query database pool exhausted token refresh"
+).split()
+BATCH = 50_000
+QUERIES = {
+    "rare word": "exhausted",
+    "common word": "request",
+    "phrase": '"connection reset"',
+    "prefix": "paym*",
+}
+
+
+def _rows(rng: random.Random, offset: int, count: int) -> List[dict]:
+    start = datetime(2024, 1, 1)
+    return [
+        {
+            "service": SERVICES[idx % len(SERVICES)],
+            "level": "ERROR" if idx % 50 == 0 else "INFO",
+            "timestamp": start + timedelta(milliseconds=100 * idx),
+            "request_id": None,
+            "message": " ".join(rng.choices(WORDS[:-3], k=6))
+            + (" pool exhausted" if idx % 5000 == 0 else ""),
+            "latency_ms": None,
+            "context": {"region": rng.choice(["us", "eu", "ap"]), "attempt": idx % 3},
+        }
+        for idx in range(offset, offset + count)
+    ]
+
+
+def _like(session: Session, query: str) -> list:
+    statement = (
+        select(LogEntry)
+        .where(LogEntry.service_id == service_key(SERVICES[3]))
+        .where(func.lower(LogEntry.message).contains(query.strip('"*').lower()))
+        .order_by(LogEntry.timestamp.desc())
+        .limit(100)
+    )
+    return session.exec(statement).all()
+
+
+def _time(read: Callable[[], object], repeat: int) -> str:
+    latencies = []
+    for _ in range(repeat):
+        began = time.perf_counter()
+        read()
+        latencies.append((time.perf_counter() - began) * 1000)
+    return f"p50 {statistics.median(latencies):>9.2f} ms"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'bench.db'}")
+        upgrade_database(engine)
+        with Session(engine) as session:
+            began = time.perf_counter()
+            keys = service_ids(session, SERVICES)
+            for offset in range(0, args.rows, BATCH):
+                rows = _rows(rng, offset, min(BATCH, args.rows - offset))
+                bulk_insert(session, LogEntry.__table__, log_crud.entry_params(rows, keys))
+                session.commit()
+            print(f"loaded {args.rows:,} log rows in {time.perf_counter() - began:.1f} s")
+            for label, query in QUERIES.items():
+                fts = _time(
+                    lambda q=query: log_crud.list_recent_logs(session, SERVICES[3], query=q),
+                    args.repeat,
+                )
+                like = _time(lambda q=query: _like(session, q), args.repeat)
+                print(f"{label:<12} like {like}   fts {fts}")
+        engine.dispose()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
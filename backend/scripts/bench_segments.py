@@ -0,0 +1,106 @@
+"""Window-read latency: SQL path vs memory-mapped segment files.
+
+Loads one series of ``--points`` one-second points into a temporary SQLite database and a
+segment store, then times ``--reads`` random ``get_metrics_window`` calls (20 minute incident
+window plus the usual padding, limit 240) through both paths. The ``arrays`` row is the
+segment store's zero-copy NumPy result before it is turned into ``MetricRow`` objects.
+
+Usage: ``python -m scripts.bench_segments --points 10000000``
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, List
+
+from app.crud import metrics as metric_crud
+from app.crud.dimensions import series_ids
+from app.db.bulk import bulk_insert
+from app.db.migrations import upgrade_database
+from app.models import MetricPoint
+from app.services.segment_store import SegmentStore
+from sqlmodel import Session, create_engine
+
+START = datetime(2024, 1, 1)
+BATCH = 100_000
+
+
+def _load(session: Session, store: SegmentStore, points: int) -> None:
+    table = MetricPoint.__table__
+    keys = series_ids(session, [("api", "latency_p95_ms")])
+    for offset in range(0, points, BATCH):
+        params = [
+            {
+                "service": "api",
+                "metric": "latency_p95_ms",
+                "timestamp": START + timedelta(seconds=idx),
+                "value": float(idx % 1000),
+            }
+            for idx in range(offset, min(offset + BATCH, points))
+        ]
+        bulk_insert(session, table, metric_crud.point_params(params, keys))
+        session.commit()
+        store.append(metric_crud.MetricRow(id=None, **item) for item in params)
+
+
+def _time(label: str, read: Callable[[datetime], object], starts: List[datetime]) -> None:
+    latencies = []
+    for start in starts:
+        began = time.perf_counter()
+        read(start)
+        latencies.append((time.perf_counter() - began) * 1000)
+    ordered = sorted(latencies)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(f"{label:<9} p50 {statistics.median(ordered):>8.3f} ms  p99 {p99:>8.3f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--points", type=int, default=10_000_000)
+    parser.add_argument("--reads", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'bench.db'}")
+        upgrade_database(engine)
+        store = SegmentStore(Path(tmp) / "segments", 64 * 1024 * 1024, 1024)
+        with Session(engine) as session:
+            store.open()
+            store.sync(session)
+            began = time.perf_counter()
+            _load(session, store, args.points)
+            print(f"loaded {args.points:,} points in {time.perf_counter() - began:.1f} s")
+
+            span = args.points - 3600
+            starts = [START + timedelta(seconds=random.randrange(span)) for _ in range(args.reads)]
+            window = timedelta(minutes=20)
+
+            def read(start: datetime) -> object:
+                return metric_crud.get_metrics_window(
+                    session, "api", "latency_p95_ms", start, start + window
+                )
+
+            _time("sql", read, starts)
+            default_store = metric_crud.segment_store
+            metric_crud.segment_store = store
+            try:
+                _time("segments", read, starts)
+            finally:
+                metric_crud.segment_store = default_store
+
+            def arrays(start: datetime) -> object:
+                lower, upper = metric_crud.padded_window(start, start + window)
+                return store.window("api", "latency_p95_ms", lower, upper, 240)
+
+            _time("arrays", arrays, starts)
+        engine.dispose()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,140 @@
+"""Dashboard read latency while ingest runs flat out, default engine vs SQLite production profile.
+
+One thread writes metric batches (ingest-buffer sized by default) in a loop while ``--readers``
+processes repeatedly read a series and the active incidents; readers are processes so the GIL
+does not hide lock waits. The default profile is the old single engine with rollback
+journaling; the production profile is WAL plus the split writer/reader engines from
+``app.db.sqlite``.
+
+Usage: ``python -m scripts.bench_sqlite_concurrency --seconds 5 --readers 4``
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from app.crud import incidents as incident_crud
+from app.crud import metrics as metric_crud
+from app.db.migrations import upgrade_database
+from app.db.sqlite import create_sqlite_engines
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, create_engine
+
+SERVICES = [f"service-{idx}" for idx in range(10)]
+
+EngineFactory = Callable[[str], Tuple[Engine, Engine]]
+
+
+def _default_engines(url: str) -> Tuple[Engine, Engine]:
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+    return engine, engine
+
+
+def _batch(offset: int, rows: int) -> List[dict]:
+    start = datetime(2024, 1, 1) + timedelta(seconds=offset)
+    return [
+        {
+            "service": SERVICES[idx % len(SERVICES)],
+            "metric": "latency_p95_ms",
+            "timestamp": start + timedelta(milliseconds=idx),
+            "value": float(idx % 97),
+        }
+        for idx in range(rows)
+    ]
+
+
+def _read_loop(
+    factory: EngineFactory, url: str, idx: int, seconds: float, results: multiprocessing.Queue
+) -> None:
+    _, reader = factory(url)
+    service = SERVICES[idx % len(SERVICES)]
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            with Session(reader) as session:
+                metric_crud.get_metric_series(session, service, "latency_p95_ms", limit=120)
+                incident_crud.list_active_incidents(session)
+        except OperationalError:
+            errors += 1
+            continue
+        latencies.append((time.perf_counter() - started) * 1000)
+    reader.dispose()
+    results.put((latencies, errors))
+
+
+def _run(label: str, factory: EngineFactory, url: str, args: argparse.Namespace) -> None:
+    writer, _ = factory(url)
+    upgrade_database(writer)
+    stop = threading.Event()
+    counters: Dict[str, int] = {"written": 0, "write_errors": 0}
+
+    def write_loop() -> None:
+        offset = 0
+        while not stop.is_set():
+            try:
+                with Session(writer) as session:
+                    metric_crud.insert_metric_rows(session, _batch(offset, args.batch))
+                counters["written"] += args.batch
+            except OperationalError:
+                counters["write_errors"] += 1
+            offset += 1
+
+    results: multiprocessing.Queue = multiprocessing.Queue()
+    readers = [
+        multiprocessing.Process(target=_read_loop, args=(factory, url, idx, args.seconds, results))
+        for idx in range(args.readers)
+    ]
+    write_thread = threading.Thread(target=write_loop)
+    write_thread.start()
+    started = time.perf_counter()
+    for process in readers:
+        process.start()
+    latencies: List[float] = []
+    read_errors = 0
+    for _ in readers:
+        chunk, errors = results.get()
+        latencies.extend(chunk)
+        read_errors += errors
+    for process in readers:
+        process.join()
+    stop.set()
+    write_thread.join()
+    elapsed = time.perf_counter() - started
+    writer.dispose()
+
+    ordered = sorted(latencies) or [0.0]
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(
+        f"{label:<11} reads {len(latencies):>7}  p50 {statistics.median(ordered):>7.2f} ms  "
+        f"p99 {p99:>8.2f} ms  max {ordered[-1]:>8.2f} ms  read errors {read_errors:>4}  "
+        f"writes {counters['written'] / elapsed:>9,.0f} rows/sec  "
+        f"write errors {counters['write_errors']}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--batch", type=int, default=5000)
+    args = parser.parse_args()
+
+    for label, factory in (("default", _default_engines), ("production", create_sqlite_engines)):
+        with tempfile.TemporaryDirectory() as tmp:
+            _run(label, factory, f"sqlite:///{Path(tmp) / 'bench.db'}", args)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
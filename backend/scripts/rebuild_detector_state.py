@@ -0,0 +1,32 @@
+"""Rebuild the online detector's checkpoints from the metrics in the database.
+
+Prints the rebuild report. Run it after restoring a backup or when the checkpoints are suspect;
+the API picks the new checkpoints up on its next start.
+
+Usage: ``python -m scripts.rebuild_detector_state``
+"""
+
+from __future__ import annotations
+
+import json
+
+from app.core.config import settings
+from app.db.session import init_db, session_scope
+from app.services.anomaly import DETECTION_POINTS
+from app.services.online_detector import OnlineDetector
+
+
+def main() -> None:
+    init_db()
+    detector = OnlineDetector(
+        capacity=DETECTION_POINTS,
+        max_series=settings.online_detector_max_series,
+        persist_interval=0,
+    )
+    with session_scope() as session:
+        report = detector.rebuild(session)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,27 @@
+"""Rebuild the series registry from the metrics in the database.
+
+Recomputes every series' first and last timestamps, point count and latest value from the raw
+rows and sealed chunks, then prints the report. Retention and the cold tier recount the series
+they touch on their own; run this after restoring a backup, after deleting metrics by hand, or
+once after migrating to revision 0010.
+
+Usage: ``python -m scripts.reconcile_series``
+"""
+
+from __future__ import annotations
+
+import json
+
+from app.crud.series import reconcile_series
+from app.db.session import init_db, session_scope
+
+
+def main() -> None:
+    init_db()
+    with session_scope() as session:
+        report = reconcile_series(session)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,42 @@
+"""Move metrics and logs older than the hot horizon into the Parquet cold tier.
+
+Prints the run report. Needs the ``cold`` extra (pyarrow).
+
+Usage: ``python -m scripts.tier_cold --hot-days 2 --dir ./cold``
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from datetime import timedelta
+from pathlib import Path
+
+from app.core.config import settings
+from app.db.session import init_db, session_scope
+from app.services.cold_tier import ColdTier
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--hot-days", type=int, default=settings.cold_tier_hot_days)
+    parser.add_argument("--dir", default=settings.cold_tier_dir)
+    args = parser.parse_args()
+
+    init_db()
+    tier = ColdTier(
+        root=Path(args.dir),
+        hot_after=timedelta(days=args.hot_days),
+        batch_rows=settings.cold_tier_batch_rows,
+        keep=(
+            timedelta(days=settings.cold_tier_keep_days) if settings.cold_tier_keep_days else None
+        ),
+        interval=0,
+    )
+    with session_scope() as session:
+        report = tier.run(session)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -1,29 +1,117 @@
+import asyncio
+import os
+import uuid
 from datetime import datetime, timedelta
 from typing import Iterator
 
-import pytest
-from app.models import MetricPoint
-from sqlmodel import Session, SQLModel, create_engine
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pytest  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy.ext.asyncio import create_async_engine  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+from sqlmodel import Session, SQLModel, create_engine  # noqa: E402
+from sqlmodel.ext.asyncio.session import AsyncSession  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def reset_hot_store() -> Iterator[None]:
+    from app.services.hot_store import hot_store
+
+    yield
+    hot_store.reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_online_detector() -> Iterator[None]:
+    from app.services.online_detector import online_detector
+
+    yield
+    online_detector.reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_dimension_cache() -> Iterator[None]:
+    # every test gets a fresh database, so keys cached by the last one point at nothing
+    from app.crud.dimensions import dimension_cache
+    from app.crud.series import series_registry
+
+    yield
+    dimension_cache.clear()
+    series_registry.clear()
+
+
+@pytest.fixture()
+def database_name() -> str:
+    # a named shared-cache memory database lets the sync and async engines see the same data
+    return f"file:signalsentry-{uuid.uuid4().hex}?mode=memory&cache=shared&uri=true"
 
 
 @pytest.fixture()
-def session() -> Iterator[Session]:
-    engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+def session(database_name: str) -> Iterator[Session]:
+    engine = create_engine(
+        f"sqlite:///{database_name}",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
     SQLModel.metadata.create_all(engine)
     with Session(engine) as session:
         yield session
+    engine.dispose()
+
+
+@pytest.fixture()
+def loop() -> Iterator[asyncio.AbstractEventLoop]:
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture()
+def async_session(session: Session, database_name: str, loop) -> Iterator[AsyncSession]:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{database_name}", poolclass=StaticPool)
+    async_session = AsyncSession(engine, expire_on_commit=False)
+    yield async_session
+    loop.run_until_complete(async_session.close())
+    loop.run_until_complete(engine.dispose())
+
+
+@pytest.fixture()
+def client(session: Session, database_name: str) -> Iterator[TestClient]:
+    from app.api.routes import api_router
+    from app.db.async_session import get_async_session
+    from app.db.session import get_read_session, get_session
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{database_name}", poolclass=StaticPool)
+
+    async def _async_session():
+        async with AsyncSession(engine, expire_on_commit=False) as async_session:
+            yield async_session
+
+    app = FastAPI()
+    app.include_router(api_router, prefix="/api/v1")
+    app.dependency_overrides[get_session] = lambda: session
+    app.dependency_overrides[get_read_session] = lambda: session
+    app.dependency_overrides[get_async_session] = _async_session
+    with TestClient(app) as test_client:
+        yield test_client
 
 
 @pytest.fixture()
 def baseline_metrics(session: Session) -> None:
+    from app.crud import metrics as metric_crud
+
     start = datetime.utcnow() - timedelta(minutes=60)
-    for idx in range(40):
-        session.add(
-            MetricPoint(
-                service="api-gateway",
-                metric="latency_p95_ms",
-                timestamp=start + timedelta(minutes=idx),
-                value=120.0,
-            )
-        )
-    session.commit()
+    metric_crud.insert_metric_rows(
+        session,
+        [
+            {
+                "service": "api-gateway",
+                "metric": "latency_p95_ms",
+                "timestamp": start + timedelta(minutes=idx),
+                "value": 120.0,
+            }
+            for idx in range(40)
+        ],
+    )
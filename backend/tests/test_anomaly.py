@@ -1,8 +1,27 @@
+import random
 from datetime import datetime, timedelta
 
-from app.models import MetricPoint
-from app.services.anomaly import detect_anomaly
+import pytest
+from app.crud import incidents as incident_crud
+from app.crud import metrics as metric_crud
+from app.crud.series import series_registry
+from app.models import Incident
+from app.schemas import MetricPointCreate
+from app.services.anomaly import (
+    AnomalyAssessment,
+    _ewma,
+    _z_score,
+    detect_anomaly,
+    detect_batch,
+    detect_many,
+    pack_series,
+)
+from app.services.compaction import CompactionJob
+from app.services.detection_pool import DetectionPool
 from app.services.incident_detector import IncidentDetector
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
 
 
 def test_detect_anomaly_identifies_spike() -> None:
@@ -14,20 +33,189 @@ def test_detect_anomaly_identifies_spike() -> None:
     assert assessment.severity >= 55
 
 
+def test_batch_detection_matches_scalar_detector() -> None:
+    pytest.importorskip("numpy")
+    rng = random.Random(7)
+    metrics = ["latency_p95_ms", "requests_per_s", "error_rate", "queue_depth"]
+    series, names = [], []
+    for idx in range(400):
+        length = rng.choice([0, 4, 12, 19, 20, 31, 240])
+        if idx % 5 == 0:
+            values = [0.1] * length  # flat history: the scalar pstdev is exactly zero
+        else:
+            values = [rng.gauss(100, 15) for _ in range(length)]
+        if length >= 10 and idx % 3 == 0:
+            values[-5:] = [value * rng.choice([0.2, 2.5]) for value in values[-5:]]
+        series.append(values)
+        names.append(metrics[idx % len(metrics)])
+
+    values, mask = pack_series(series)
+    scores = detect_batch(values, mask, names)
+
+    start = datetime(2024, 3, 1)
+    for row, (points, metric) in enumerate(zip(series, names, strict=True)):
+        timestamps = [start + timedelta(minutes=i) for i in range(len(points))]
+        expected = detect_anomaly(points, timestamps, metric=metric)
+        assert bool(scores.flagged[row]) == (expected is not None)
+        if len(points) < 20:
+            continue
+        history = points[:-5]
+        observed = sum(points[-5:]) / 5
+        assert scores.z_score[row] == pytest.approx(abs(_z_score(history, observed)), rel=1e-9)
+        assert scores.ewma[row] == pytest.approx(_ewma(history), rel=1e-9)
+        if expected is not None:
+            assert scores.severity[row] == expected.severity
+            assert scores.baseline[row] == pytest.approx(expected.baseline, rel=1e-12)
+
+
 def test_incident_detector_creates_incident(session, baseline_metrics) -> None:
     now = datetime.utcnow()
     for idx in range(5):
-        session.add(
-            MetricPoint(
+        metric_crud.create_metric(
+            session,
+            MetricPointCreate(
                 service="api-gateway",
                 metric="latency_p95_ms",
                 timestamp=now - timedelta(minutes=5 - idx),
                 value=350.0,
-            )
+            ),
         )
-    session.commit()
 
     detector = IncidentDetector(session)
     incident = detector.evaluate_metric("api-gateway", "latency_p95_ms")
     assert incident is not None
     assert incident.severity >= 55
+
+
+def _write_series(session, services, start, minutes) -> None:
+    metric_crud.insert_metric_rows(
+        session,
+        [
+            {
+                "service": service,
+                "metric": metric,
+                "timestamp": start + timedelta(minutes=idx),
+                "value": 100.0 + idx % 3,
+            }
+            for service in services
+            for metric in ("latency_p95_ms", "cpu_pct")
+            for idx in range(minutes)
+        ],
+    )
+
+
+def test_batched_series_read_matches_single_series_reads(session) -> None:
+    start = datetime(2024, 3, 1)
+    _write_series(session, ["api", "auth"], start, 400)
+    _write_series(session, ["search"], start + timedelta(hours=5), 30)
+    CompactionJob(3600, timedelta(0), 60).run(session, now=start + timedelta(hours=5))
+    pairs = [(service, "latency_p95_ms") for service in ("api", "auth", "search", "unknown")]
+
+    series = metric_crud.get_metric_series_many(session, pairs, limit=240)
+
+    assert len(series["api", "latency_p95_ms"].values) == 240
+    assert series["unknown", "latency_p95_ms"] == ([], [])
+    for service, metric in pairs:
+        rows = metric_crud.database_series(session, service, metric, 240)
+        assert series[service, metric] == (
+            [row.timestamp for row in rows],
+            [row.value for row in rows],
+        )
+
+
+def _refresh_statements(session, services) -> int:
+    start = datetime.utcnow() - timedelta(hours=4)
+    _write_series(session, services, start, 200)
+    CompactionJob(3600, timedelta(hours=2), 60).run(session)
+    series_registry.clear()  # both passes load the registry once
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(session.get_bind(), "before_cursor_execute", _record)
+    try:
+        incidents = IncidentDetector(session).evaluate_all_services()
+    finally:
+        event.remove(session.get_bind(), "before_cursor_execute", _record)
+
+    assert incidents == []
+    return len(statements)
+
+
+def test_detection_refresh_issues_constant_queries(session) -> None:
+    few = _refresh_statements(session, [f"service-{idx}" for idx in range(2)])
+    many = _refresh_statements(session, [f"service-{idx}" for idx in range(2, 12)])
+
+    # 12 services cost the same statements as 2
+    assert many == few
+
+
+def test_incident_upsert_is_one_statement_and_one_open_incident_per_key(session) -> None:
+    window = datetime(2024, 3, 1)
+
+    def assessment(severity):
+        return AnomalyAssessment(
+            severity=severity,
+            baseline=100.0,
+            observed=300.0,
+            window_start=window,
+            window_end=window + timedelta(minutes=5),
+            detector="zscore_ewma",
+            summary="spike",
+        )
+
+    existing = incident_crud.upsert_incident(
+        session, "service-0:cpu_pct", "service-0", "cpu_pct", assessment(60)
+    )
+    flagged = [(f"service-{idx}", "cpu_pct", assessment(70 + idx % 20)) for idx in range(200)]
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split()[0])
+
+    event.listen(session.get_bind(), "before_cursor_execute", _record)
+    try:
+        incidents = incident_crud.upsert_incidents(session, flagged)
+    finally:
+        event.remove(session.get_bind(), "before_cursor_execute", _record)
+
+    # the upsert, then one read of the refreshed rows
+    assert statements == ["INSERT", "SELECT"]
+    assert incidents[0].id == existing.id and incidents[0].severity == 70
+    assert [incident.severity for incident in incidents] == [70 + idx % 20 for idx in range(200)]
+    assert len(session.exec(select(Incident)).all()) == 200
+
+    session.add(
+        Incident(
+            incident_key="service-1:cpu_pct",
+            service="service-1",
+            metric="cpu_pct",
+            window_start=window,
+            window_end=window,
+        )
+    )
+    with pytest.raises(IntegrityError):
+        session.commit()
+
+
+def test_detection_pool_matches_serial_detection() -> None:
+    rng = random.Random(11)
+    start = datetime(2024, 3, 1)
+    series, metrics = [], []
+    for idx in range(60):
+        values = [rng.gauss(100, 10) for _ in range(rng.randint(0, 240))]
+        if len(values) > 10 and idx % 3 == 0:
+            values[-5:] = [value * 3 for value in values[-5:]]
+        series.append(([start + timedelta(minutes=i) for i in range(len(values))], values))
+        metrics.append("latency_p95_ms" if idx % 2 else "requests_per_s")
+
+    pool = DetectionPool(workers=2, min_series=2)
+    try:
+        parallel = pool.detect(series, metrics)
+    finally:
+        pool.shutdown()
+
+    assert pool.last_report["shards"] == 2
+    assert parallel == detect_many(series, metrics)
+    assert any(parallel)
@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+
+from app.crud import logs as log_crud
+from app.crud import metrics as metric_crud
+from app.models import LogEntry
+from app.schemas import LogCreate, MetricPointCreate
+from sqlalchemy import event
+from sqlmodel import select
+
+
+def _count_statements(session):
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(session.get_bind(), "before_cursor_execute", _record)
+    return statements
+
+
+def test_bulk_create_metrics_returns_rows_without_refresh(session) -> None:
+    start = datetime.utcnow() - timedelta(minutes=30)
+    payload = [
+        MetricPointCreate(
+            service="checkout",
+            metric="latency_p95_ms",
+            timestamp=start + timedelta(minutes=idx),
+            value=100.0 + idx,
+        )
+        for idx in range(30)
+    ]
+    # the first batch of a series resolves its key; later batches hit the interning cache
+    first = metric_crud.bulk_create_metrics(session, payload[:1])
+    statements = _count_statements(session)
+
+    rows = metric_crud.bulk_create_metrics(session, payload[1:])
+
+    assert len(rows) == 29
+    assert [row.value for row in rows] == [point.value for point in payload[1:]]
+    assert all(row.id is not None for row in rows)
+    assert len({row.id for row in rows}) == 29
+    assert not any(statement.lstrip().upper().startswith("SELECT") for statement in statements)
+
+    stored = metric_crud.get_metric_series(session, "checkout", "latency_p95_ms", limit=50)
+    assert [point.id for point in stored] == [row.id for row in first + rows]
+
+
+def test_bulk_create_logs_keeps_context(session) -> None:
+    rows = log_crud.bulk_create_logs(
+        session,
+        [
+            LogCreate(
+                service="checkout",
+                level="error",
+                message="upstream timeout",
+                context={"upstream": "db", "status_code": 504},
+            ),
+            LogCreate(service="checkout", message="ok"),
+        ],
+    )
+
+    assert [row.level for row in rows] == ["ERROR", "INFO"]
+    assert rows[0].context == {"upstream": "db", "status_code": 504}
+    assert rows[1].context is None
+    assert log_crud.list_recent_logs(session, "checkout")[-1].id == rows[-1].id
+    promoted = select(LogEntry.upstream, LogEntry.status_code).order_by(LogEntry.id)
+    assert session.exec(promoted).all() == [("db", "504"), (None, None)]
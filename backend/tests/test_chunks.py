@@ -0,0 +1,102 @@
+import math
+from datetime import datetime, timedelta
+
+from app.crud import aio as async_crud
+from app.crud import metrics as metric_crud
+from app.db.chunk_codec import decode_chunk, encode_chunk
+from app.models import MetricChunk, MetricPoint
+from app.services.compaction import CompactionJob
+from sqlmodel import select
+
+START = datetime(2024, 3, 1)
+
+
+def _rows(count: int, start: datetime = START, step: int = 60, metric: str = "cpu_pct") -> list:
+    return [
+        {
+            "service": "api",
+            "metric": metric,
+            "timestamp": start + timedelta(seconds=step * idx),
+            "value": float(40 + idx % 5),
+        }
+        for idx in range(count)
+    ]
+
+
+def _job() -> CompactionJob:
+    return CompactionJob(chunk_seconds=3600, delay=timedelta(hours=2), interval=60)
+
+
+def test_codec_round_trips_irregular_series() -> None:
+    timestamps = [0, 1_000_000, 2_000_000, 2_500_017, 9_000_000_000, 9_000_000_001]
+    values = [1.5, 1.5, -3.25, math.pi, 1e300, 0.0]
+
+    assert decode_chunk(encode_chunk(timestamps, values)) == (timestamps, values)
+
+
+def test_regular_series_compresses_below_two_bytes_per_point() -> None:
+    timestamps = [idx * 15_000_000 for idx in range(240)]
+    values = [float(200 + idx % 7) for idx in range(240)]
+
+    assert len(encode_chunk(timestamps, values)) / 240 < 2
+
+
+def test_compaction_seals_old_rows_and_reads_stay_transparent(session) -> None:
+    metric_crud.insert_metric_rows(session, _rows(300))  # five hours of one-minute points
+    before = metric_crud.get_metric_series(session, "api", "cpu_pct", limit=500)
+
+    report = _job().run(session, now=START + timedelta(hours=5))
+
+    assert report["points"] == 180 and report["chunks"] == 3
+    assert len(session.exec(select(MetricPoint)).all()) == 120
+    after = metric_crud.get_metric_series(session, "api", "cpu_pct", limit=500)
+    assert [(p.timestamp, p.value) for p in after] == [(p.timestamp, p.value) for p in before]
+    tail = metric_crud.get_metric_series(session, "api", "cpu_pct", limit=150)
+    assert [p.timestamp for p in tail] == [p.timestamp for p in before[-150:]]
+    window = metric_crud.get_metrics_window(
+        session, "api", "cpu_pct", START + timedelta(minutes=50), START + timedelta(minutes=70)
+    )
+    assert [p.timestamp for p in window] == [p.timestamp for p in before[40:81]]
+    assert metric_crud.list_service_metrics(session, "api") == ["cpu_pct"]
+
+
+def test_sealed_only_series_is_still_served(session, loop, async_session) -> None:
+    metric_crud.insert_metric_rows(session, _rows(60))
+    _job().run(session, now=START + timedelta(hours=3))
+
+    assert metric_crud.list_services(session) == ["api"]
+    assert metric_crud.get_latest_metric(session, "api", "cpu_pct").value == 44.0
+    series = loop.run_until_complete(
+        async_crud.get_metric_series(async_session, "api", "cpu_pct", limit=10)
+    )
+    assert [p.timestamp for p in series] == [
+        START + timedelta(minutes=50 + idx) for idx in range(10)
+    ]
+
+
+def test_late_points_merge_into_sealed_chunk(session) -> None:
+    metric_crud.insert_metric_rows(session, _rows(60, step=120))
+    job = _job()
+    job.run(session, now=START + timedelta(hours=4))
+    metric_crud.insert_metric_rows(
+        session, _rows(30, start=START + timedelta(seconds=60), step=120)
+    )
+
+    job.run(session, now=START + timedelta(hours=4))
+
+    chunks = session.exec(select(MetricChunk)).all()
+    assert [chunk.count for chunk in chunks] == [60, 30]
+    series = metric_crud.get_metric_series(session, "api", "cpu_pct", limit=200)
+    assert len(series) == 90
+    assert [p.timestamp for p in series] == sorted(p.timestamp for p in series)
+
+
+def test_compaction_route_reports_bytes_per_point(client, session) -> None:
+    metric_crud.insert_metric_rows(session, _rows(120))
+
+    response = client.post("/api/v1/admin/compaction/run")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["storage"]["chunks"] == 2
+    assert body["storage"]["bytes_per_point"] < 2
@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta
+
+import pytest
+from app.crud import logs as log_crud
+from app.crud import metrics as metric_crud
+from app.models import LogEntry, MetricChunk, MetricPoint
+from app.schemas import LogCreate
+from app.services.cold_tier import ColdTier
+from app.services.compaction import CompactionJob
+from sqlmodel import func, select
+
+pytest.importorskip("pyarrow")
+
+NOW = datetime(2024, 3, 10, 12, 0)
+
+
+def _rows(service: str, metric: str, start: datetime, hours: int) -> list:
+    return [
+        {
+            "service": service,
+            "metric": metric,
+            "timestamp": start + timedelta(minutes=idx),
+            "value": float(idx),
+        }
+        for idx in range(hours * 60)
+    ]
+
+
+@pytest.fixture()
+def tier(tmp_path, monkeypatch) -> ColdTier:
+    tier = ColdTier(tmp_path, hot_after=timedelta(days=2), batch_rows=500, keep=None, interval=60)
+    monkeypatch.setattr(metric_crud, "cold_tier", tier)
+    monkeypatch.setattr(log_crud, "cold_tier", tier)
+    return tier
+
+
+def _count(session, model) -> int:
+    return session.exec(select(func.count()).select_from(model)).one()
+
+
+def test_aged_rows_move_to_parquet_and_reads_fall_through(session, tier) -> None:
+    old = datetime(2024, 3, 1, 22, 0)
+    metric_crud.insert_metric_rows(session, _rows("api", "cpu_pct", old, hours=4))
+    metric_crud.insert_metric_rows(session, _rows("api", "latency_p95_ms", old, hours=4))
+    metric_crud.insert_metric_rows(session, _rows("db", "cpu_pct", old, hours=4))
+    metric_crud.insert_metric_rows(session, _rows("api", "cpu_pct", NOW - timedelta(hours=1), 1))
+    # the first two hours are sealed into chunks, the rest stay raw
+    CompactionJob(3600, timedelta(0), 60).run(session, now=old + timedelta(hours=2))
+    for level, timestamp in [("ERROR", old), ("INFO", old + timedelta(hours=3)), ("INFO", NOW)]:
+        log_crud.create_log(
+            session,
+            LogCreate(
+                service="api",
+                level=level,
+                timestamp=timestamp,
+                message="upstream timeout",
+                context={"upstream": "payments"},
+            ),
+        )
+    before = metric_crud.get_metrics_window(
+        session, "api", "cpu_pct", old + timedelta(hours=1), old + timedelta(hours=3), limit=500
+    )
+
+    report = tier.run(session, now=NOW)
+
+    assert report["points"] == 3 * 240 and report["chunks"] == 6 and report["logs"] == 2
+    assert report["series_recounted"] == 3
+    # only api:cpu_pct still has points in the database
+    assert [
+        (info.service, info.metric, info.point_count)
+        for info in metric_crud.list_series_info(session)
+    ] == [("api", "cpu_pct", 60)]
+    assert _count(session, MetricChunk) == 0
+    assert _count(session, MetricPoint) == 60
+    assert _count(session, LogEntry) == 1
+    days = sorted(path.name for path in (tier.root / "metrics").iterdir())
+    assert days == ["date=2024-03-01", "date=2024-03-02"]
+
+    after = metric_crud.get_metrics_window(
+        session, "api", "cpu_pct", old + timedelta(hours=1), old + timedelta(hours=3), limit=500
+    )
+    assert [(p.timestamp, p.value) for p in after] == [(p.timestamp, p.value) for p in before]
+    assert {p.service for p in after} == {"api"} and {p.metric for p in after} == {"cpu_pct"}
+
+    logs = log_crud.get_logs_for_window(session, "api", old, old + timedelta(hours=3))
+    assert [(log.level, log.context) for log in logs] == [
+        ("ERROR", {"upstream": "payments"}),
+        ("INFO", {"upstream": "payments"}),
+    ]
+
+
+def test_reads_only_open_the_partitions_they_cover(session, tier) -> None:
+    for day in range(1, 6):
+        metric_crud.insert_metric_rows(session, _rows("api", "cpu_pct", datetime(2024, 3, day), 1))
+        metric_crud.insert_metric_rows(session, _rows("db", "cpu_pct", datetime(2024, 3, day), 1))
+    tier.run(session, now=NOW)
+
+    window = metric_crud.get_metrics_window(
+        session, "api", "cpu_pct", datetime(2024, 3, 3, 0, 20), datetime(2024, 3, 3, 0, 40)
+    )
+
+    assert len(window) == 41  # padded by ten minutes either side
+    assert tier.stats()["files_read"] == 1
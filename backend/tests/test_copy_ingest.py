@@ -0,0 +1,89 @@
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Iterator
+
+import pytest
+from app.crud import logs as log_crud
+from app.crud import metrics as metric_crud
+from app.crud.rollups import aggregate_rollups
+from app.db.bulk import COPY_MIN_ROWS, _copy_text
+from app.models import LogEntry, MetricPoint, MetricRollup
+from app.schemas import LogCreate
+from sqlmodel import Session, SQLModel, create_engine, select
+
+POSTGRES_URL = os.environ.get("SIGNALSENTRY_TEST_POSTGRES_URL")
+needs_postgres = pytest.mark.skipif(
+    not POSTGRES_URL, reason="set SIGNALSENTRY_TEST_POSTGRES_URL to a scratch Postgres database"
+)
+
+START = datetime(2024, 3, 1)
+
+
+@pytest.fixture()
+def pg_session() -> Iterator[Session]:
+    engine = create_engine(POSTGRES_URL)
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+    SQLModel.metadata.drop_all(engine)
+    engine.dispose()
+
+
+def test_copy_text_escapes_and_normalizes_values() -> None:
+    aware = datetime(2024, 3, 1, 14, 0, tzinfo=timezone(timedelta(hours=2)))
+
+    assert _copy_text(None) == "\\N"
+    assert _copy_text("a\tb\nc\\d") == "a\\tb\\nc\\\\d"
+    assert _copy_text(aware) == "2024-03-01 12:00:00"
+    assert _copy_text({"path": "/pay\tments"}) == '{"path": "/pay\\\\tments"}'
+    assert _copy_text(0.1) == "0.1"
+
+
+@needs_postgres
+def test_copied_batches_match_the_insert_path(pg_session) -> None:
+    rows = [
+        {
+            "service": f"svc-{idx % 3}",
+            "metric": "cpu_pct",
+            "timestamp": START + timedelta(seconds=15 * (idx // 3)),
+            "value": float(idx % 11),
+        }
+        for idx in range(COPY_MIN_ROWS * 3)
+    ]
+
+    written = metric_crud.insert_metric_rows(pg_session, rows)
+
+    stored = {
+        row.id: (row.timestamp, row.value) for row in pg_session.exec(select(MetricPoint)).all()
+    }
+    assert {row.id: (row.timestamp, row.value) for row in written} == stored
+    rollups = pg_session.exec(select(MetricRollup)).all()
+    expected = {
+        (r["resolution"], r["service"], r["bucket"]): r["value_sum"]
+        for r in aggregate_rollups(rows)
+    }
+    assert {(r.resolution, r.service, r.bucket): r.value_sum for r in rollups} == expected
+
+
+@needs_postgres
+def test_copied_logs_keep_text_json_and_search(pg_session) -> None:
+    logs = [
+        LogCreate(
+            service="checkout",
+            level="error",
+            timestamp=START + timedelta(seconds=idx),
+            message=f"upstream\ttimeout \\ #{idx}\nretrying",
+            context={"upstream": "payments"} if idx % 2 else None,
+        )
+        for idx in range(COPY_MIN_ROWS)
+    ]
+
+    written = log_crud.bulk_create_logs(pg_session, logs)
+
+    entry = pg_session.get(LogEntry, written[1].id)
+    assert entry.message == logs[1].message
+    assert entry.context == {"upstream": "payments"} and entry.upstream == "payments"
+    assert pg_session.get(LogEntry, written[0].id).context is None
+    found = log_crud.list_recent_logs(pg_session, "checkout", query="timeout", limit=5)
+    assert len(found) == 5
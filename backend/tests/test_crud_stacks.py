@@ -0,0 +1,120 @@
+"""The same CRUD assertions run against the sync and the async stack."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from app.crud import aio as async_crud
+from app.crud import incidents as incident_crud
+from app.crud import logs as log_crud
+from app.crud import metrics as metric_crud
+from app.schemas import LogCreate, MetricPointCreate
+from app.services.anomaly import AnomalyAssessment
+
+SYNC_FUNCTIONS = {
+    "bulk_create_metrics": metric_crud.bulk_create_metrics,
+    "get_metric_series": metric_crud.get_metric_series,
+    "get_latest_metric": metric_crud.get_latest_metric,
+    "bulk_create_logs": log_crud.bulk_create_logs,
+    "list_recent_logs": log_crud.list_recent_logs,
+    "upsert_incident": incident_crud.upsert_incident,
+}
+
+
+@pytest.fixture(params=["sync", "async"])
+def crud(request, session):
+    if request.param == "sync":
+        return lambda name, *args, **kwargs: SYNC_FUNCTIONS[name](session, *args, **kwargs)
+
+    async_session = request.getfixturevalue("async_session")
+    loop = request.getfixturevalue("loop")
+
+    def call(name, *args, **kwargs):
+        function = getattr(async_crud, name)
+        return loop.run_until_complete(function(async_session, *args, **kwargs))
+
+    return call
+
+
+def _points(service: str, count: int) -> list[MetricPointCreate]:
+    start = datetime(2024, 3, 1, 12, 0)
+    return [
+        MetricPointCreate(
+            service=service,
+            metric="latency_p95_ms",
+            timestamp=start + timedelta(minutes=idx),
+            value=float(idx),
+        )
+        for idx in range(count)
+    ]
+
+
+def test_metric_roundtrip(crud) -> None:
+    rows = crud("bulk_create_metrics", _points("checkout", 12))
+    crud("bulk_create_metrics", _points("search", 3))
+
+    assert len(rows) == 12 and all(row.id is not None for row in rows)
+    series = crud("get_metric_series", "checkout", "latency_p95_ms", limit=5)
+    assert [point.value for point in series] == [7.0, 8.0, 9.0, 10.0, 11.0]
+    assert crud("get_latest_metric", "checkout", "latency_p95_ms").value == 11.0
+    assert crud("get_latest_metric", "checkout", "cpu_pct") is None
+
+
+def test_recent_logs_filters(crud) -> None:
+    base = datetime(2024, 3, 1, 12, 0)
+    crud(
+        "bulk_create_logs",
+        [
+            LogCreate(service="checkout", timestamp=base, level="info", message="ok"),
+            LogCreate(
+                service="checkout",
+                timestamp=base + timedelta(minutes=1),
+                level="error",
+                message="Upstream TIMEOUT",
+            ),
+            LogCreate(service="search", timestamp=base, level="error", message="timeout"),
+        ],
+    )
+
+    assert [log.message for log in crud("list_recent_logs", "checkout")] == [
+        "ok",
+        "Upstream TIMEOUT",
+    ]
+    errors = crud("list_recent_logs", "checkout", level="error", query="timeout")
+    assert [log.message for log in errors] == ["Upstream TIMEOUT"]
+
+
+def test_upsert_incident_updates_open_incident(crud) -> None:
+    window = datetime(2024, 3, 1, 12, 0)
+
+    def assessment(severity: int) -> AnomalyAssessment:
+        return AnomalyAssessment(
+            severity=severity,
+            baseline=100.0,
+            observed=300.0,
+            window_start=window,
+            window_end=window + timedelta(minutes=5),
+            detector="zscore_ewma",
+            summary="spike",
+        )
+
+    first = crud(
+        "upsert_incident", "checkout:latency_p95_ms", "checkout", "latency_p95_ms", assessment(60)
+    )
+    second = crud(
+        "upsert_incident", "checkout:latency_p95_ms", "checkout", "latency_p95_ms", assessment(80)
+    )
+
+    assert first.id == second.id
+    assert second.severity == 80
+
+
+def test_async_routes_read_sync_writes(client, session) -> None:
+    metric_crud.bulk_create_metrics(session, _points("checkout", 20))
+
+    response = client.get(
+        "/api/v1/services/checkout/metrics", params={"metric": "latency_p95_ms", "limit": 10}
+    )
+
+    assert response.status_code == 200
+    assert [point["value"] for point in response.json()["points"]][-1] == 19.0
+    assert client.get("/api/v1/services/checkout/logs").json()["items"] == []
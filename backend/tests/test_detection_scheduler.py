@@ -0,0 +1,73 @@
+import asyncio
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from app.crud import metrics as metric_crud
+from app.models import Incident
+from app.services.detection_scheduler import DetectionScheduler
+from sqlmodel import Session, select
+
+
+def _scheduler(session: Session, **kwargs) -> DetectionScheduler:
+    engine = session.get_bind()
+
+    @contextmanager
+    def factory():
+        with Session(engine) as scoped:
+            yield scoped
+
+    options = {"tick": 5.0, "debounce": 2.0, "max_latency": 10.0, "max_series_per_tick": 100}
+    options.update(kwargs)
+    return DetectionScheduler(session_factory=factory, **options)
+
+
+def test_due_respects_debounce_max_latency_and_budget(session) -> None:
+    scheduler = _scheduler(session, max_series_per_tick=2)
+
+    # a chatty agent keeps re-marking api every second; auth goes quiet after one push
+    for second in range(12):
+        scheduler.mark([("api", "cpu_pct")], now=float(second))
+    scheduler.mark([("auth", "cpu_pct")], now=5.0)
+    assert scheduler.due(now=6.0) == []
+    assert scheduler.due(now=7.0) == [("auth", "cpu_pct")]
+    assert scheduler.due(now=10.5) == [("api", "cpu_pct")]
+
+    scheduler.mark([("svc-c", "cpu_pct"), ("svc-a", "cpu_pct")], now=20.0)
+    scheduler.mark([("svc-b", "cpu_pct")], now=19.0)
+    assert scheduler.stats(now=25.0)["queue_depth"] == 3
+    assert scheduler.due(now=25.0) == [("svc-b", "cpu_pct"), ("svc-a", "cpu_pct")]
+    assert scheduler.stats(now=25.0)["oldest_pending_seconds"] == 5.0
+    assert scheduler.due(now=25.0) == [("svc-c", "cpu_pct")]
+
+
+def test_ingest_only_marks_while_running_and_stop_drains(session) -> None:
+    scheduler = _scheduler(session)
+    start = datetime.utcnow() - timedelta(minutes=60)
+    rows = [
+        {
+            "service": "api",
+            "metric": "latency_p95_ms",
+            "timestamp": start + timedelta(minutes=idx),
+            "value": 900.0 if idx >= 55 else 100.0 + idx % 3,
+        }
+        for idx in range(60)
+    ]
+    metric_crud.insert_metric_rows(session, rows)
+
+    async def scenario() -> list:
+        await scheduler.start()
+        queued = scheduler.detect(session, [("api", "latency_p95_ms")])
+        pending = scheduler.stats()["queue_depth"]
+        await scheduler.stop()
+        return [queued, pending]
+
+    queued, pending = asyncio.run(scenario())
+
+    assert queued == [] and pending == 1
+    stats = scheduler.stats()
+    assert stats["queue_depth"] == 0 and not stats["running"]
+    assert stats["evaluated_total"] == 1 and stats["incidents_total"] == 1
+    incidents = session.exec(select(Incident)).all()
+    assert [(incident.service, incident.metric) for incident in incidents] == [
+        ("api", "latency_p95_ms")
+    ]
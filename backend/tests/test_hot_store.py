@@ -0,0 +1,144 @@
+import json
+from datetime import datetime, timedelta
+
+from app.crud import metrics as metric_crud
+from app.crud.dimensions import series_ids
+from app.models import MetricPoint, MetricRollup
+from app.services.hot_store import HotStore, SeriesRing, hot_store
+from app.services.incident_detector import IncidentDetector
+from sqlmodel import select
+
+START = datetime(2024, 3, 1, 12, 0)
+
+
+def _points(values, start: datetime = START, service: str = "api") -> list:
+    return [
+        {
+            "service": service,
+            "metric": "latency_p95_ms",
+            "timestamp": start + timedelta(minutes=idx),
+            "value": float(value),
+        }
+        for idx, value in enumerate(values)
+    ]
+
+
+def test_ring_keeps_newest_points_in_time_order() -> None:
+    ring = SeriesRing(capacity=3)
+    for micros in (10, 20, 40, 50):
+        ring.append(micros, float(micros))
+    ring.append(30, 30.0)  # late arrival lands in order
+    ring.append(5, 5.0)  # older than everything retained: dropped
+
+    assert ring.tail(10) == [(30, 30.0), (40, 40.0), (50, 50.0)]
+    assert ring.evicted
+    assert ring.nbytes == 3 * 16
+
+
+def test_store_serves_reads_after_warm_and_stays_consistent(session) -> None:
+    store = HotStore(capacity=5, max_series=10)
+    metric_crud.insert_metric_rows(session, _points(range(8)))
+    assert store.series("api", "latency_p95_ms", 3) is None  # not warmed yet
+
+    assert store.warm(session) == 5
+    rows = metric_crud.insert_metric_rows(session, _points([100, 101], START + timedelta(hours=1)))
+    store.extend(rows)
+
+    series = store.series("api", "latency_p95_ms", 3)
+    assert [point.value for point in series] == [7.0, 100.0, 101.0]
+    assert series[-1].timestamp == START + timedelta(hours=1, minutes=1)
+    assert store.series("api", "unknown_metric", 3) == []
+    # asking for more than the ring holds, or a window it no longer covers, falls back to SQL
+    assert store.series("api", "latency_p95_ms", 10) is None
+    assert store.window("api", "latency_p95_ms", START, START + timedelta(hours=2), 10) is None
+    window = store.window(
+        "api", "latency_p95_ms", START + timedelta(minutes=6), START + timedelta(minutes=7), 10
+    )
+    assert [point.value for point in window] == [6.0, 7.0]
+    assert store.verify(session)["consistent"]
+
+    # written behind the store's back
+    keys = series_ids(session, [("api", "latency_p95_ms")])
+    session.add(
+        MetricPoint(
+            series_id=keys[("api", "latency_p95_ms")],
+            timestamp=START + timedelta(days=1),
+            value=0.0,
+        )
+    )
+    session.commit()
+    report = store.verify(session)
+    assert not report["consistent"]
+    assert report["mismatched"] == ["api:latency_p95_ms"]
+
+
+def test_store_memory_is_bounded(session) -> None:
+    store = HotStore(capacity=4, max_series=2)
+    store.warm(session)
+    for service in ("a", "b", "c"):
+        store.extend(metric_crud.metric_rows([(None,)] * 6, _points(range(6), service=service)))
+
+    stats = store.stats()
+    assert stats["series"] == 2
+    assert stats["untracked_series"] == 1
+    assert stats["points"] == 8
+    assert stats["bytes_total"] == 2 * 4 * 16 == stats["max_bytes"]
+    assert store.series("c", "latency_p95_ms", 1) is None
+    assert store.services() is None
+
+
+def test_detector_reads_from_hot_store(session) -> None:
+    store = HotStore(capacity=240, max_series=10)
+    metric_crud.insert_metric_rows(session, _points([120.0] * 60))
+    store.warm(session)
+    # the spike only exists in the hot store, so an incident proves the detector read from it
+    spike = START + timedelta(hours=1)
+    store.extend(metric_crud.metric_rows([(None,)], _points([900.0], spike)))
+
+    incident = IncidentDetector(session, store=store).evaluate_metric("api", "latency_p95_ms")
+
+    assert incident is not None
+    assert incident.window_end == spike
+
+
+def test_aware_timestamps_share_one_utc_time_base(client, session) -> None:
+    hot_store.warm(session)
+    response = client.post(
+        "/api/v1/ingest/metrics",
+        json={
+            "metrics": [
+                {
+                    "service": "api",
+                    "metric": "cpu_pct",
+                    "timestamp": "2024-03-01T00:00:30+02:00",
+                    "value": 1.0,
+                }
+            ]
+        },
+    )
+    assert response.status_code == 200
+    response = client.post(
+        "/api/v1/ingest/metrics/stream",
+        content=json.dumps(
+            {
+                "service": "api",
+                "metric": "cpu_pct",
+                "timestamp": "2024-02-29T17:31:00-05:00",
+                "value": 2.0,
+            }
+        ),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    expected = [datetime(2024, 2, 29, 22, 0, 30), datetime(2024, 2, 29, 22, 31)]
+
+    raw = metric_crud.database_series(session, "api", "cpu_pct", 10)
+    assert [point.timestamp for point in raw] == expected
+    assert [point.timestamp for point in hot_store.series("api", "cpu_pct", 2)] == expected
+    assert hot_store.verify(session)["consistent"]
+    buckets = session.exec(
+        select(MetricRollup.bucket).where(MetricRollup.resolution == 3600).order_by("bucket")
+    ).all()
+    assert buckets == [datetime(2024, 2, 29, 22, 0)]
+    (info,) = metric_crud.list_series_info(session)
+    assert (info.first_seen, info.last_seen) == tuple(expected)
@@ -0,0 +1,162 @@
+import asyncio
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from app.crud import metrics as metric_crud
+from app.models import MetricPoint
+from app.services import ingest_buffer
+from app.services.detection_scheduler import DetectionScheduler
+from app.services.ingest_buffer import IngestBuffer, IngestBufferFull, get_ingest_buffer
+from sqlmodel import Session, select
+
+
+def _rows(count: int, offset: int = 0) -> list[dict]:
+    start = datetime.utcnow() - timedelta(minutes=300)
+    return [
+        {
+            "service": "checkout",
+            "metric": "cpu_pct",
+            "timestamp": start + timedelta(minutes=offset + idx),
+            "value": 40.0,
+        }
+        for idx in range(count)
+    ]
+
+
+def _buffer(session: Session, **kwargs) -> IngestBuffer:
+    engine = session.get_bind()
+
+    @contextmanager
+    def factory():
+        with Session(engine) as scoped:
+            yield scoped
+
+    options = {"capacity": 1000, "flush_rows": 50, "flush_interval": 5.0}
+    options.update(kwargs)
+    return IngestBuffer(session_factory=factory, **options)
+
+
+def test_buffer_flushes_by_size_and_drains_on_stop(session) -> None:
+    buffer = _buffer(session)
+
+    async def scenario() -> dict:
+        for batch in range(6):
+            buffer.offer(_rows(10, offset=batch * 10))
+        await asyncio.sleep(0.2)
+        after_size_flush = buffer.stats()
+        await buffer.stop()
+        return after_size_flush
+
+    after_size_flush = asyncio.run(scenario())
+
+    assert after_size_flush["flushes"] == 1
+    assert after_size_flush["flushed_total"] == 50
+    assert after_size_flush["pending"] == 10
+    stats = buffer.stats()
+    assert stats["flushes"] == 2
+    assert stats["flushed_total"] == 60
+    assert stats["pending"] == 0 and not stats["running"]
+    assert len(metric_crud.get_metric_series(session, "checkout", "cpu_pct", limit=100)) == 60
+
+
+def test_buffer_flushes_by_time(session) -> None:
+    buffer = _buffer(session, flush_interval=0.05)
+
+    async def scenario() -> None:
+        buffer.offer(_rows(3))
+        await asyncio.sleep(0.3)
+        assert buffer.stats()["flushed_total"] == 3
+        await buffer.stop()
+
+    asyncio.run(scenario())
+
+
+def test_failed_flush_is_requeued_then_dropped_after_max_retries(session, monkeypatch) -> None:
+    buffer = _buffer(session, flush_rows=5, max_retries=2)
+    write = buffer._write
+    failures = iter([True, True, False, True, True, True])
+
+    def flaky_write(batch):
+        if next(failures):
+            raise RuntimeError("database is locked")
+        return write(batch)
+
+    monkeypatch.setattr(buffer, "_write", flaky_write)
+
+    async def scenario() -> None:
+        buffer.offer(_rows(5))
+        for _ in range(3):
+            await buffer.flush()
+        assert buffer.stats()["pending"] == 0
+        buffer.offer(_rows(5, offset=5))
+        for _ in range(3):
+            await buffer.flush()
+        await buffer.stop()
+
+    asyncio.run(scenario())
+
+    stats = buffer.stats()
+    assert stats["retried_total"] == 20
+    assert stats["dropped_total"] == 5
+    assert stats["flushed_total"] == 5 and stats["pending"] == 0
+    assert len(session.exec(select(MetricPoint)).all()) == 5
+
+
+def test_failed_detection_requeues_series_not_points(session, monkeypatch) -> None:
+    buffer = _buffer(session, flush_rows=5)
+    scheduler = DetectionScheduler(
+        tick=5.0, debounce=2.0, max_latency=10.0, max_series_per_tick=100
+    )
+    detect = scheduler.detect
+    failures = iter([True, False])
+
+    def flaky_detect(scoped, pairs):
+        if next(failures):
+            raise RuntimeError("detector crashed")
+        return detect(scoped, pairs)
+
+    monkeypatch.setattr(scheduler, "detect", flaky_detect)
+    monkeypatch.setattr(ingest_buffer, "detection_scheduler", scheduler)
+
+    async def scenario() -> None:
+        buffer.offer(_rows(5))
+        assert await buffer.flush() is not None
+        assert await buffer.flush() is None  # nothing was requeued
+        await buffer.stop()
+
+    asyncio.run(scenario())
+
+    stats = buffer.stats()
+    assert stats["flushed_total"] == 5 and stats["retried_total"] == 0
+    assert len(session.exec(select(MetricPoint)).all()) == 5
+    assert scheduler.stats()["queue_depth"] == 1
+    (info,) = metric_crud.list_series_info(session)
+    assert info.point_count == 5
+
+
+def test_buffer_rejects_when_full(session) -> None:
+    buffer = _buffer(session, capacity=15)
+
+    async def scenario() -> None:
+        buffer.offer(_rows(10))
+        with pytest.raises(IngestBufferFull):
+            buffer.offer(_rows(10))
+        await buffer.stop()
+
+    asyncio.run(scenario())
+    assert buffer.stats()["rejected_total"] == 10
+
+
+def test_buffered_route_returns_202_and_429(client, session) -> None:
+    buffer = _buffer(session, capacity=2)
+    client.app.dependency_overrides[get_ingest_buffer] = lambda: buffer
+    point = {"service": "checkout", "metric": "cpu_pct", "value": 1.0}
+
+    accepted = client.post("/api/v1/ingest/metrics/buffered", json={"metrics": [point, point]})
+    rejected = client.post("/api/v1/ingest/metrics/buffered", json={"metrics": [point]})
+
+    assert accepted.status_code == 202
+    assert accepted.json() == {"accepted": 2, "pending": 2}
+    assert rejected.status_code == 429
+    assert client.get("/api/v1/ingest/buffer").json()["rejected_total"] == 1
@@ -0,0 +1,76 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+from app.crud import metrics as metric_crud
+from app.services.ingest_stream import iter_lines, parse_metric_line
+
+
+def _collect(chunks, **kwargs):
+    async def _source():
+        for chunk in chunks:
+            yield chunk
+
+    async def _run():
+        return [line async for line in iter_lines(_source(), **kwargs)]
+
+    return asyncio.run(_run())
+
+
+def test_iter_lines_joins_partial_lines_across_chunks() -> None:
+    lines = _collect([b'{"a":', b' 1}\n{"b"', b": 2}\r\n", b'{"c": 3}'])
+    assert lines == [b'{"a": 1}', b'{"b": 2}', b'{"c": 3}']
+
+
+def test_iter_lines_truncates_oversized_lines() -> None:
+    lines = _collect([b"x" * 40, b"x" * 40, b"\nok\n"], max_line_bytes=32)
+    assert lines == [b"x" * 32, b"ok"]
+
+
+def test_parse_metric_line_rejects_invalid_records() -> None:
+    assert parse_metric_line(b'{"service": "a", "metric": "cpu_pct", "value": 1}') is not None
+    assert parse_metric_line(b'{"service": "a", "metric": "cpu_pct", "value": true}') is None
+    assert parse_metric_line(b'{"service": "", "metric": "cpu_pct", "value": 1}') is None
+    assert parse_metric_line(b'{"service": "a", "metric": "m", "value": 1, "timestamp": 5}') is None
+    assert parse_metric_line(b"not json") is None
+
+
+def test_stream_endpoint_commits_fixed_size_chunks(client, session) -> None:
+    start = datetime.utcnow() - timedelta(minutes=250)
+    lines = [
+        json.dumps(
+            {
+                "service": "checkout",
+                "metric": "cpu_pct",
+                "timestamp": (start + timedelta(minutes=idx)).isoformat(),
+                "value": 40.0,
+            }
+        )
+        for idx in range(250)
+    ]
+    lines.insert(120, "{broken")
+    body = ("\n".join(lines) + "\n").encode()
+
+    response = client.post(
+        "/api/v1/ingest/metrics/stream?chunk_size=100",
+        content=body,
+        headers={"content-type": "application/x-ndjson"},
+    )
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["ingested"] == 250
+    assert payload["skipped"] == 1
+    assert [(c["accepted"], c["skipped"]) for c in payload["chunks"]] == [
+        (100, 0),
+        (99, 1),
+        (51, 0),
+    ]
+    assert len(metric_crud.get_metric_series(session, "checkout", "cpu_pct", limit=500)) == 250
+
+
+def test_stream_endpoint_requires_ndjson(client) -> None:
+    response = client.post(
+        "/api/v1/ingest/metrics/stream", content=b"{}", headers={"content-type": "text/plain"}
+    )
+    assert response.status_code == 415
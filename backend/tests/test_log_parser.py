@@ -1,4 +1,4 @@
-from app.services.log_parser import parse_log_line
+from app.services.log_parser import parse_log_line, parse_log_lines
 
 
 def test_parse_log_line_extracts_fields() -> None:
@@ -10,3 +10,35 @@ def test_parse_log_line_extracts_fields() -> None:
     assert result.latency_ms == 450
     assert result.request_id == "req-123"
     assert "db" in (result.context or {}).get("message", "") or result.message
+
+
+def test_parse_log_lines_is_lazy_and_skips_unparseable_lines() -> None:
+    lines = iter(["", 'INFO api unbalanced "quote', "ERROR api message=boom"])
+    parsed = parse_log_lines(lines)
+    first = next(parsed)
+    assert first.level == "ERROR"
+    assert list(parsed) == []
+
+
+def test_logfile_upload_streams_batches(client, monkeypatch) -> None:
+    from app.api.routes import logs as log_routes
+
+    monkeypatch.setattr(log_routes, "LOG_BATCH_LINES", 3)
+    body = (
+        "\n".join(
+            [f"2024-03-01T00:0{idx}:00Z INFO checkout message=tick-{idx}" for idx in range(7)]
+            + [""]
+        ).encode("utf-8")
+        + b"\n\xff\xfe\n"
+    )
+
+    response = client.post(
+        "/api/v1/ingest/logfile", files={"file": ("app.log", body, "text/plain")}
+    )
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["ingested"] == 7
+    assert payload["lines"] == 9
+    assert payload["skipped"] == 2
+    assert payload["lines_per_sec"] > 0
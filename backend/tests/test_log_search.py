@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta
+
+from app.crud import logs as log_crud
+from app.db.log_search import SearchTerm, parse_query
+from app.models import LogEntry
+from app.schemas import LogCreate
+from sqlmodel import delete
+
+BASE = datetime(2024, 3, 1, 12, 0)
+
+
+def _seed(session, messages) -> None:
+    log_crud.bulk_create_logs(
+        session,
+        [
+            LogCreate(
+                service="checkout",
+                timestamp=BASE + timedelta(seconds=idx),
+                level="error",
+                message=message,
+            )
+            for idx, message in enumerate(messages)
+        ],
+    )
+
+
+def _search(session, query, **kwargs) -> list:
+    return [
+        log.message for log in log_crud.list_recent_logs(session, "checkout", query=query, **kwargs)
+    ]
+
+
+def test_parse_query_handles_phrases_and_prefixes() -> None:
+    assert parse_query('"Connection reset" pay* up-stream') == [
+        SearchTerm(("Connection", "reset"), False),
+        SearchTerm(("pay",), True),
+        SearchTerm(("up", "stream"), True),
+    ]
+    assert parse_query('tim "connection reset"') == [
+        SearchTerm(("tim",), False),
+        SearchTerm(("connection", "reset"), False),
+    ]
+    assert parse_query('"" * ') == []
+
+
+def test_search_matches_words_phrases_prefixes_and_context(session) -> None:
+    _seed(session, ["connection reset by peer", "reset the connection", "payment declined"])
+    log_crud.bulk_create_logs(
+        session,
+        [
+            LogCreate(
+                service="checkout",
+                timestamp=BASE,
+                message="retrying",
+                context={"region": "eu-west", "attempt": 2},
+            )
+        ],
+    )
+
+    assert _search(session, "connection") == ["connection reset by peer", "reset the connection"]
+    assert _search(session, '"connection reset"') == ["connection reset by peer"]
+    assert _search(session, "paym*") == ["payment declined"]
+    assert _search(session, "paym") == ["payment declined"]
+    assert _search(session, "paym declined") == []
+    assert _search(session, "region west") == ["retrying"]
+
+    session.exec(delete(LogEntry).where(LogEntry.message == "payment declined"))
+    session.commit()
+    assert _search(session, "payment") == []
+
+
+def test_partial_last_word_matches_while_typing(session) -> None:
+    _seed(session, ["upstream timeout", "db timeout", "slow start"])
+
+    assert _search(session, "tim") == ["upstream timeout", "db timeout"]
+    assert _search(session, "upstream tim") == ["upstream timeout"]
+    assert _search(session, "ups tim") == []
+
+
+def test_relevance_sort_puts_best_match_first(session) -> None:
+    _seed(session, ["timeout timeout timeout upstream", "db timeout", "slow start"])
+
+    assert _search(session, "timeout", sort="relevance") == [
+        "timeout timeout timeout upstream",
+        "db timeout",
+    ]
+
+
+def test_windowed_pass_returns_the_newest_matches(session, monkeypatch) -> None:
+    _seed(session, [f"request {idx}" if idx % 3 else f"other {idx}" for idx in range(30)])
+    expected = _search(session, "request", limit=5)
+
+    monkeypatch.setattr(log_crud, "SEARCH_WINDOWS", (4, 8))
+
+    assert _search(session, "request", limit=5) == expected
+    assert _search(session, "other", limit=20) == [f"other {idx}" for idx in range(0, 30, 3)]
@@ -0,0 +1,41 @@
+import asyncio
+import threading
+import time
+
+from app.core.concurrency import run_blocking
+from app.services.loop_monitor import LoopLagMonitor
+
+
+def test_loop_monitor_records_blocked_loop() -> None:
+    monitor = LoopLagMonitor(interval=0.01, warn_threshold=0.05)
+
+    async def scenario() -> dict:
+        await monitor.start()
+        await asyncio.sleep(0.03)
+        time.sleep(0.12)  # block the loop on purpose
+        await asyncio.sleep(0.03)
+        await monitor.stop()
+        return monitor.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["stalls"] >= 1
+    assert stats["max_lag_ms"] >= 50
+    assert not stats["running"]
+
+
+def test_run_blocking_keeps_loop_responsive() -> None:
+    monitor = LoopLagMonitor(interval=0.01, warn_threshold=0.05)
+
+    def slow_work() -> str:
+        time.sleep(0.15)
+        return threading.current_thread().name
+
+    async def scenario() -> str:
+        await monitor.start()
+        name = await run_blocking(slow_work)
+        await monitor.stop()
+        return name
+
+    thread_name = asyncio.run(scenario())
+    assert thread_name.startswith("signalsentry-blocking")
+    assert monitor.stats()["stalls"] == 0
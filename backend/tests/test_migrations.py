@@ -0,0 +1,31 @@
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from app.db.migrations import include_object, upgrade_database
+from sqlalchemy import create_engine, inspect
+from sqlmodel import SQLModel
+
+
+def _diff(engine) -> list:
+    with engine.connect() as connection:
+        context = MigrationContext.configure(connection, opts={"include_object": include_object})
+        return compare_metadata(context, SQLModel.metadata)
+
+
+def test_migrations_match_models(tmp_path) -> None:
+    engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    upgrade_database(engine)
+    assert _diff(engine) == []
+
+
+def test_legacy_create_all_database_is_stamped_and_upgraded(tmp_path) -> None:
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    upgrade_database(engine, "0001")
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP TABLE alembic_version")
+
+    upgrade_database(engine)
+
+    indexes = {index["name"] for index in inspect(engine).get_indexes("metrics")}
+    assert "ix_metrics_series_time" in indexes
+    assert "ix_metrics_service" not in indexes
+    assert _diff(engine) == []
@@ -0,0 +1,118 @@
+import json
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+from app.crud import metrics as metric_crud
+from app.db.chunk_codec import to_micros
+from app.services.anomaly import DETECTION_POINTS, detect_anomaly
+from app.services.incident_detector import IncidentDetector
+from app.services.online_detector import OnlineDetector, SeriesState, online_detector
+
+SAMPLE_METRICS = Path(__file__).resolve().parents[2] / "data" / "sample_metrics.jsonl"
+
+
+def test_online_detector_matches_batch_detector_on_sample_data() -> None:
+    if not SAMPLE_METRICS.exists():
+        pytest.skip("sample dataset not available")
+    series: dict = {}
+    for line in SAMPLE_METRICS.read_text(encoding="utf-8").splitlines():
+        row = json.loads(line)
+        timestamp = datetime.fromisoformat(row["timestamp"].replace("Z", ""))
+        series.setdefault((row["service"], row["metric"]), []).append((timestamp, row["value"]))
+
+    flagged = 0
+    for (_, metric), points in series.items():
+        state = SeriesState(DETECTION_POINTS, window_size=5, alpha=0.3)
+        for idx, (timestamp, value) in enumerate(points):
+            state.push(to_micros(timestamp), value)
+            window = points[max(idx + 1 - DETECTION_POINTS, 0) : idx + 1]
+            expected = detect_anomaly([v for _, v in window], [ts for ts, _ in window], metric)
+            assessment = state.assess(metric)
+            assert (assessment is None) == (expected is None)
+            if expected is not None:
+                flagged += 1
+                assert assessment.severity == expected.severity
+                assert assessment.window_start == expected.window_start
+                assert assessment.observed == pytest.approx(expected.observed, rel=1e-12)
+    assert flagged
+
+
+def test_online_detector_state_survives_restart(session) -> None:
+    start = datetime.utcnow() - timedelta(minutes=300)
+
+    def write(first: int, last: int, value: float) -> None:
+        metric_crud.insert_metric_rows(
+            session,
+            [
+                {
+                    "service": "api-gateway",
+                    "metric": "latency_p95_ms",
+                    "timestamp": start + timedelta(minutes=idx),
+                    "value": value + idx % 7,
+                }
+                for idx in range(first, last)
+            ],
+        )
+
+    write(0, 200, 120.0)
+    detector = OnlineDetector(DETECTION_POINTS, max_series=10, persist_interval=60)
+    assert detector.load(session)["rebuilt"] == 1
+    write(200, 260, 120.0)  # the shared detector is not loaded in tests, so feed this one
+    detector.extend(metric_crud.get_metric_series(session, "api-gateway", "latency_p95_ms", 60))
+    assert detector.persist(session)["series"] == 1
+
+    write(260, 265, 400.0)
+    restarted = OnlineDetector(DETECTION_POINTS, max_series=10, persist_interval=60)
+    report = restarted.load(session)
+    assert report["restored"] == 1
+    assert report["replayed_points"] == 5
+
+    incident = IncidentDetector(session, online=restarted).evaluate_metric(
+        "api-gateway", "latency_p95_ms"
+    )
+    rebuilt = OnlineDetector(DETECTION_POINTS, max_series=10, persist_interval=60)
+    rebuilt.load(session, restore=False)
+    expected = rebuilt.assess("api-gateway", "latency_p95_ms")
+    assert incident is not None
+    assert incident.severity == expected.severity
+
+
+def test_online_and_batch_paths_agree_on_aware_timestamps(client, session) -> None:
+    online_detector.load(session)
+    start = datetime(2024, 3, 1, 12, 0)
+    zones = (timezone(timedelta(hours=2)), timezone(timedelta(hours=-5)))
+    metrics = [
+        {
+            "service": "api",
+            "metric": "latency_p95_ms",
+            # the same UTC instants, written with alternating offsets
+            "timestamp": (start + timedelta(minutes=idx))
+            .replace(tzinfo=timezone.utc)
+            .astimezone(zones[idx % 2])
+            .isoformat(),
+            "value": 400.0 if idx >= 55 else 100.0 + idx % 4,
+        }
+        for idx in range(60)
+    ]
+    for offset in range(0, 60, 20):
+        response = client.post(
+            "/api/v1/ingest/metrics", json={"metrics": metrics[offset : offset + 20]}
+        )
+        assert response.status_code == 200
+
+    assert online_detector.covers("api", "latency_p95_ms")
+    online = online_detector.assess("api", "latency_p95_ms")
+    rows = metric_crud.database_series(session, "api", "latency_p95_ms", DETECTION_POINTS)
+    batch = detect_anomaly(
+        [row.value for row in rows], [row.timestamp for row in rows], "latency_p95_ms"
+    )
+
+    assert online is not None and batch is not None
+    assert batch.window_end == start + timedelta(minutes=59)
+    assert (online.severity, online.window_start, online.window_end) == (
+        batch.severity,
+        batch.window_start,
+        batch.window_end,
+    )
+    assert online.observed == pytest.approx(batch.observed, rel=1e-12)
@@ -0,0 +1,73 @@
+"""EXPLAIN QUERY PLAN checks: every hot CRUD query must use an index and never sort."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from app.crud import incidents as incident_crud
+from app.crud import logs as log_crud
+from app.crud import metrics as metric_crud
+from sqlalchemy import event, text
+
+
+def _capture(session, call):
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        call(session)
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+    assert statements, "expected the CRUD call to issue a SELECT"
+    return statements
+
+
+def _plans(session, statements):
+    connection = session.connection()
+    plans = []
+    for statement, parameters in statements:
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+        plans.append(" | ".join(row[-1] for row in rows))
+    return plans
+
+
+NOW = datetime(2024, 3, 1, 12, 0)
+
+HOT_QUERIES = {
+    "get_metric_series": lambda s: metric_crud.get_metric_series(s, "api", "latency_p95_ms"),
+    "get_latest_metric": lambda s: metric_crud.get_latest_metric(s, "api", "latency_p95_ms"),
+    "get_metrics_window": lambda s: metric_crud.get_metrics_window(
+        s, "api", "latency_p95_ms", NOW, NOW + timedelta(minutes=5)
+    ),
+    "get_metric_range": lambda s: metric_crud.get_metric_range(
+        s, "api", "latency_p95_ms", NOW - timedelta(days=30), NOW
+    ),
+    "get_metric_range_raw": lambda s: metric_crud.get_metric_range(
+        s, "api", "latency_p95_ms", NOW - timedelta(hours=1), NOW
+    ),
+    "get_logs_for_window": lambda s: log_crud.get_logs_for_window(
+        s, "api", NOW, NOW + timedelta(minutes=5)
+    ),
+    "list_recent_logs": lambda s: log_crud.list_recent_logs(s, "api"),
+    "list_recent_logs_by_level": lambda s: log_crud.list_recent_logs(s, "api", level="error"),
+    "open_incident_lookup": lambda s: s.exec(
+        incident_crud.open_incident_statement("api:latency_p95_ms")
+    ).first(),
+    "list_active_incidents": incident_crud.list_active_incidents,
+    "list_recent_incidents": incident_crud.list_recent_incidents,
+    "list_tracked_metrics": incident_crud.list_tracked_metrics,
+}
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_queries_use_indexes_without_sorting(session, name) -> None:
+    session.execute(text("ANALYZE"))
+    plans = _plans(session, _capture(session, HOT_QUERIES[name]))
+
+    for plan in plans:
+        assert "USING" in plan and "INDEX" in plan, plan
+        assert "TEMP B-TREE" not in plan, plan
@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta
+
+from app.crud import logs as log_crud
+from app.crud import metrics as metric_crud
+from app.crud.series import SeriesInfo
+from app.models import Incident, LogEntry, MetricPoint, MetricRollup
+from app.schemas import LogCreate
+from app.services.retention import RetentionEngine, default_policies
+from sqlmodel import select
+
+NOW = datetime(2024, 3, 31, 12, 0)
+
+
+def _age(days: float) -> datetime:
+    return NOW - timedelta(days=days)
+
+
+def _seed(session) -> None:
+    metric_crud.insert_metric_rows(
+        session,
+        [
+            {"service": "api", "metric": "cpu_pct", "timestamp": _age(days), "value": 1.0}
+            for days in (1, 6, 8, 9, 10, 100)
+        ],
+    )
+    for level, days in [("INFO", 1), ("INFO", 4), ("WARN", 5), ("ERROR", 4), ("ERROR", 31)]:
+        log_crud.create_log(
+            session, LogCreate(service="api", level=level, timestamp=_age(days), message="m")
+        )
+    for status, days in [("resolved", 40), ("open", 40), ("resolved", 2)]:
+        session.add(
+            Incident(
+                incident_key="api:cpu_pct",
+                service="api",
+                metric="cpu_pct",
+                status=status,
+                window_start=_age(days),
+                window_end=_age(days),
+                detected_at=_age(days),
+                updated_at=_age(days),
+            )
+        )
+    session.commit()
+
+
+def test_retention_applies_policies_in_chunks(session) -> None:
+    _seed(session)
+    engine = RetentionEngine(default_policies(), chunk_rows=2, interval=3600)
+
+    report = engine.run(session, now=NOW)
+
+    by_policy = {entry["policy"]: entry for entry in report["policies"]}
+    assert by_policy["metrics"]["deleted"] == 4
+    assert by_policy["metrics"]["chunks"] == 3
+    assert by_policy["logs_info"]["deleted"] == 2
+    assert by_policy["logs_error"]["deleted"] == 1
+    assert by_policy["incidents_resolved"]["deleted"] == 1
+    assert by_policy["metric_rollups"]["deleted"] == 3
+    assert report["deleted_total"] == 11
+    assert "metrics" in report["analyzed"]
+
+    assert len(session.exec(select(MetricPoint)).all()) == 2
+    assert {log.level for log in session.exec(select(LogEntry)).all()} == {"INFO", "ERROR"}
+    assert len(session.exec(select(Incident)).all()) == 2
+    oldest = session.exec(select(MetricRollup.bucket).order_by(MetricRollup.bucket)).first()
+    assert oldest >= _age(90)
+    assert engine.stats()["last_report"] is report
+
+
+def test_retention_recounts_the_series_it_expired(session) -> None:
+    _seed(session)
+    metric_crud.insert_metric_rows(
+        session,
+        [{"service": "batch", "metric": "cpu_pct", "timestamp": _age(30), "value": 5.0}],
+    )
+    assert len(metric_crud.list_series_info(session)) == 2
+
+    report = RetentionEngine(default_policies(), chunk_rows=100, interval=3600).run(session, NOW)
+
+    assert report["series_recounted"] == 2
+    assert metric_crud.list_series_info(session) == [
+        SeriesInfo("api", "cpu_pct", _age(6), _age(1), 2, 1.0)
+    ]
+    assert metric_crud.list_services(session) == ["api"]
+
+
+def test_retention_route_reports_run(client, session) -> None:
+    response = client.post("/api/v1/admin/retention/run")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ok"
+    assert body["deleted_total"] == 0
+    assert {entry["policy"] for entry in body["policies"]} >= {"metrics", "logs_info"}
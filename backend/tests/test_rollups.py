@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+
+from app.crud import metrics as metric_crud
+from app.crud import rollups as rollup_crud
+from app.models import MetricRollup
+from sqlmodel import select
+
+START = datetime(2024, 3, 1)
+
+
+def _points(count: int, step: timedelta, start: datetime = START) -> list:
+    return [
+        {
+            "service": "api",
+            "metric": "latency_p95_ms",
+            "timestamp": start + step * idx,
+            "value": float(idx % 50),
+        }
+        for idx in range(count)
+    ]
+
+
+def _snapshot(session) -> list:
+    rows = session.exec(select(MetricRollup)).all()
+    return sorted(
+        (r.resolution, r.bucket, r.count, r.value_sum, r.value_min, r.value_max, r.last_value)
+        for r in rows
+    )
+
+
+def test_incremental_rollups_match_backfill(session) -> None:
+    points = _points(400, timedelta(seconds=20))
+    # split mid-bucket and out of order so the upsert has to merge partial buckets
+    metric_crud.insert_metric_rows(session, points[250:])
+    metric_crud.insert_metric_rows(session, points[:250])
+    incremental = _snapshot(session)
+
+    rollup_crud.backfill_rollups(session, batch_size=97)
+
+    assert _snapshot(session) == incremental
+    hourly = session.exec(
+        select(MetricRollup).where(MetricRollup.resolution == 3600).order_by(MetricRollup.bucket)
+    ).all()
+    assert [row.count for row in hourly] == [180, 180, 40]
+    assert hourly[0].last_value == points[179]["value"]
+    assert hourly[0].value_min == 0.0 and hourly[0].value_max == 49.0
+
+
+def test_choose_resolution_prefers_coarsest_meeting_density() -> None:
+    day = timedelta(days=1)
+    assert rollup_crud.choose_resolution(START, START + 30 * day, 300) == 3600
+    assert rollup_crud.choose_resolution(START, START + day, 200) == 300
+    assert rollup_crud.choose_resolution(START, START + timedelta(hours=6), 300) == 60
+    assert rollup_crud.choose_resolution(START, START + timedelta(hours=2), 300) == 0
+
+
+def test_thirty_day_range_reads_hourly_buckets(client, session) -> None:
+    metric_crud.insert_metric_rows(session, _points(30 * 24 * 12, timedelta(minutes=5)))
+
+    response = client.get(
+        "/api/v1/services/api/metrics/range",
+        params={
+            "metric": "latency_p95_ms",
+            "start": START.isoformat(),
+            "end": (START + timedelta(days=30)).isoformat(),
+        },
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["resolution_seconds"] == 3600
+    assert len(body["points"]) == 30 * 24
+    assert body["points"][0]["count"] == 12
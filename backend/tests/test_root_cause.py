@@ -20,7 +20,7 @@ def test_root_cause_keyword_hints(session) -> None:
     logs = [
         SimpleNamespace(
             message="timeout waiting on db",
-            context='{"keyword": "timeout"}',
+            context={"keyword": "timeout"},
             timestamp=SimpleNamespace(isoformat=lambda: "2024-03-01T00:00:00Z"),
         )
     ]
@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+
+import pytest
+from app.crud import metrics as metric_crud
+from app.services.segment_store import RECORD_SIZE, SegmentStore
+
+pytest.importorskip("numpy")
+
+START = datetime(2024, 3, 1)
+
+
+def _rows(count: int, start: datetime = START) -> list:
+    return [
+        {
+            "service": "api",
+            "metric": "latency_p95_ms",
+            "timestamp": start + timedelta(seconds=15 * idx),
+            "value": float(idx),
+        }
+        for idx in range(count)
+    ]
+
+
+@pytest.fixture()
+def store(tmp_path, monkeypatch, session) -> SegmentStore:
+    # 100 records per segment and a sparse index entry every 8 records
+    store = SegmentStore(tmp_path, max_segment_bytes=100 * RECORD_SIZE, index_every=8)
+    monkeypatch.setattr(metric_crud, "segment_store", store)
+    store.open()
+    store.sync(session)
+    return store
+
+
+def _segment_files(store: SegmentStore) -> list:
+    return sorted(store.root.glob("*/*/*.seg"))
+
+
+def test_reads_match_the_database_across_rolled_segments(session, store) -> None:
+    rows = _rows(250)
+    metric_crud.insert_metric_rows(session, rows)
+
+    assert len(_segment_files(store)) == 3
+    lower, upper = START + timedelta(minutes=20), START + timedelta(minutes=40)
+    window = metric_crud.get_metrics_window(session, "api", "latency_p95_ms", lower, upper)
+    tail = metric_crud.get_metric_series(session, "api", "latency_p95_ms", limit=120)
+
+    assert store.stats()["hits"] == 2
+    padded_lower, padded_upper = metric_crud.padded_window(lower, upper)
+    assert [(p.timestamp, p.value) for p in window] == [
+        (r["timestamp"], r["value"]) for r in rows if padded_lower <= r["timestamp"] <= padded_upper
+    ]
+    database = metric_crud.database_series(session, "api", "latency_p95_ms", 120)
+    assert [(p.timestamp, p.value) for p in tail] == [(p.timestamp, p.value) for p in database]
+
+
+def test_open_truncates_torn_tail_record(session, store, tmp_path) -> None:
+    metric_crud.insert_metric_rows(session, _rows(50))
+    (path,) = _segment_files(store)
+    with path.open("ab") as handle:
+        handle.write(b"\x00" * 5)
+
+    reopened = SegmentStore(tmp_path, max_segment_bytes=100 * RECORD_SIZE, index_every=8)
+    assert reopened.open() == {"series": 1, "torn_bytes": 5}
+    assert path.stat().st_size == 50 * RECORD_SIZE
+    assert reopened.sync(session)["rebuilt"] == 0
+
+
+def test_late_point_falls_back_to_sql_until_sync(session, store) -> None:
+    metric_crud.insert_metric_rows(session, _rows(20))
+    metric_crud.insert_metric_rows(session, _rows(1, start=START - timedelta(minutes=1)))
+
+    assert store.tail("api", "latency_p95_ms", 10) is None
+    assert len(metric_crud.get_metric_series(session, "api", "latency_p95_ms", limit=50)) == 21
+
+    assert store.sync(session) == {"series": 1, "rebuilt": 1, "points": 21}
+    timestamps, _ = store.tail("api", "latency_p95_ms", 50)
+    assert len(timestamps) == 21
@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta
+
+from app.crud import incidents as incident_crud
+from app.crud import metrics as metric_crud
+from app.crud.series import SeriesInfo, reconcile_series, series_registry
+from app.models import MetricChunk
+from app.services.compaction import CompactionJob
+from sqlalchemy import delete, event
+
+START = datetime(2024, 3, 1)
+
+
+def _rows(service, metric, minutes, base=100.0):
+    return [
+        {
+            "service": service,
+            "metric": metric,
+            "timestamp": START + timedelta(minutes=minute),
+            "value": base + minute,
+        }
+        for minute in minutes
+    ]
+
+
+def _selects(session, call):
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        result = call()
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+    return result, statements
+
+
+def test_inserts_maintain_registry_and_listings_skip_the_database(session) -> None:
+    metric_crud.insert_metric_rows(session, _rows("api", "cpu_pct", [10, 5, 20]))
+    assert metric_crud.list_services(session) == ["api"]
+
+    # a late point only moves first_seen; the new series reaches the loaded cache on commit
+    metric_crud.insert_metric_rows(
+        session, _rows("api", "cpu_pct", [2]) + _rows("auth", "error_rate", [1, 1], base=0.5)
+    )
+    expected = [
+        SeriesInfo(
+            "api", "cpu_pct", START + timedelta(minutes=2), START + timedelta(minutes=20), 4, 120.0
+        ),
+        SeriesInfo(
+            "auth", "error_rate", START + timedelta(minutes=1), START + timedelta(minutes=1), 2, 1.5
+        ),
+    ]
+
+    listed, statements = _selects(
+        session,
+        lambda: (
+            metric_crud.list_series_info(session),
+            metric_crud.list_services(session),
+            metric_crud.list_service_metrics(session, "auth"),
+            incident_crud.list_service_metrics(session, ["error_rate"]),
+        ),
+    )
+    assert listed == (expected, ["api", "auth"], ["error_rate"], [("auth", "error_rate")])
+    assert statements == []
+
+    series_registry.clear()
+    assert metric_crud.list_series_info(session) == expected
+
+
+def test_reconcile_rebuilds_registry_from_raw_rows_and_chunks(session) -> None:
+    metric_crud.insert_metric_rows(session, _rows("api", "cpu_pct", range(0, 180, 10)))
+    metric_crud.insert_metric_rows(session, _rows("auth", "cpu_pct", range(5)))
+    # the first two hours move into chunks; retention then drops auth's only chunk
+    CompactionJob(3600, timedelta(0), 60).run(session, now=START + timedelta(hours=2))
+    session.exec(delete(MetricChunk).where(MetricChunk.service == "auth"))
+    session.commit()
+
+    report = reconcile_series(session)
+
+    assert (report["series"], report["empty"], report["points"]) == (2, 1, 18)
+    # auth keeps its registry row, but a series without points is no longer listed
+    assert metric_crud.list_series_info(session) == [
+        SeriesInfo("api", "cpu_pct", START, START + timedelta(minutes=170), 18, 270.0),
+    ]
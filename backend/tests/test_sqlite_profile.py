@@ -0,0 +1,46 @@
+import pytest
+from app.db.migrations import upgrade_database
+from app.db.session import check_database_url
+from app.db.sqlite import create_sqlite_engines, is_file_database
+from sqlalchemy.exc import OperationalError
+
+
+def test_is_file_database() -> None:
+    assert is_file_database("sqlite:////var/lib/signalsentry/signalsentry.db")
+    assert not is_file_database("sqlite://")
+    assert not is_file_database("sqlite:///:memory:")
+    assert not is_file_database("sqlite:///file:x?mode=memory&cache=shared&uri=true")
+    assert not is_file_database("postgresql://localhost/signalsentry")
+
+
+def _pragma(connection, name: str):
+    return connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+
+def test_only_supported_database_backends_are_accepted() -> None:
+    check_database_url("sqlite:////var/lib/signalsentry/signalsentry.db")
+    check_database_url("postgresql+psycopg2://postgres@localhost/signalsentry")
+    check_database_url("postgresql+asyncpg://postgres@localhost/signalsentry")
+    with pytest.raises(ValueError, match="'mysql'"):
+        check_database_url("mysql+pymysql://root@localhost/signalsentry")
+
+
+def test_writer_and_reader_profiles(tmp_path) -> None:
+    writer, reader = create_sqlite_engines(f"sqlite:///{tmp_path / 'prod.db'}")
+    upgrade_database(writer)
+
+    with writer.connect() as connection:
+        assert _pragma(connection, "journal_mode") == "wal"
+        assert _pragma(connection, "synchronous") == 1  # NORMAL
+        assert _pragma(connection, "busy_timeout") == 5000
+        assert _pragma(connection, "temp_store") == 2  # MEMORY
+        assert _pragma(connection, "query_only") == 0
+    assert writer.pool.size() == 1
+
+    with reader.connect() as connection:
+        assert connection.exec_driver_sql("SELECT count(*) FROM metrics").scalar() == 0
+        with pytest.raises(OperationalError, match="readonly"):
+            connection.exec_driver_sql("DELETE FROM metrics")
+
+    writer.dispose()
+    reader.dispose()